@@ -0,0 +1,322 @@
+# app/asgi_api.py
+"""
+ASGI entry point with the same contract as app/model_api.py:
+/health, /v1/models, /v1/schema/<model>, /v1/predict/<model>, /v1/batch_predict/<model>,
+/v1/stream_predict/<model>.
+
+Request I/O and parsing run on the event loop; model inference is sent to a
+process pool whose workers each preload the registry, so one slow batch never
+blocks the loop and CPU-bound predicts are not serialized by the GIL.
+
+Run:
+    python -m app.asgi_api
+    uvicorn app.asgi_api:app --host 127.0.0.1 --port 8001
+
+Config (config/config.yaml):
+    api:
+      asgi:
+        port: 8001
+        process_workers: 4        # 0 = run inference on the loop's thread pool instead
+        start_method: spawn       # spawn | forkserver | fork
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.utils.arrow_io import (
+    ARROW_STREAM_MIMETYPE,
+    columns_to_frame,
+    predictions_to_arrow_stream,
+    read_arrow_stream,
+)
+from app.utils.ndjson_stream import NDJSON_MIMETYPE, Chunk, NDJSONChunker, score_chunk
+from app.utils.payload import flex_build_one_row, row_to_df
+from app.utils.registry import ModelNotFound, ModelRegistry
+from app.utils.typed_io import PayloadError
+
+# --------------------------------------------------------------------------------------
+# Setup
+# --------------------------------------------------------------------------------------
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG_PATH = ROOT / "config" / "config.yaml"
+
+# Parent-side registry: metadata only (feature names, config). Models load in workers.
+REGISTRY = ModelRegistry(config_path=CONFIG_PATH)
+ASGI_CFG: Dict[str, Any] = REGISTRY.api_cfg.get("asgi") or {}
+STREAM_CFG: Dict[str, Any] = REGISTRY.api_cfg.get("stream") or {}
+
+
+# --------------------------------------------------------------------------------------
+# Worker side (module-level so the process pool can pickle them)
+# --------------------------------------------------------------------------------------
+_WORKER_REGISTRY: Optional[ModelRegistry] = None
+
+
+def _init_worker(config_path: str) -> None:
+    """Process-pool initializer: load and warm every configured model once."""
+    global _WORKER_REGISTRY
+    _WORKER_REGISTRY = ModelRegistry(config_path=Path(config_path))
+    _WORKER_REGISTRY.warm_up_all()
+
+
+def _worker_registry() -> ModelRegistry:
+    global _WORKER_REGISTRY
+    if _WORKER_REGISTRY is None:  # thread-pool mode: share one in-process registry
+        _WORKER_REGISTRY = ModelRegistry(config_path=CONFIG_PATH)
+    return _WORKER_REGISTRY
+
+
+def _ping() -> bool:
+    return _worker_registry().ready
+
+
+def _schema_in_worker(model_name: str) -> Dict[str, Any]:
+    lm = _worker_registry().get(model_name)
+    return {
+        "model": model_name,
+        "expected_raw_features": lm.feature_names,
+        "is_pipeline": lm.is_pipeline,
+        "model_version": lm.version,
+    }
+
+
+def _predict_in_worker(model_name: str, features: Any) -> Dict[str, Any]:
+    """Single-row predict; mirrors the candidate handling of the Flask endpoint."""
+    lm = _worker_registry().get(model_name)
+    if lm.codec is not None:
+        features = lm.codec.convert_features(features)  # same validation as the Flask endpoint
+    try:
+        if lm.payload_adapter is not None:
+            built = lm.payload_adapter.build(features)
+        else:
+            built = flex_build_one_row(features, lm.feature_names)
+    except ValueError as e:
+        raise PayloadError(str(e)) from None
+    candidates = built["_candidates"] if "_candidates" in built else [built]
+
+    last_err = None
+    for row in candidates:
+        try:
+            if lm.compiled is not None:
+                y = int(lm.compiled.predict_one(row))
+            else:
+                y = int(lm.predict_frame(row_to_df(row))[0])
+            lm.mark_prediction()
+            return {
+                "model": model_name,
+                "prediction": y,
+                "model_loaded_sec": lm.loaded_sec,
+                "is_pipeline": lm.is_pipeline,
+                "compiled": lm.compiled is not None,
+                "model_version": lm.version,
+            }
+        except Exception as e:
+            last_err = str(e)
+    raise ValueError(f"All candidate shapes failed. Last error: {last_err}")
+
+
+def _batch_in_worker(model_name: str, df: pd.DataFrame):
+    lm = _worker_registry().get(model_name)
+    preds = lm.predict_frame(df)
+    lm.mark_prediction()
+    return preds, lm.version
+
+
+def _stream_chunk_in_worker(model_name: str, chunk: Chunk) -> bytes:
+    lm = _worker_registry().get(model_name)
+    out = score_chunk(chunk, lm.feature_names, lm.predict_frame)
+    lm.mark_prediction()
+    return out
+
+
+# --------------------------------------------------------------------------------------
+# App
+# --------------------------------------------------------------------------------------
+_EXECUTOR: Optional[Executor] = None
+_WORKERS_READY = False
+
+
+def _make_executor() -> Executor:
+    n = int(ASGI_CFG.get("process_workers", 2))
+    if n <= 0:
+        return ThreadPoolExecutor(thread_name_prefix="asgi-infer")
+    ctx = mp.get_context(ASGI_CFG.get("start_method", "spawn"))
+    return ProcessPoolExecutor(
+        max_workers=n,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(str(CONFIG_PATH),),
+    )
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    global _EXECUTOR, _WORKERS_READY
+    _EXECUTOR = _make_executor()
+    # Touch every worker so each one spawns and preloads before traffic arrives.
+    n = max(1, int(ASGI_CFG.get("process_workers", 2)))
+    await asyncio.gather(*(_run(_ping) for _ in range(n)))
+    _WORKERS_READY = True
+    try:
+        yield
+    finally:
+        _WORKERS_READY = False
+        _EXECUTOR.shutdown(wait=True, cancel_futures=True)
+        _EXECUTOR = None
+
+
+app = FastAPI(title="ml-api (ASGI)", lifespan=lifespan)
+
+
+async def _run(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, fn, *args)
+
+
+@app.exception_handler(ModelNotFound)
+async def handle_model_not_found(_: Request, e: ModelNotFound):
+    return JSONResponse({"error": str(e)}, status_code=404)
+
+
+@app.exception_handler(Exception)
+async def handle_exception(_: Request, e: Exception):
+    return JSONResponse({"error": str(e), "traceback": traceback.format_exc()}, status_code=500)
+
+
+# --------------------------------------------------------------------------------------
+# Health & metadata
+# --------------------------------------------------------------------------------------
+@app.get("/health")
+async def health():
+    ready = _WORKERS_READY
+    return JSONResponse(
+        {"status": "ok" if ready else "warming", "ready": ready, "models": list(REGISTRY.list_models().keys())},
+        status_code=200 if ready else 503,
+    )
+
+
+@app.get("/v1/models")
+async def list_models():
+    return REGISTRY.list_models()
+
+
+@app.get("/v1/schema/{model_name}")
+async def schema(model_name: str):
+    return await _run(_schema_in_worker, model_name)
+
+
+# --------------------------------------------------------------------------------------
+# Prediction
+# --------------------------------------------------------------------------------------
+@app.post("/v1/predict/{model_name}")
+async def predict(model_name: str, request: Request):
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    if not isinstance(data, dict) or "features" not in data:
+        return JSONResponse({"error": "Missing 'features'"}, status_code=400)
+    try:
+        return await _run(_predict_in_worker, model_name, data["features"])
+    except PayloadError as e:
+        return JSONResponse({"error": f"Invalid payload: {e}"}, status_code=400)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@app.post("/v1/batch_predict/{model_name}")
+async def batch_predict(model_name: str, request: Request):
+    """Same body forms as the Flask endpoint: rows / matrix / columns JSON, or an Arrow stream."""
+    feature_names = REGISTRY.feature_names(model_name)
+    body = await request.body()
+
+    if request.headers.get("content-type", "").split(";")[0].strip() == ARROW_STREAM_MIMETYPE:
+        try:
+            df = read_arrow_stream(body, feature_names)
+        except ValueError as e:
+            return JSONResponse({"error": f"Invalid payload: {e}"}, status_code=400)
+    else:
+        try:
+            data = await request.json()
+        except Exception:
+            data = {}
+        if "rows" in data:
+            df = pd.DataFrame(data["rows"]).reindex(columns=feature_names)
+        elif "matrix" in data:
+            df = pd.DataFrame(data["matrix"], columns=feature_names)
+        elif "columns" in data:
+            try:
+                df = columns_to_frame(data["columns"], feature_names)
+            except ValueError as e:
+                return JSONResponse({"error": f"Invalid payload: {e}"}, status_code=400)
+        else:
+            return JSONResponse(
+                {"error": "Provide 'rows' (list of dicts), 'matrix' (list of lists), "
+                          "'columns' (dict of lists) or an Arrow IPC stream body."},
+                status_code=400,
+            )
+
+    preds, version = await _run(_batch_in_worker, model_name, df)
+
+    accept = request.headers.get("accept", "")
+    if request.query_params.get("format") == "arrow" or ARROW_STREAM_MIMETYPE in accept:
+        return Response(
+            predictions_to_arrow_stream(preds),
+            media_type=ARROW_STREAM_MIMETYPE,
+            headers={"X-Model": model_name, "X-Model-Version": version, "X-Count": str(len(preds))},
+        )
+    return {
+        "model": model_name,
+        "predictions": [int(p) for p in preds],
+        "count": int(len(preds)),
+        "model_version": version,
+    }
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse without its disconnect listener: under ASGI < 2.4 that task
+    calls receive() concurrently and would steal the request body messages the
+    generator is still reading. A client that goes away surfaces as a send error.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@app.post("/v1/stream_predict/{model_name}")
+async def stream_predict(model_name: str, request: Request):
+    """NDJSON in, NDJSON out; each chunk of rows is scored in the pool as soon as it is parsed."""
+    chunker = NDJSONChunker(REGISTRY.feature_names(model_name), chunk_rows=int(STREAM_CFG.get("chunk_rows", 1000)))
+
+    async def generate():
+        async for data in request.stream():
+            for chunk in chunker.feed(data):
+                yield await _run(_stream_chunk_in_worker, model_name, chunk)
+        last = chunker.finish()
+        if last is not None:
+            yield await _run(_stream_chunk_in_worker, model_name, last)
+
+    return _DuplexStreamingResponse(generate(), media_type=NDJSON_MIMETYPE, headers={"X-Model": model_name})
+
+
+# --------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=REGISTRY.api_cfg.get("host", "127.0.0.1"),
+        port=int(ASGI_CFG.get("port", 8001)),
+    )
@@ -0,0 +1,305 @@
+# app/batch_score.py
+"""
+Offline bulk scoring straight from ModelRegistry, without going through the HTTP API.
+
+Reads CSV or Parquet in fixed-size chunks with pyarrow. Chunks are spread over a
+process pool, and each worker loads the model once. Each finished chunk is
+written to <out>/part-NNNNNN.parquet (row id + prediction) with an atomic rename,
+so the output directory reads as one Parquet dataset (pd.read_parquet(out)).
+
+--resume skips chunks whose part file already exists. It refuses to continue if
+the input (path, size, mtime, or a hash of its first and last MiB), chunk size,
+id column or model version differ from the run recorded in <out>/_manifest.json.
+
+Usage:
+    python -m app.batch_score data/raw/train.csv --model titanic --out artifacts/scores \\
+        --id-col PassengerId --chunk-rows 50000 --workers 4 [--resume]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+import preprocessing.schema as data_schema
+from app.utils.arrow_io import table_to_frame
+from app.utils.registry import ModelRegistry
+
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG_PATH = ROOT / "config" / "config.yaml"
+MANIFEST = "_manifest.json"
+ROW_COL = "row"  # id column written when --id-col is not given
+FINGERPRINT_BLOCK = 1 << 20  # bytes hashed from each end of the input
+
+
+# --------------------------------------------------------------------------------------
+# Reading
+# --------------------------------------------------------------------------------------
+def _csv_column_types(train_csv_path: str, schema_path: str = "") -> Dict[str, pa.DataType]:
+    """
+    Column types from the training data. The streaming CSV reader infers types
+    from its first block only, so a column that happens to be empty there
+    (Cabin, Age, ...) would otherwise break on a later block. The schema
+    manifest gives them without reading the training CSV; string columns stay
+    plain strings so chunks are scored like request frames.
+    """
+    if schema_path:
+        return data_schema.arrow_column_types(data_schema.load_schema(schema_path), dictionary=False)
+    schema = pacsv.read_csv(train_csv_path).schema
+    return {f.name: (pa.string() if pa.types.is_null(f.type) else f.type) for f in schema}
+
+
+def read_batches(path: Path, column_types: Optional[Dict[str, pa.DataType]] = None) -> Iterator[pa.RecordBatch]:
+    if path.suffix.lower() in (".parquet", ".pq"):
+        yield from pq.ParquetFile(str(path)).iter_batches()
+        return
+    reader = pacsv.open_csv(
+        str(path),
+        read_options=pacsv.ReadOptions(block_size=1 << 22),
+        # empty strings are missing values, as with pd.read_csv at training time
+        convert_options=pacsv.ConvertOptions(column_types=column_types or {}, strings_can_be_null=True),
+    )
+    yield from reader
+
+
+def iter_chunks(batches: Iterable[pa.RecordBatch], chunk_rows: int) -> Iterator[pa.Table]:
+    """Re-slice batches into tables of exactly chunk_rows rows (the last one may be shorter)."""
+    pending, n = [], 0
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+        pending.append(batch)
+        n += batch.num_rows
+        while n >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_rows)
+            rest = table.slice(chunk_rows)
+            pending, n = rest.to_batches(), rest.num_rows
+    if n:
+        yield pa.Table.from_batches(pending)
+
+
+def _to_ipc(table: pa.Table) -> bytes:
+    # IPC writes only the sliced rows; pickling a slice can ship its whole parent buffer.
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# --------------------------------------------------------------------------------------
+# Worker side (module-level so the process pool can pickle them)
+# --------------------------------------------------------------------------------------
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(config_path: str, model_name: str) -> None:
+    """Process-pool initializer: load the model once per worker."""
+    registry = ModelRegistry(config_path=Path(config_path))
+    _WORKER["lm"] = registry.get(model_name)
+
+
+def _score_chunk(index: int, start_row: int, ipc: bytes, id_col: Optional[str], out_dir: str) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    lm = _WORKER["lm"]
+    table = pa.ipc.open_stream(ipc).read_all()
+    preds = lm.predict_frame(table_to_frame(table, lm.feature_names))
+
+    if id_col:
+        ids = table.column(id_col)
+    else:
+        ids = pa.array(range(start_row, start_row + table.num_rows), pa.int64())
+    out = pa.table({id_col or ROW_COL: ids, "prediction": pa.array(preds).cast(pa.int64())})
+
+    final = Path(out_dir) / f"part-{index:06d}.parquet"
+    tmp = final.with_name(f".{final.name}.{os.getpid()}.tmp")
+    pq.write_table(out, str(tmp))
+    os.replace(tmp, final)
+    return {
+        "chunk": index,
+        "rows": table.num_rows,
+        "seconds": time.perf_counter() - t0,
+        "pid": os.getpid(),
+        "version": lm.version,
+    }
+
+
+# --------------------------------------------------------------------------------------
+# Driver
+# --------------------------------------------------------------------------------------
+def _input_fingerprint(path: Path) -> str:
+    """sha256 of the input's size, first and last FINGERPRINT_BLOCK bytes: cheap even for huge files."""
+    size = path.stat().st_size
+    h = hashlib.sha256(str(size).encode("utf-8"))
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_BLOCK))
+        if size > FINGERPRINT_BLOCK:
+            f.seek(max(FINGERPRINT_BLOCK, size - FINGERPRINT_BLOCK))
+            h.update(f.read(FINGERPRINT_BLOCK))
+    return h.hexdigest()[:16]
+
+
+def _check_manifest(out_dir: Path, manifest: Dict[str, Any], resume: bool, overwrite: bool) -> None:
+    path = out_dir / MANIFEST
+    if overwrite and out_dir.exists():
+        shutil.rmtree(out_dir)
+    if path.exists():
+        if not resume:
+            raise SystemExit(f"{out_dir} already holds a run; pass --resume to continue it or --overwrite.")
+        previous = json.loads(path.read_text(encoding="utf-8"))
+        changed = [k for k in manifest if previous.get(k) != manifest[k]]
+        if changed:
+            raise SystemExit(f"Cannot resume {out_dir}: {', '.join(changed)} changed since the last run.")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def score_file(
+    input_path: Path,
+    model_name: str,
+    out_dir: Path,
+    id_col: Optional[str] = None,
+    chunk_rows: int = 50000,
+    workers: int = 0,
+    resume: bool = False,
+    overwrite: bool = False,
+    config_path: Path = CONFIG_PATH,
+    start_method: str = "spawn",
+) -> Dict[str, Any]:
+    """
+    Score input_path into out_dir and return a report with per-worker rows/sec.
+    workers=0 scores in this process (no pool).
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be >= 1")
+    registry = ModelRegistry(config_path=config_path)
+    version = registry.artifact_version(model_name)
+    manifest = {
+        "input": str(input_path.resolve()),
+        "input_size": input_path.stat().st_size,
+        "input_mtime_ns": input_path.stat().st_mtime_ns,  # catches a same-size rewrite
+        "input_fingerprint": _input_fingerprint(input_path),  # ...and a copy with the same mtime
+        "model": model_name,
+        "model_version": version,
+        "chunk_rows": chunk_rows,
+        "id_col": id_col,
+    }
+    _check_manifest(out_dir, manifest, resume, overwrite)
+
+    column_types = None
+    if input_path.suffix.lower() not in (".parquet", ".pq"):
+        info = registry.list_models()[model_name]
+        column_types = _csv_column_types(info["train_csv_path"], info["schema_path"])
+
+    if workers > 0:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(str(config_path), model_name),
+        )
+    else:
+        pool = None
+        _init_worker(str(config_path), model_name)
+
+    per_worker: Dict[int, Dict[str, float]] = {}
+    skipped = 0
+    t0 = time.perf_counter()
+
+    def _collect(result: Dict[str, Any]) -> None:
+        if result["version"] != version:
+            raise RuntimeError(
+                f"Model '{model_name}' changed during the run ({version} -> {result['version']}); "
+                f"rerun with --resume after it settles."
+            )
+        w = per_worker.setdefault(result["pid"], {"chunks": 0, "rows": 0, "seconds": 0.0})
+        w["chunks"] += 1
+        w["rows"] += result["rows"]
+        w["seconds"] += result["seconds"]
+
+    in_flight = set()
+    try:
+        start_row = 0
+        for index, table in enumerate(iter_chunks(read_batches(input_path, column_types), chunk_rows)):
+            if id_col and id_col not in table.column_names:
+                raise ValueError(f"id column '{id_col}' not found in {input_path.name}")
+            if resume and (out_dir / f"part-{index:06d}.parquet").exists():
+                skipped += 1
+            else:
+                job = (index, start_row, _to_ipc(table), id_col, str(out_dir))
+                if pool is None:
+                    _collect(_score_chunk(*job))
+                else:
+                    in_flight.add(pool.submit(_score_chunk, *job))
+                    # bounded read-ahead: never hold more than 2 chunks per worker
+                    if len(in_flight) >= 2 * workers:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for f in done:
+                            _collect(f.result())
+            start_row += table.num_rows
+        for f in in_flight:
+            _collect(f.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    wall = time.perf_counter() - t0
+    rows = sum(w["rows"] for w in per_worker.values())
+    for w in per_worker.values():
+        w["rows_per_sec"] = w["rows"] / w["seconds"] if w["seconds"] else 0.0
+    return {
+        "model": model_name,
+        "model_version": version,
+        "out": str(out_dir),
+        "rows_scored": rows,
+        "chunks_scored": sum(int(w["chunks"]) for w in per_worker.values()),
+        "chunks_skipped": skipped,
+        "wall_sec": wall,
+        "rows_per_sec": rows / wall if wall else 0.0,
+        "workers": per_worker,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("input", type=Path, help="CSV or Parquet file")
+    ap.add_argument("--model", default="titanic")
+    ap.add_argument("--out", type=Path, required=True, help="output directory of Parquet parts")
+    ap.add_argument("--id-col", default=None, help=f"input column copied next to each prediction (default: '{ROW_COL}' = row number)")
+    ap.add_argument("--chunk-rows", type=int, default=50000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 = score in this process")
+    ap.add_argument("--start-method", default="spawn", choices=["spawn", "forkserver", "fork"])
+    ap.add_argument("--config", type=Path, default=CONFIG_PATH)
+    ap.add_argument("--resume", action="store_true", help="skip chunks already written to --out")
+    ap.add_argument("--overwrite", action="store_true", help="delete --out before starting")
+    args = ap.parse_args()
+
+    report = score_file(
+        args.input, args.model, args.out,
+        id_col=args.id_col, chunk_rows=args.chunk_rows, workers=args.workers,
+        resume=args.resume, overwrite=args.overwrite, config_path=args.config,
+        start_method=args.start_method,
+    )
+
+    print(f"[batch_score] {report['rows_scored']} rows in {report['chunks_scored']} chunks "
+          f"({report['chunks_skipped']} skipped) in {report['wall_sec']:.2f}s "
+          f"= {report['rows_per_sec']:.0f} rows/s -> {report['out']}")
+    print(f"{'worker pid':>10} {'chunks':>7} {'rows':>10} {'busy s':>8} {'rows/s':>10}")
+    for pid, w in sorted(report["workers"].items()):
+        print(f"{pid:>10} {int(w['chunks']):>7} {int(w['rows']):>10} {w['seconds']:>8.2f} {w['rows_per_sec']:>10.0f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
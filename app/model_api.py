@@ -1,13 +1,43 @@
 # app/model_api.py
 from __future__ import annotations
 
+from contextlib import ExitStack, nullcontext
+import functools
 from pathlib import Path
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from werkzeug.exceptions import HTTPException
+import threading
+import time
 import traceback
+import numpy as np
 import pandas as pd
 
-from app.utils.registry import ModelRegistry
+from app.utils import tracing
+from app.utils.admission import AdmissionController, Overloaded
+from app.utils.arrow_io import (
+    ARROW_STREAM_MIMETYPE,
+    columns_to_frame,
+    predictions_to_arrow_stream,
+    read_arrow_stream,
+)
+from app.utils.batcher import MicroBatcher
+from app.utils.dedup import Deduplicator
+from app.utils.fanout import FanOutScorer
+from app.utils.metrics import (
+    NULL_TIMER,
+    register_admission,
+    register_model_registry,
+    render_latest,
+    shadow_recorder,
+    stage_timer,
+)
+from app.utils.ndjson_stream import NDJSON_MIMETYPE, NDJSONChunker, iter_chunks, score_chunk
+from app.utils.payload import flex_build_one_row, row_to_df
+from app.utils.pred_cache import PredictionCache, row_key
+from app.utils.profiling import RequestProfiler
+from app.utils.registry import ModelNotFound, ModelRegistry
+from app.utils.shadow import ShadowEvaluator
+from app.utils.typed_io import BatchResponse, PayloadError, PredictResponse, encode
 
 # --------------------------------------------------------------------------------------
 # Setup
@@ -15,106 +45,405 @@ from app.utils.registry import ModelRegistry
 ROOT = Path(__file__).resolve().parent.parent
 REGISTRY = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
 
-app = Flask(__name__)
+# Optional eager startup: load + warm every model in parallel; /health is 503 until done.
+_WARMUP_CFG = REGISTRY.api_cfg.get("warmup") or {}
+if _WARMUP_CFG.get("enabled", False):
+    REGISTRY.start_warmup(max_workers=_WARMUP_CFG.get("max_workers"))
+
+# Optional hot reload: poll artifacts and swap in new versions without a restart.
+_RELOAD_CFG = REGISTRY.api_cfg.get("hot_reload") or {}
+if _RELOAD_CFG.get("enabled", False):
+    REGISTRY.start_watcher(interval_sec=float(_RELOAD_CFG.get("poll_interval_sec", 5)))
+
+_STREAM_CFG = REGISTRY.api_cfg.get("stream") or {}
+
+# Per-stage latency histograms + registry counters on /metrics.
+_METRICS_ON = bool((REGISTRY.api_cfg.get("metrics") or {}).get("enabled", True))
+register_model_registry(REGISTRY)
+
+# /v1/fanout_predict: one payload, several models, one transform per distinct preprocessor.
+_FANOUT_CFG = REGISTRY.api_cfg.get("fanout") or {}
+_FANOUT = FanOutScorer(max_workers=int(_FANOUT_CFG.get("max_workers", 4)))
+
+# Opt-in per-request cProfile: ?profile=1 / X-Profile: 1, or every Nth request into rolling aggregates.
+_PROFILING_CFG = REGISTRY.api_cfg.get("profiling") or {}
+_PROFILER = RequestProfiler(
+    out_dir=ROOT / _PROFILING_CFG.get("dir", "artifacts/profiles"),
+    token=_PROFILING_CFG.get("token"),
+    sample_every=int(_PROFILING_CFG.get("sample_every", 0)),
+    window=int(_PROFILING_CFG.get("aggregate_window", 100)),
+    keep=int(_PROFILING_CFG.get("keep", 50)),
+) if _PROFILING_CFG.get("enabled", False) else None
+
+# Opt-in OpenTelemetry spans (request, registry.get/load, stages, candidates) to a local file.
+tracing.configure(REGISTRY.api_cfg.get("tracing") or {}, ROOT)
 
-# Minimal vs full Titanic raw schemas
-MINIMAL_FEATURES = ["Pclass", "Sex", "Age", "Fare"]
-FULL_TITANIC_FEATURES = [
-    "PassengerId", "Pclass", "Name", "Sex", "Age", "SibSp",
-    "Parch", "Ticket", "Fare", "Cabin", "Embarked",
-]
+app = Flask(__name__)
 
 # --------------------------------------------------------------------------------------
 # Helpers
 # --------------------------------------------------------------------------------------
-def _normalize_minimal_dict(d: dict) -> dict:
-    """Ensure minimal dict uses consistent types/values."""
-    out = dict(d)
-    # Sex can be 0/1 or string
-    sex = out.get("Sex")
-    if isinstance(sex, (int, float)):
-        out["Sex"] = "male" if int(sex) == 0 else "female"
-    elif isinstance(sex, str):
-        s = sex.strip().lower()
-        if s in ("0", "male", "m"):
-            out["Sex"] = "male"
-        elif s in ("1", "female", "f"):
-            out["Sex"] = "female"
-        else:
-            out["Sex"] = s
+_PLAN = threading.local()  # execution plan of the last model call on this request thread
+
+
+def _predict_frame(lm, df: pd.DataFrame, timer=NULL_TIMER):
+    """
+    Predict a DataFrame with either pipeline or (preproc + model): inline for
+    small batches, in row chunks across threads for large ones (lm.exec_policy).
+    """
+    policy = lm.exec_policy
+    if policy is None:
+        return _predict_frame_inline(lm, df, timer)
+    preds, plan = policy.run(df, lambda frame: _predict_frame_inline(lm, frame, timer), chunk_fn=lm.predict_frame)
+    if plan["mode"] == "parallel":
+        timer.mark("predict")  # transform + predict of every chunk, across threads
+    _PLAN.last = plan
+    return preds
+
+
+def _predict_frame_inline(lm, df: pd.DataFrame, timer=NULL_TIMER):
+    if not timer.enabled:
+        return lm.predict_frame(df)
+    X = lm.transform_frame(df)
+    timer.mark("transform")
+    preds = lm.predict_transformed(X)
+    timer.mark("predict")
+    return preds
+
+
+def _predict_one(lm, df: pd.DataFrame, timer=NULL_TIMER) -> int:
+    """Predict a single row DataFrame, through the model's micro-batcher if enabled."""
+    batcher = _get_batcher(lm.name)
+    if batcher is not None:
+        y = int(batcher.predict(lm, df))
+        timer.mark("predict")  # queue wait + the grouped transform/predict
+        return y
+    return int(_predict_frame(lm, df, timer)[0])
+
+
+def _predict_row(lm, row: dict, timer=NULL_TIMER) -> int:
+    """
+    Score one row dict: cache, then the micro-batcher when batching is on, else
+    the compiled NumPy path when available, else sklearn.
+    """
+    cache = _get_cache(lm)
+    key = None
+    # Only full rows (reindexed to feature_names) are cacheable; probe shapes are not.
+    if cache is not None and len(row) == len(lm.feature_names):
+        key = row_key(row.values())
+        y = cache.get(key)
+        timer.mark("cache")
+        if y is not None:
+            return y
+
+    if lm.compiled is not None and _get_batcher(lm.name) is None:
+        x = lm.compiled.transform_one(row)
+        timer.mark("transform")
+        y = int(lm.compiled.forest.predict_one(x))
+        timer.mark("predict")
     else:
-        out["Sex"] = "male"  # safe default
-
-    # Light coercion
-    out["Pclass"] = int(out.get("Pclass", 3) or 3)
-    out["Age"] = float(out.get("Age", 0) or 0)
-    out["Fare"] = float(out.get("Fare", 0) or 0)
-    return out
-
-
-def _expand_minimal_to_full(mini: dict) -> dict:
-    mini = _normalize_minimal_dict(mini)
-    return {
-        "PassengerId": 0,
-        "Pclass": mini["Pclass"],
-        "Name": "",
-        "Sex": mini["Sex"],
-        "Age": mini["Age"],
-        "SibSp": 0,
-        "Parch": 0,
-        "Ticket": "",
-        "Fare": mini["Fare"],
-        "Cabin": "",
-        "Embarked": "S",
-    }
-
-
-def _flex_build_one_row_df(features, feature_names: list[str]):
-    """
-    Accept dict or list. Robust to both 4-col and full 11-col requests.
-    - dict: if exactly minimal keys, expand to full; else reindex to model's feature_names.
-    - list: if length == model feature count, use directly; if length==4, return two candidates.
-    """
-    # dict payload
-    if isinstance(features, dict):
-        f = features
-        if set(f.keys()) == set(MINIMAL_FEATURES):
-            f = _expand_minimal_to_full(f)
-        return pd.DataFrame([f]).reindex(columns=feature_names)
-
-    # list payload
-    if isinstance(features, list):
-        if len(features) == len(feature_names):
-            return pd.DataFrame([features], columns=feature_names)
-
-        if len(features) == 4:
-            mini = dict(zip(MINIMAL_FEATURES, features))
-            mini_full = _expand_minimal_to_full(mini)
-            df_minimal = pd.DataFrame([mini]).reindex(
-                columns=[c for c in feature_names if c in MINIMAL_FEATURES]
-            )
-            df_full = pd.DataFrame([mini_full]).reindex(columns=feature_names)
-            return {"_candidates": [df_minimal, df_full]}
-
-        raise ValueError(
-            f"Feature length mismatch. Got {len(features)} items; "
-            f"expected {len(feature_names)} or 4 (minimal)."
-        )
+        y = _predict_one(lm, row_to_df(row), timer)
+
+    if key is not None:
+        cache.put(key, y)
+    return y
+
 
-    raise ValueError("features must be a dict or list")
+def _predict_frame_dedup(lm, df: pd.DataFrame, timer=NULL_TIMER):
+    """Batch predict that scores each distinct row once; returns (preds, dedup info)."""
+    dedup = _get_dedup(lm.name)
+    if dedup is None:
+        return _predict_frame(lm, df, timer), None
 
+    def predict_fn(frame):
+        timer.mark("dedup")  # row hashing + unique
+        return _predict_frame(lm, frame, timer)
 
-def _predict_one(lm, df: pd.DataFrame) -> int:
-    """Predict a single row DataFrame with either pipeline or (preproc + model)."""
-    if lm.is_pipeline:
-        return int(lm.obj.predict(df)[0])
-    X = lm.fallback_preprocessor.transform(df)
-    return int(lm.obj.predict(X)[0])
+    return dedup.predict(df, predict_fn)
+
+
+def _predict_frame_cached(lm, df: pd.DataFrame, timer=NULL_TIMER):
+    """
+    Batch predict that serves cached rows and sends only the (deduplicated) misses
+    to the model. Returns (preds, dedup info for the rows that reached the model).
+    """
+    cache = _get_cache(lm)
+    if cache is None:
+        return _predict_frame_dedup(lm, df, timer)
+
+    keys = [row_key(r) for r in df.itertuples(index=False, name=None)]
+    out = [cache.get(k) for k in keys]
+    miss = [i for i, y in enumerate(out) if y is None]
+    timer.mark("cache")
+    info = None
+    if miss:
+        preds, info = _predict_frame_dedup(lm, df.iloc[miss], timer)
+        for i, y in zip(miss, preds):
+            y = y.item() if hasattr(y, "item") else y
+            out[i] = y
+            cache.put(keys[i], y)
+    return np.asarray(out), info
+
+
+# --------------------------------------------------------------------------------------
+# Micro-batching (opt-in per model via `batching:` in config.yaml)
+# --------------------------------------------------------------------------------------
+_BATCHERS: dict[str, MicroBatcher | None] = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def _get_batcher(model_name: str) -> MicroBatcher | None:
+    """Return the model's batcher, creating it on first use; None if batching is off."""
+    if model_name in _BATCHERS:
+        return _BATCHERS[model_name]
+    with _BATCHERS_LOCK:
+        if model_name not in _BATCHERS:
+            cfg = REGISTRY.model_config(model_name).get("batching") or {}
+            if cfg.get("enabled", False):
+                _BATCHERS[model_name] = MicroBatcher(
+                    name=model_name,
+                    predict_fn=_predict_frame,
+                    max_batch_size=int(cfg.get("max_batch_size", 32)),
+                    max_wait_ms=float(cfg.get("max_wait_ms", 2.0)),
+                )
+            else:
+                _BATCHERS[model_name] = None
+        return _BATCHERS[model_name]
+
+
+# --------------------------------------------------------------------------------------
+# Prediction cache (opt-in per model via `cache:` in config.yaml)
+# --------------------------------------------------------------------------------------
+_CACHES: dict[str, PredictionCache | None] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def _get_cache(lm) -> PredictionCache | None:
+    """Return the model's cache bound to this LoadedModel; None if caching is off."""
+    if lm.name not in _CACHES:
+        with _CACHES_LOCK:
+            if lm.name not in _CACHES:
+                cfg = REGISTRY.model_config(lm.name).get("cache") or {}
+                _CACHES[lm.name] = PredictionCache(
+                    max_entries=int(cfg.get("max_entries", 10000)),
+                    ttl_sec=cfg.get("ttl_sec"),
+                ) if cfg.get("enabled", False) else None
+    cache = _CACHES[lm.name]
+    if cache is not None:
+        cache.bind(lm)  # a different LoadedModel means the model changed: start empty
+    return cache
+
+
+# --------------------------------------------------------------------------------------
+# Duplicate-row collapsing for batches (per model via `dedup:` in config.yaml, default auto)
+# --------------------------------------------------------------------------------------
+_DEDUPS: dict[str, Deduplicator | None] = {}
+_DEDUPS_LOCK = threading.Lock()
+
+
+def _get_dedup(model_name: str) -> Deduplicator | None:
+    """Return the model's row deduplicator; None if mode is off."""
+    if model_name in _DEDUPS:
+        return _DEDUPS[model_name]
+    with _DEDUPS_LOCK:
+        if model_name not in _DEDUPS:
+            cfg = REGISTRY.model_config(model_name).get("dedup") or {}
+            mode = cfg.get("mode", "auto")
+            mode = {True: "on", False: "off"}.get(mode, mode)  # YAML reads bare on/off as booleans
+            _DEDUPS[model_name] = Deduplicator(
+                mode=mode,
+                min_duplicate_fraction=float(cfg.get("min_duplicate_fraction", 0.05)),
+                min_rows=int(cfg.get("min_rows", 16)),
+            ) if mode != "off" else None
+        return _DEDUPS[model_name]
+
+
+# --------------------------------------------------------------------------------------
+# Shadow evaluation (per model via `shadow:` in config.yaml)
+# --------------------------------------------------------------------------------------
+_SHADOWS: dict[str, ShadowEvaluator | None] = {}
+_SHADOWS_LOCK = threading.Lock()
+
+
+def _get_shadow(model_name: str) -> ShadowEvaluator | None:
+    """Return the model's shadow evaluator, creating it on first use; None if not configured."""
+    if model_name in _SHADOWS:
+        return _SHADOWS[model_name]
+    with _SHADOWS_LOCK:
+        if model_name not in _SHADOWS:
+            cfg = REGISTRY.model_config(model_name).get("shadow") or {}
+            shadow = cfg.get("model")
+            if shadow and not REGISTRY.model_config(shadow):
+                print(f"[shadow] '{model_name}' names unknown shadow model '{shadow}'; shadowing disabled.")
+                shadow = None
+            _SHADOWS[model_name] = ShadowEvaluator(
+                primary=model_name,
+                shadow=shadow,
+                get_model=REGISTRY.get,
+                queue_size=int(cfg.get("queue_size", 1000)),
+                max_batch_size=int(cfg.get("max_batch_size", 64)),
+                max_wait_ms=float(cfg.get("max_wait_ms", 50)),
+                sample_rate=float(cfg.get("sample_rate", 1.0)),
+                on_result=shadow_recorder(model_name, shadow) if _METRICS_ON else None,
+            ) if shadow else None
+        return _SHADOWS[model_name]
+
+
+# --------------------------------------------------------------------------------------
+# Admission control (per model via `admission:` in config.yaml)
+# --------------------------------------------------------------------------------------
+_ADMISSION: dict[str, AdmissionController | None] = {}
+_ADMISSION_LOCK = threading.Lock()
+
+
+def _get_admission(model_name: str) -> AdmissionController | None:
+    """
+    Return the model's admission controller; None if admission control is off or
+    the model is not configured (nothing is cached for names taken from the URL).
+    """
+    if model_name in _ADMISSION:
+        return _ADMISSION[model_name]
+    model_cfg = REGISTRY.model_config(model_name)
+    if not model_cfg:
+        return None  # the view's REGISTRY.get answers 404
+    with _ADMISSION_LOCK:
+        if model_name not in _ADMISSION:
+            cfg = model_cfg.get("admission") or {}
+            _ADMISSION[model_name] = AdmissionController(
+                model=model_name,
+                max_concurrent=int(cfg.get("max_concurrent", 4)),
+                max_queue=int(cfg.get("max_queue", 16)),
+                queue_timeout_ms=float(cfg.get("queue_timeout_ms", 1000)),
+                batch_rows_per_slot=int(cfg.get("batch_rows_per_slot", 1000)),
+            ) if cfg.get("enabled", False) else None
+        return _ADMISSION[model_name]
+
+
+def _traced(endpoint: str):
+    """
+    Root span per request when tracing is on, tagged with model and HTTP status.
+    4xx/5xx answers, including raised errors turned into responses by the error
+    handlers below, mark the span as an error with the response's message.
+    """
+    def deco(view):
+        @functools.wraps(view)
+        def wrapper(model_name: str):
+            if not tracing.enabled():
+                return view(model_name)
+            with tracing.request_span(f"POST /v1/{endpoint}", model=model_name, endpoint=endpoint) as sp:
+                try:
+                    resp = app.make_response(view(model_name))
+                except Exception as e:
+                    resp = app.make_response(app.handle_user_exception(e))
+                sp.set_attribute("http.status_code", resp.status_code)
+                if resp.status_code >= 400:
+                    body = resp.get_json(silent=True) if resp.is_json else None
+                    tracing.set_error((body or {}).get("error") or f"HTTP {resp.status_code}")
+                return resp
+        return wrapper
+    return deco
+
+
+def _timed(endpoint: str):
+    """
+    Per-request StageTimer (g.timer, traced when tracing is on), recorded once in
+    `finally` so every answer counts: 4xx, 429 from the admission gate and raised
+    errors included. The status label is the HTTP status code; views set g.rows.
+    Unknown model names get no timer, so URLs can't create label series.
+    """
+    def deco(view):
+        @functools.wraps(view)
+        def wrapper(model_name: str):
+            known = bool(REGISTRY.model_config(model_name))
+            timer = g.timer = tracing.wrap_timer(stage_timer(model_name, endpoint, _METRICS_ON and known))
+            g.rows = 0
+            status = 500
+            try:
+                try:
+                    resp = app.make_response(view(model_name))
+                except Exception as e:
+                    resp = app.make_response(app.handle_user_exception(e))
+                status = resp.status_code
+                return resp
+            finally:
+                timer.done(str(status), rows=g.rows)
+        return wrapper
+    return deco
+
+
+def _profiled(endpoint: str):
+    """Run the request under cProfile when asked for (or sampled); link the report."""
+    def deco(view):
+        @functools.wraps(view)
+        def wrapper(model_name: str):
+            if _PROFILER is None:
+                return view(model_name)
+            requested = request.args.get("profile") == "1" or request.headers.get("X-Profile") == "1"
+            try:
+                mode = _PROFILER.mode(requested, request.headers.get("X-Profile-Token"))
+            except PermissionError as e:
+                return jsonify(error=str(e)), 403
+            if mode is None:
+                return view(model_name)
+            resp, profile_id = _PROFILER.run(lambda: app.make_response(view(model_name)), model_name, endpoint, mode)
+            if profile_id is not None:
+                resp.headers["X-Profile-Url"] = f"/v1/profiles/{profile_id}"
+            elif mode == "explicit":
+                resp.headers["X-Profile-Skipped"] = "busy"  # another request was being profiled
+            return resp
+        return wrapper
+    return deco
+
+
+def _admission_gate(view):
+    """
+    Reject before the body is read when the model already has too many requests in line.
+    A streamed response keeps its place until the stream is closed, since its rows
+    are read and scored after the view has returned.
+    """
+    @functools.wraps(view)
+    def wrapper(model_name: str):
+        admission = _get_admission(model_name)
+        if admission is None:
+            return view(model_name)
+        gate = ExitStack()
+        gate.enter_context(admission.gate())
+        try:
+            resp = view(model_name)
+        except BaseException:
+            gate.close()
+            raise
+        if isinstance(resp, Response) and resp.is_streamed:
+            resp.call_on_close(gate.close)
+        else:
+            gate.close()
+        return resp
+    return wrapper
+
+
+def _admit(admission: AdmissionController | None, rows: int = 1, wait: bool = False):
+    """Context holding the request's inference slots; raises Overloaded (-> 429)."""
+    return admission.slot(rows, wait) if admission is not None else nullcontext()
+
+
+register_admission(lambda: {name: a.stats() for name, a in list(_ADMISSION.items()) if a is not None})
 
 
 # --------------------------------------------------------------------------------------
 # Error handling
 # --------------------------------------------------------------------------------------
+@app.errorhandler(Overloaded)
+def handle_overloaded(e):
+    resp = jsonify(error=str(e), reason=e.reason, retry_after_sec=e.retry_after_sec)
+    resp.headers["Retry-After"] = str(e.retry_after_sec)
+    return resp, 429
+
+
+@app.errorhandler(ModelNotFound)
+def handle_model_not_found(e):
+    return jsonify(error=str(e)), 404
+
+
 @app.errorhandler(Exception)
 def handle_exception(e):
     if isinstance(e, HTTPException):
@@ -128,15 +457,43 @@ def handle_exception(e):
 # --------------------------------------------------------------------------------------
 @app.get("/health")
 def health():
+    ready = REGISTRY.ready
     return jsonify(
-        status="ok",
+        status="ok" if ready else "warming",
+        ready=ready,
         models=list(REGISTRY.list_models().keys()),
-    )
+    ), (200 if ready else 503)
 
 
 @app.get("/v1/models")
 def list_models():
-    return jsonify(REGISTRY.list_models())
+    models = REGISTRY.list_models()
+    for name, info in models.items():
+        batcher = _BATCHERS.get(name)
+        info["batching"] = batcher.stats() if batcher is not None else None
+        cache = _CACHES.get(name)
+        info["cache"] = cache.stats() if cache is not None else None
+        dedup = _DEDUPS.get(name)
+        info["dedup"] = dedup.stats() if dedup is not None else None
+        shadow = _SHADOWS.get(name)
+        info["shadow"] = shadow.stats() if shadow is not None else None
+        admission = _ADMISSION.get(name)
+        info["admission"] = admission.stats() if admission is not None else None
+        lm = REGISTRY.peek(name)
+        info["parallel"] = lm.exec_policy.stats() if lm is not None and lm.exec_policy else None
+        info["payload"] = lm.payload_adapter.stats() if lm is not None and lm.payload_adapter else None
+    return jsonify(models)
+
+
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_latest()
+    return Response(body, content_type=content_type)
+
+
+@app.get("/v1/registry")
+def registry_stats():
+    return jsonify({**REGISTRY.stats(), "fanout": _FANOUT.stats()})
 
 
 @app.get("/v1/schema/<model_name>")
@@ -146,6 +503,7 @@ def schema(model_name: str):
         model=model_name,
         expected_raw_features=lm.feature_names,
         is_pipeline=lm.is_pipeline,
+        model_version=lm.version,
     )
 
 
@@ -153,30 +511,70 @@ def schema(model_name: str):
 # Prediction (single)
 # --------------------------------------------------------------------------------------
 @app.post("/v1/predict/<model_name>")
+@_traced("predict")
+@_timed("predict")
+@_admission_gate
+@_profiled("predict")
 def predict(model_name: str):
+    admission = _get_admission(model_name)
     lm = REGISTRY.get(model_name)
-    data = request.get_json(silent=True) or {}
-    if "features" not in data:
+    tracing.set_attributes(model_version=lm.version, batch_size=1)
+    timer = g.timer
+    if lm.codec is not None:
+        # typed decode: validated + coerced in one pass, bad bodies never reach pandas
+        try:
+            features = lm.codec.decode_features(request.get_data())
+        except PayloadError as e:
+            return jsonify(error=f"Invalid payload: {e}"), 400
+    else:
+        features = (request.get_json(silent=True) or {}).get("features")
+    timer.mark("decode")
+    if features is None:
         return jsonify(error="Missing 'features'"), 400
 
-    built = _flex_build_one_row_df(data["features"], lm.feature_names)
+    # The payload adapter knows which 4-item shape this model takes (resolved at load).
+    try:
+        if lm.payload_adapter is not None:
+            built = lm.payload_adapter.build(features)
+        else:
+            built = flex_build_one_row(features, lm.feature_names)
+    except ValueError as e:  # wrong feature count / type on the generic path
+        return jsonify(error=f"Invalid payload: {e}"), 400
 
-    # If two candidate shapes were returned (for 4-item list), try both
-    candidates = built["_candidates"] if isinstance(built, dict) and "_candidates" in built else [built]
+    # If two candidate shapes were returned (shape unresolved), try both
+    candidates = built["_candidates"] if "_candidates" in built else [built]
+    timer.mark("build")
 
     last_err = None
-    for df in candidates:
-        try:
-            y = _predict_one(lm, df)
-            return jsonify(
-                model=model_name,
-                prediction=y,
-                model_loaded_sec=lm.loaded_sec,
-                is_pipeline=lm.is_pipeline,
-            )
-        except Exception as e:
-            last_err = str(e)
-            continue
+    with _admit(admission):
+        timer.mark("admission")  # time spent queued for a slot
+        t0 = time.perf_counter()
+        for i, row in enumerate(candidates):
+            try:
+                with tracing.span("predict.candidate", candidate=i, candidates=len(candidates)):
+                    y = _predict_row(lm, row, timer)
+                lm.mark_prediction()
+                shadow = _get_shadow(model_name)
+                if shadow is not None:
+                    shadow.submit(row, y, time.perf_counter() - t0)  # non-blocking, dropped if full
+                out = dict(
+                    model=model_name,
+                    prediction=y,
+                    model_loaded_sec=lm.loaded_sec,
+                    is_pipeline=lm.is_pipeline,
+                    compiled=lm.compiled is not None,
+                    model_version=lm.version,
+                )
+                if lm.codec is not None:
+                    resp = Response(encode(PredictResponse(**out)), mimetype="application/json")
+                else:
+                    resp = jsonify(**out)
+                timer.mark("encode")
+                g.rows = 1
+                return resp
+            except Exception as e:
+                last_err = str(e)
+                continue
 
     return jsonify(error=f"All candidate shapes failed. Last error: {last_err}"), 500
 
@@ -185,35 +583,290 @@ def predict(model_name: str):
 # Prediction (batch)
 # --------------------------------------------------------------------------------------
 @app.post("/v1/batch_predict/<model_name>")
+@_traced("batch_predict")
+@_timed("batch_predict")
+@_admission_gate
+@_profiled("batch_predict")
 def batch_predict(model_name: str):
     """
     Accept JSON with either:
     - {"rows": [ {col:value, ...}, ... ]}  (list of dicts)
     - {"matrix": [ [..], [..] ]}           (list of lists, must match feature order)
+    - {"columns": {col: [..], ...}}        (column-oriented, equal-length lists)
+    or an Arrow IPC stream body (Content-Type: application/vnd.apache.arrow.stream).
+
+    Predictions come back as JSON, or as a one-column Arrow IPC stream when the
+    client sends `Accept: application/vnd.apache.arrow.stream` or `?format=arrow`.
     """
+    admission = _get_admission(model_name)
     lm = REGISTRY.get(model_name)
-    data = request.get_json(silent=True) or {}
+    timer = g.timer
 
-    if "rows" in data:
-        df = pd.DataFrame(data["rows"]).reindex(columns=lm.feature_names)
-    elif "matrix" in data:
-        df = pd.DataFrame(data["matrix"], columns=lm.feature_names)
+    if request.mimetype == ARROW_STREAM_MIMETYPE:
+        body = request.get_data(cache=False)
+        timer.mark("decode")
+        try:
+            df = read_arrow_stream(body, lm.feature_names)
+        except ValueError as e:
+            return jsonify(error=f"Invalid payload: {e}"), 400
     else:
-        return jsonify(error="Provide either 'rows' (list of dicts) or 'matrix' (list of lists)."), 400
-
-    if lm.is_pipeline:
-        preds = lm.obj.predict(df)
+        if lm.codec is not None:
+            try:
+                form, payload = lm.codec.decode_batch(request.get_data())
+            except PayloadError as e:
+                return jsonify(error=f"Invalid payload: {e}"), 400
+        else:
+            data = request.get_json(silent=True) or {}
+            form = next((k for k in ("rows", "matrix", "columns") if k in data), None)
+            payload = data.get(form)
+        timer.mark("decode")
+        if form == "rows":
+            df = pd.DataFrame(payload).reindex(columns=lm.feature_names)
+        elif form == "matrix":
+            df = pd.DataFrame(payload, columns=lm.feature_names)
+        elif form == "columns":
+            try:
+                df = columns_to_frame(payload, lm.feature_names)
+            except ValueError as e:
+                return jsonify(error=f"Invalid payload: {e}"), 400
+        else:
+            return jsonify(
+                error="Provide 'rows' (list of dicts), 'matrix' (list of lists), "
+                      "'columns' (dict of lists) or an Arrow IPC stream body."
+            ), 400
+    timer.mark("build")
+    tracing.set_attributes(model_version=lm.version, batch_size=len(df))
+
+    t0 = time.perf_counter()
+    _PLAN.last = None  # stays None when every row came from the cache
+    with _admit(admission, rows=len(df)):  # weighted by row count
+        timer.mark("admission")  # time spent queued for slots
+        preds, dedup = _predict_frame_cached(lm, df, timer)
+    plan = _PLAN.last
+    if plan is not None:
+        tracing.set_attributes(plan=plan["mode"], chunks=plan["chunks"])
+    lm.mark_prediction()
+    shadow = _get_shadow(model_name)
+    if shadow is not None:
+        shadow.submit(df, preds, time.perf_counter() - t0)
+
+    if _wants_arrow():
+        headers = {"X-Model": model_name, "X-Model-Version": lm.version, "X-Count": str(len(preds))}
+        if dedup is not None and dedup["dedup_ratio"] is not None:
+            headers["X-Dedup-Ratio"] = f"{dedup['dedup_ratio']:.4f}"
+        if plan is not None:
+            headers["X-Execution-Plan"] = f"{plan['mode']};chunks={plan['chunks']};workers={plan['workers']}"
+        resp = Response(predictions_to_arrow_stream(preds), mimetype=ARROW_STREAM_MIMETYPE, headers=headers)
     else:
-        X = lm.fallback_preprocessor.transform(df)
-        preds = lm.obj.predict(X)
+        out = dict(
+            model=model_name,
+            predictions=[int(p) for p in preds],
+            count=int(len(preds)),
+            model_version=lm.version,
+            dedup=dedup,
+            plan=plan,
+        )
+        if lm.codec is not None:
+            resp = Response(encode(BatchResponse(**out)), mimetype="application/json")
+        else:
+            resp = jsonify(**out)
+    timer.mark("encode")
+    g.rows = len(preds)
+    return resp
+
 
+@app.post("/v1/fanout_predict")
+def fanout_predict():
+    """
+    Score one payload with several models:
+    {"models": ["a", "b"], "features": {...}}   one row, built per model like /v1/predict
+    {"models": ["a", "b"], "rows": [{...}, ...]} a batch, like /v1/batch_predict rows
+    "models" defaults to every configured model. Models whose fitted preprocessors
+    are identical share one transform; estimators run concurrently.
+
+    Each model goes through its own admission control (a model over its limit
+    gets a 429 entry, the others are still scored) and is timed on /metrics
+    under endpoint "fanout_predict".
+    """
+    data = request.get_json(silent=True) or {}
+    names = data.get("models") or list(REGISTRY.list_models().keys())
+    if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+        return jsonify(error="'models' must be a list of model names."), 400
+    unknown = [n for n in names if not REGISTRY.model_config(n)]
+    if unknown:
+        return jsonify(error=f"Unknown model(s): {', '.join(unknown)}"), 404
+    if "features" in data:
+        features = data["features"]
+        n_rows = 1
+
+        def build_frames(lm):
+            built = lm.payload_adapter.build(features) if lm.payload_adapter is not None \
+                else flex_build_one_row(features, lm.feature_names)
+            candidates = built["_candidates"] if "_candidates" in built else [built]
+            return [row_to_df(row) for row in candidates]
+    elif isinstance(data.get("rows"), list):
+        rows = data["rows"]
+        n_rows = len(rows)
+
+        def build_frames(lm):
+            return [pd.DataFrame(rows).reindex(columns=lm.feature_names)]
+    else:
+        return jsonify(error="Provide 'features' (one row) or 'rows' (list of dicts)."), 400
+
+    t0 = time.perf_counter()
+    models, results, timers = {}, {}, {}
+    with ExitStack() as slots:
+        for name in dict.fromkeys(names):  # de-duplicated, order kept
+            timer = timers[name] = stage_timer(name, "fanout_predict", _METRICS_ON)
+            try:
+                lm = REGISTRY.get(name)
+                slots.enter_context(_admit(_get_admission(name), rows=n_rows))
+            except Overloaded as e:
+                results[name] = {"error": str(e), "status": 429, "retry_after_sec": e.retry_after_sec}
+                continue
+            except Exception as e:
+                results[name] = {"error": f"load failed: {e}"}
+                continue
+            timer.mark("admission")
+            models[name] = lm
+        scored, groups = _FANOUT.score(models, build_frames)
+    results.update(scored)
+    for name, timer in timers.items():
+        timer.mark("predict")  # build + shared transform + this model's predict
+        res = results[name]
+        if "error" not in res:
+            models[name].mark_prediction()
+        timer.done(str(res.get("status", 500 if "error" in res else 200)), rows=len(res.get("predictions", ())))
     return jsonify(
-        model=model_name,
-        predictions=[int(p) for p in preds],
-        count=int(len(preds)),
+        results={n: results[n] for n in dict.fromkeys(names)},
+        groups=groups,
+        total_ms=1000 * (time.perf_counter() - t0),
+    )
+
+
+@app.post("/v1/stream_predict/<model_name>")
+@_traced("stream_predict")
+@_admission_gate
+def stream_predict(model_name: str):
+    """
+    NDJSON in, NDJSON out, one line per input line, in order. The body is read in
+    api.stream.read_bytes pieces and scored api.stream.chunk_rows rows at a time,
+    so memory stays flat however long the stream is. Clients should read the
+    response while still sending (curl, httpx streaming, ...).
+
+    The model instance is resolved once, so a hot reload mid-stream does not mix versions.
+    """
+    admission = _get_admission(model_name)
+    lm = REGISTRY.get(model_name)
+    chunker = NDJSONChunker(lm.feature_names, chunk_rows=int(_STREAM_CFG.get("chunk_rows", 1000)))
+    read_bytes = int(_STREAM_CFG.get("read_bytes", 65536))
+    stream = request.stream
+    trace_ctx = tracing.current_context()  # chunk spans outlive the request span
+
+    def generate():
+        for chunk in iter_chunks(iter(lambda: stream.read(read_bytes), b""), chunker):
+            with tracing.span("stream.chunk", context=trace_ctx, model_version=lm.version, batch_size=len(chunk.rows)):
+                with _admit(admission, rows=len(chunk.rows), wait=True):
+                    out = score_chunk(chunk, lm.feature_names, lambda df: _predict_frame_cached(lm, df)[0])
+            yield out  # chunks of a started stream queue for slots instead of failing
+            lm.mark_prediction()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE,
+        headers={"X-Model": model_name, "X-Model-Version": lm.version},
     )
 
 
+def _wants_arrow() -> bool:
+    if request.args.get("format") == "arrow":
+        return True
+    return request.accept_mimetypes.best_match(["application/json", ARROW_STREAM_MIMETYPE]) == ARROW_STREAM_MIMETYPE
+
+
+# --------------------------------------------------------------------------------------
+# Profiles (api.profiling)
+# --------------------------------------------------------------------------------------
+def _profiles_denied():
+    if _PROFILER is None:
+        return jsonify(error="Profiling is disabled (api.profiling.enabled)."), 404
+    if not _PROFILER.authorized(request.headers.get("X-Profile-Token")):
+        return jsonify(error="Profiling requires a valid X-Profile-Token."), 403
+    return None
+
+
+@app.get("/v1/profiles")
+def list_profiles():
+    denied = _profiles_denied()
+    if denied:
+        return denied
+    return jsonify(_PROFILER.stats())
+
+
+@app.get("/v1/profiles/<profile_id>")
+def get_profile(profile_id: str):
+    """Text report of one profiled request; ?format=pstats returns the raw .prof."""
+    denied = _profiles_denied()
+    if denied:
+        return denied
+    raw = request.args.get("format") == "pstats"
+    path = _PROFILER.path(profile_id, ".prof" if raw else ".txt")
+    if path is None:
+        return jsonify(error=f"Profile '{profile_id}' not found."), 404
+    if raw:
+        return send_file(path, mimetype="application/octet-stream", as_attachment=True)
+    return Response(path.read_text(encoding="utf-8"), mimetype="text/plain")
+
+
+@app.get("/v1/profiles/aggregate/<model_name>/<endpoint>")
+def get_profile_aggregate(model_name: str, endpoint: str):
+    """Rolling aggregate of sampled profiles; ?format=pstats returns it as a .prof."""
+    denied = _profiles_denied()
+    if denied:
+        return denied
+    agg = _PROFILER.aggregate(model_name, endpoint)
+    if agg is None:
+        return jsonify(error=f"No sampled profiles for {model_name}/{endpoint} yet."), 404
+    text, stats = agg
+    if request.args.get("format") == "pstats":
+        path = _PROFILER.out_dir / f"aggregate-{model_name}-{endpoint}.prof"
+        _PROFILER.out_dir.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(str(path))
+        return send_file(path, mimetype="application/octet-stream", as_attachment=True)
+    return Response(text, mimetype="text/plain")
+
+
+# --------------------------------------------------------------------------------------
+# Admin (reload / rollback)
+# --------------------------------------------------------------------------------------
+def _admin_denied():
+    token = REGISTRY.api_cfg.get("admin_token")
+    if token and request.headers.get("X-Admin-Token") != str(token):
+        return jsonify(error="Admin token required."), 403
+    return None
+
+
+@app.post("/admin/reload/<model_name>")
+def admin_reload(model_name: str):
+    """Reload a model from disk; ?force=true reloads even if the artifacts are unchanged."""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    force = request.args.get("force", "").lower() in ("1", "true", "yes")
+    return jsonify(REGISTRY.reload(model_name, force=force))
+
+
+@app.post("/admin/rollback/<model_name>")
+def admin_rollback(model_name: str):
+    denied = _admin_denied()
+    if denied:
+        return denied
+    try:
+        return jsonify(REGISTRY.rollback(model_name))
+    except ValueError as e:
+        return jsonify(error=str(e)), 409
+
+
 # Convenience alias used by some tests / docs
 @app.post("/v1/predict/titanic")
 def predict_titanic_alias():
@@ -0,0 +1,172 @@
+# app/prefork.py
+"""
+Pre-fork launcher for the Flask API.
+
+The parent imports app.model_api, loads and warms every configured model once,
+freezes the GC and then forks N workers that all accept() on one listening
+socket. Model memory is inherited copy-on-write: numpy buffers (tree nodes,
+the compiled forest) are never written after warm-up, so their pages stay
+shared. With the bundled model, two workers each add ~6 MiB unique over a
+~130 MiB RSS. api.mmap_models does not change this for forests: sklearn copies
+tree nodes on load, so only the small preprocessing arrays end up file-backed.
+
+The parent prints a per-worker memory report (RSS, unique/USS, proportional/PSS,
+shared) once workers are up, every --report-interval seconds if set, and on SIGUSR1.
+
+Run (POSIX only):
+    python -m app.prefork --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+import psutil
+
+
+def memory_report(pids: List[int]) -> List[Dict[str, float]]:
+    """Per-process RSS split into unique (USS) and shared pages, in MiB."""
+    rows = []
+    for pid in pids:
+        try:
+            mi = psutil.Process(pid).memory_full_info()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        mib = 1024 * 1024
+        rows.append({
+            "pid": pid,
+            "rss_mib": mi.rss / mib,
+            "unique_mib": mi.uss / mib,
+            "pss_mib": getattr(mi, "pss", 0) / mib,
+            "shared_mib": (mi.rss - mi.uss) / mib,
+        })
+    return rows
+
+
+def format_report(parent: int, workers: List[int]) -> str:
+    rows = memory_report([parent] + workers)
+    lines = [f"{'role':8} {'pid':>7} {'rss MiB':>9} {'unique':>9} {'pss':>9} {'shared':>9}"]
+    for r in rows:
+        role = "parent" if r["pid"] == parent else "worker"
+        lines.append(
+            f"{role:8} {r['pid']:>7} {r['rss_mib']:>9.1f} {r['unique_mib']:>9.1f} "
+            f"{r['pss_mib']:>9.1f} {r['shared_mib']:>9.1f}"
+        )
+    total_unique = sum(r["unique_mib"] for r in rows)
+    total_pss = sum(r["pss_mib"] for r in rows)
+    lines.append(f"total unique {total_unique:.1f} MiB, total pss {total_pss:.1f} MiB "
+                 f"(sum of rss would be {sum(r['rss_mib'] for r in rows):.1f} MiB)")
+    return "\n".join(lines)
+
+
+def _serve(sock: socket.socket, host: str, port: int) -> None:
+    """Worker body: serve the already-loaded app on the inherited socket."""
+    from werkzeug.serving import make_server
+
+    import app.model_api as api
+
+    # Threads don't survive fork(); restart the ones the parent configured.
+    reload_cfg = api.REGISTRY.api_cfg.get("hot_reload") or {}
+    if reload_cfg.get("enabled", False):
+        api.REGISTRY.start_watcher(interval_sec=float(reload_cfg.get("poll_interval_sec", 5)))
+
+    server = make_server(host, port, api.app, threaded=True, fd=sock.fileno())
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    server.serve_forever()
+
+
+def _fork_worker(sock: socket.socket, host: str, port: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl+C
+        try:
+            _serve(sock, host, port)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main() -> None:
+    if not hasattr(os, "fork"):
+        sys.exit("app.prefork needs fork(); use app.model_api or app.asgi_api on this platform.")
+
+    import app.model_api as api
+
+    prefork_cfg = api.REGISTRY.api_cfg.get("prefork") or {}
+    ap = argparse.ArgumentParser(description="Pre-fork multi-worker launcher for the Flask API.")
+    ap.add_argument("--workers", type=int, default=int(prefork_cfg.get("workers", 0)) or os.cpu_count() or 1)
+    ap.add_argument("--host", default=api.REGISTRY.api_cfg.get("host", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=int(api.REGISTRY.api_cfg.get("port", 8000)))
+    ap.add_argument("--report-interval", type=float, default=float(prefork_cfg.get("report_interval_sec", 0)))
+    args = ap.parse_args()
+
+    # 1) load + warm everything once, in the parent. With api.warmup.enabled the
+    #    import already started a background warm-up: wait for it rather than
+    #    forking while it runs (children would inherit "warming" and its locks).
+    t0 = time.perf_counter()
+    state = api.REGISTRY.warm_up_all()
+    print(f"[prefork] warmed {len(state)} model(s) in {time.perf_counter() - t0:.2f}s: "
+          + ", ".join(f"{n}={s['status']}" for n, s in state.items()))
+
+    # 2) keep inherited objects out of the collector so it doesn't dirty shared pages
+    gc.collect()
+    gc.freeze()
+
+    # 3) one listening socket, shared by every worker
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+
+    workers = [_fork_worker(sock, args.host, args.port) for _ in range(args.workers)]
+    parent = os.getpid()
+    print(f"[prefork] {args.workers} worker(s) on http://{args.host}:{args.port}: {workers}")
+
+    stopping = False
+
+    def _stop(*_):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGUSR1, lambda *_: print(format_report(parent, workers), flush=True))
+
+    time.sleep(1.0)
+    print(format_report(parent, workers), flush=True)
+    next_report = time.time() + args.report_interval if args.report_interval else None
+
+    # 4) supervise: restart workers that die, until asked to stop
+    while workers:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            workers.remove(pid)
+            if not stopping:
+                print(f"[prefork] worker {pid} exited; starting a replacement")
+                workers.append(_fork_worker(sock, args.host, args.port))
+            continue
+        if next_report and time.time() >= next_report:
+            print(format_report(parent, workers), flush=True)
+            next_report = time.time() + args.report_interval
+        time.sleep(0.2)
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# app/utils/admission.py
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Overloaded(Exception):
+    """A request was not admitted (maps to HTTP 429 + Retry-After)."""
+
+    def __init__(self, model: str, reason: str, retry_after_sec: int):
+        super().__init__(f"Model '{model}' is overloaded ({reason}); retry in {retry_after_sec}s.")
+        self.model = model
+        self.reason = reason
+        self.retry_after_sec = retry_after_sec
+
+
+class AdmissionController:
+    """
+    Bounds the concurrent inferences of one model and the work queued behind them.
+
+    Capacity is counted in slots. A single-row request takes one slot. A batch
+    takes ceil(rows / batch_rows_per_slot) slots, capped at max_concurrent so
+    even the largest batch can run on an idle model. Requests that find no free
+    slots wait in FIFO order, so a heavy batch is not starved by a stream of
+    single rows. A request is rejected immediately when max_queue slots are
+    already waiting, or after waiting queue_timeout_ms. gate() also caps how
+    many requests may be inside the handler at all, so a spike is turned away
+    before anyone pays to decode its body.
+
+    Retry-After estimates how long the work ahead takes to drain. It uses an
+    EWMA of how long admitted requests held their slots.
+    """
+
+    REASONS = ("queue_full", "queue_timeout")
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrent: int = 4,
+        max_queue: int = 16,
+        queue_timeout_ms: float = 1000.0,
+        batch_rows_per_slot: int = 1000,
+    ):
+        if max_concurrent < 1 or max_queue < 0 or batch_rows_per_slot < 1:
+            raise ValueError("max_concurrent and batch_rows_per_slot must be >= 1, max_queue >= 0")
+        self.model = model
+        self.max_concurrent = int(max_concurrent)
+        self.max_queue = int(max_queue)
+        self.queue_timeout = float(queue_timeout_ms) / 1000.0
+        self.batch_rows_per_slot = int(batch_rows_per_slot)
+
+        self._cond = threading.Condition()
+        self._waiters: List[list] = []  # [ticket, weight] in arrival order
+        self._in_use = 0
+        self._queued = 0
+        self._in_handler = 0  # requests inside gate(), decoding or holding/awaiting slots
+        self._hold_ewma: Optional[float] = None
+
+        self.admitted = 0
+        self.admitted_after_wait = 0
+        self.wait_sec = 0.0
+        self.rejected = {r: 0 for r in self.REASONS}
+
+    # ----------------------------- request side -----------------------------
+
+    def weight(self, rows: int = 1) -> int:
+        """Slots a request of this many rows takes."""
+        return max(1, min(self.max_concurrent, math.ceil(rows / self.batch_rows_per_slot)))
+
+    @contextmanager
+    def gate(self) -> Iterator[None]:
+        """
+        Count a request from before its body is read until its handler returns
+        (for a streamed response, until the stream is closed; see model_api).
+        Rejects at once when max_concurrent + max_queue requests are already
+        inside (so decoding cannot pile up either) or the slot queue is full.
+        """
+        with self._cond:
+            if self._in_handler >= self.max_concurrent + self.max_queue or (
+                self._queued >= self.max_queue and self._in_use >= self.max_concurrent
+            ):
+                self._reject("queue_full")
+            self._in_handler += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_handler -= 1
+
+    @contextmanager
+    def slot(self, rows: int = 1, wait: bool = False) -> Iterator[int]:
+        """
+        Hold slots for rows while the block runs. wait=True queues past max_queue
+        and without a timeout; it is for work that can no longer be answered with
+        a 429, such as the next chunk of a stream that has already started.
+        """
+        weight = self.weight(rows)
+        self._acquire(weight, wait)
+        t0 = time.perf_counter()
+        try:
+            yield weight
+        finally:
+            self._release(weight, time.perf_counter() - t0)
+
+    def _acquire(self, weight: int, wait: bool) -> None:
+        with self._cond:
+            if not self._waiters and self._in_use + weight <= self.max_concurrent:
+                self._in_use += weight
+                self.admitted += 1
+                return
+            if not wait and self._queued + weight > self.max_queue:
+                self._reject("queue_full")
+
+            entry = [object(), weight]
+            self._waiters.append(entry)
+            self._queued += weight
+            t0 = time.monotonic()
+            deadline = None if wait else t0 + self.queue_timeout
+            try:
+                while not (self._waiters[0] is entry and self._in_use + weight <= self.max_concurrent):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._reject("queue_timeout")
+                    self._cond.wait(remaining)
+                self._in_use += weight
+                self.admitted += 1
+                self.admitted_after_wait += 1
+                self.wait_sec += time.monotonic() - t0
+            finally:
+                self._waiters.remove(entry)
+                self._queued -= weight
+                self._cond.notify_all()  # the next waiter may be the head now
+
+    def _release(self, weight: int, held_sec: float) -> None:
+        with self._cond:
+            self._in_use -= weight
+            ewma = self._hold_ewma
+            self._hold_ewma = held_sec if ewma is None else 0.8 * ewma + 0.2 * held_sec
+            self._cond.notify_all()
+
+    def _reject(self, reason: str) -> None:
+        # called with self._cond held
+        self.rejected[reason] += 1
+        raise Overloaded(self.model, reason, self._retry_after())
+
+    def _retry_after(self) -> int:
+        hold = self._hold_ewma or 0.0
+        backlog = (self._in_use + self._queued) / self.max_concurrent
+        return max(1, math.ceil(hold * backlog))
+
+    # ----------------------------- admin -----------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "queue_timeout_ms": self.queue_timeout * 1000.0,
+                "batch_rows_per_slot": self.batch_rows_per_slot,
+                "in_use": self._in_use,
+                "queued": self._queued,
+                "in_handler": self._in_handler,
+                "admitted": self.admitted,
+                "admitted_after_wait": self.admitted_after_wait,
+                "avg_wait_ms": (1000 * self.wait_sec / self.admitted_after_wait) if self.admitted_after_wait else 0.0,
+                "avg_hold_ms": 1000 * self._hold_ewma if self._hold_ewma is not None else None,
+                "rejected": dict(self.rejected),
+            }
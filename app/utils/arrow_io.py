@@ -0,0 +1,62 @@
+# app/utils/arrow_io.py
+from __future__ import annotations
+
+from typing import Any, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+
+def read_arrow_stream(body: bytes, feature_names: List[str]) -> pd.DataFrame:
+    """
+    Decode an Arrow IPC stream body into a frame ordered like feature_names.
+    The body is wrapped, not copied, and null-free numeric columns are handed
+    to pandas without a copy (split_blocks keeps one block per column).
+    Raises ValueError when the body is not an Arrow IPC stream.
+    """
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise ValueError(f"body is not a valid Arrow IPC stream ({e})") from None
+    return table_to_frame(table, feature_names)
+
+
+def table_to_frame(table: pa.Table, feature_names: List[str]) -> pd.DataFrame:
+    present = [c for c in feature_names if c in table.column_names]
+    table = table.select(present)
+    df = table.to_pandas(split_blocks=True)
+    # Arrow nulls in string columns arrive as None, which sklearn's imputers do
+    # not treat as missing; use NaN like the JSON and CSV paths do.
+    for c in present:
+        if table.column(c).null_count and df[c].dtype == object:
+            df[c] = df[c].where(df[c].notna(), np.nan)
+    if len(present) == len(feature_names):
+        return df
+    return df.reindex(columns=feature_names)
+
+
+def columns_to_frame(columns: dict, feature_names: List[str]) -> pd.DataFrame:
+    """Build a frame from column-oriented JSON ({"col": [..], ...})."""
+    if not isinstance(columns, dict):
+        raise ValueError("'columns' must be an object of column name -> list of values")
+    lengths = {len(v) for v in columns.values() if isinstance(v, list)}
+    if len(lengths) > 1 or any(not isinstance(v, list) for v in columns.values()):
+        raise ValueError("'columns' values must be lists of equal length")
+    n = lengths.pop() if lengths else 0
+    # Missing columns become NaN, like reindex() on the row-oriented forms.
+    return pd.DataFrame(
+        {c: columns[c] if c in columns else np.full(n, np.nan) for c in feature_names},
+        columns=feature_names,
+    )
+
+
+def predictions_to_arrow_stream(preds: Any, name: str = "prediction") -> bytes:
+    """Encode predictions as a single-column Arrow IPC stream."""
+    batch = pa.record_batch([pa.array(np.asarray(preds))], names=[name])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,183 @@
+# app/utils/batcher.py
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+
+@dataclass
+class _Pending:
+    """One queued single-row request waiting for its batch."""
+    lm: Any
+    df: pd.DataFrame
+    future: Future
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent single-row predict calls for one model and scores them
+    with a single vectorized predict.
+
+    A batch is flushed when it reaches `max_batch_size` rows or when the oldest
+    queued row has waited `max_wait_ms`, whichever comes first. Rows are grouped
+    by (loaded model, column layout) so different payload shapes never share a
+    frame. If a grouped predict fails, its rows are retried one by one so every
+    caller gets its own result or its own exception.
+
+    predict_fn(lm, df) must return one prediction per row of df.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        predict_fn: Callable[[Any, pd.DataFrame], Any],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        stats_window: int = 1024,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+
+        self.name = name
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait_ms = float(max_wait_ms)
+        self._predict_fn = predict_fn
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue()
+
+        # stats
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._fallbacks = 0
+        self._max_seen = 0
+        self._batch_sizes: deque = deque(maxlen=stats_window)
+        self._waits_ms: deque = deque(maxlen=stats_window)
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+
+    # ----------------------------- public API -----------------------------
+
+    def submit(self, lm: Any, df: pd.DataFrame) -> Future:
+        """Queue a one-row frame; the future resolves to that row's prediction."""
+        if self._closed:
+            raise RuntimeError(f"Batcher for '{self.name}' is closed.")
+        fut: Future = Future()
+        self._queue.put(_Pending(lm=lm, df=df, future=fut))
+        return fut
+
+    def predict(self, lm: Any, df: pd.DataFrame, timeout: Optional[float] = None) -> Any:
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(lm, df).result(timeout=timeout)
+
+    def close(self) -> None:
+        """Stop the worker after it drains what is already queued."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size and queue-wait stats over the recent window."""
+        with self._lock:
+            sizes = list(self._batch_sizes)
+            waits = sorted(self._waits_ms)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self._batches,
+                "items": self._items,
+                "row_fallbacks": self._fallbacks,
+                "queue_depth": self._queue.qsize(),
+                "avg_batch_size": (sum(sizes) / len(sizes)) if sizes else 0.0,
+                "max_batch_size_seen": self._max_seen,
+                "queue_wait_ms": {
+                    "avg": (sum(waits) / len(waits)) if waits else 0.0,
+                    "p50": _percentile(waits, 50),
+                    "p99": _percentile(waits, 99),
+                    "max": waits[-1] if waits else 0.0,
+                },
+            }
+
+    # ----------------------------- internals -----------------------------
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = first.enqueued + self.max_wait_ms / 1000.0
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        groups: Dict[tuple, List[_Pending]] = {}
+        for p in batch:
+            groups.setdefault((id(p.lm), tuple(p.df.columns)), []).append(p)
+
+        for items in groups.values():
+            self._score_group(items)
+
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._max_seen = max(self._max_seen, len(batch))
+            self._batch_sizes.append(len(batch))
+            self._waits_ms.extend((started - p.enqueued) * 1000.0 for p in batch)
+
+    def _score_group(self, items: List[_Pending]) -> None:
+        lm = items[0].lm
+        if len(items) == 1:
+            self._score_single(items[0])
+            return
+        try:
+            df = pd.concat([p.df for p in items], ignore_index=True)
+            preds = self._predict_fn(lm, df)
+        except Exception:
+            # One bad row must not fail its neighbours: retry row by row.
+            with self._lock:
+                self._fallbacks += 1
+            for p in items:
+                self._score_single(p)
+            return
+        for p, y in zip(items, preds):
+            p.future.set_result(y)
+
+    def _score_single(self, p: _Pending) -> None:
+        try:
+            p.future.set_result(self._predict_fn(p.lm, p.df)[0])
+        except Exception as e:
+            p.future.set_exception(e)
+
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(pct / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
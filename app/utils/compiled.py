@@ -0,0 +1,339 @@
+# app/utils/compiled.py
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.utils import murmurhash3_32
+
+from preprocessing.pipeline import HashingEncoder
+
+# sklearn trees compare float32 inputs against float64 thresholds.
+_TREE_DTYPE = np.float32
+_LEAF = -1
+
+
+class NotCompilable(Exception):
+    """Raised when a fitted step has no NumPy-only equivalent here."""
+
+
+# --------------------------------------------------------------------------------------
+# Preprocessing blocks (one per ColumnTransformer entry)
+# --------------------------------------------------------------------------------------
+@dataclass
+class _NumericBlock:
+    """SimpleImputer -> StandardScaler on numeric columns, output float64."""
+    columns: List[str]
+    fill: Optional[np.ndarray]
+    mean: Optional[np.ndarray]
+    scale: Optional[np.ndarray]
+
+    @property
+    def width(self) -> int:
+        return len(self.columns)
+
+    def write(self, row: Mapping[str, Any], out: np.ndarray, start: int) -> None:
+        x = np.array([_to_float(row[c]) for c in self.columns], dtype=np.float64)
+        if self.fill is not None:
+            missing = np.isnan(x)
+            if missing.any():
+                x[missing] = self.fill[missing]
+        if self.mean is not None:
+            x -= self.mean
+        if self.scale is not None:
+            x /= self.scale
+        out[start:start + len(x)] = x
+
+
+@dataclass
+class _OneHotBlock:
+    """SimpleImputer(most_frequent/constant) -> OneHotEncoder(handle_unknown='ignore'/'infrequent_if_exist')."""
+    columns: List[str]
+    fill: Optional[List[Any]]
+    lookups: List[Dict[Any, int]]  # category -> absolute column within this block
+    width: int
+    unknown: Optional[List[Optional[int]]] = None  # per column: where unseen values go (infrequent column)
+
+    def write(self, row: Mapping[str, Any], out: np.ndarray, start: int) -> None:
+        for i, c in enumerate(self.columns):
+            v = row[c]
+            if self.fill is not None and _is_nan(v):
+                v = self.fill[i]
+            try:
+                j = self.lookups[i].get(v)
+            except TypeError:  # unhashable -> unknown category
+                j = None
+            if j is None and self.unknown is not None:
+                j = self.unknown[i]
+            if j is not None:
+                out[start + j] = 1.0
+
+
+@dataclass
+class _HashBlock:
+    """SimpleImputer(constant) -> HashingEncoder: "<index>=<value>" tokens, murmurhash3 like FeatureHasher."""
+    columns: List[str]
+    fill: Optional[List[Any]]
+    width: int
+
+    def write(self, row: Mapping[str, Any], out: np.ndarray, start: int) -> None:
+        for i, c in enumerate(self.columns):
+            v = row[c]
+            if self.fill is not None and _is_nan(v):
+                v = self.fill[i]
+            h = murmurhash3_32(f"{i}={v}", seed=0)
+            j = (2147483647 - (self.width - 1)) % self.width if h == -2147483648 else abs(h) % self.width
+            out[start + j] += 1.0
+
+
+def _to_float(v: Any) -> float:
+    return math.nan if v is None else float(v)
+
+
+def _is_nan(v: Any) -> bool:
+    # Same rule sklearn uses for object columns: only values with v != v are missing.
+    try:
+        return bool(v != v)
+    except Exception:
+        return False
+
+
+def _compile_imputer(imp: SimpleImputer, numeric: bool):
+    if imp.add_indicator or not _is_nan(imp.missing_values):
+        raise NotCompilable("SimpleImputer with indicator or non-NaN missing_values")
+    stats = imp.statistics_
+    if numeric:
+        stats = np.asarray(stats, dtype=np.float64)
+        if np.isnan(stats).any():
+            raise NotCompilable("SimpleImputer dropped empty features")
+        return stats
+    stats = list(stats)
+    if any(_is_nan(s) for s in stats):
+        raise NotCompilable("SimpleImputer dropped empty features")
+    return stats
+
+
+def _compile_block(trans: Any, columns: List[str]):
+    steps = list(trans.steps) if isinstance(trans, Pipeline) else [(None, trans)]
+    steps = [s for _, s in steps if s is not None and s != "passthrough"]
+    if not steps:
+        raise NotCompilable("passthrough columns")
+
+    encoder = steps[-1] if isinstance(steps[-1], (OneHotEncoder, HashingEncoder)) else None
+    body = steps[:-1] if encoder is not None else steps
+
+    if encoder is not None:
+        if len(body) > 1 or (body and not isinstance(body[0], SimpleImputer)):
+            raise NotCompilable(f"unsupported steps before {type(encoder).__name__}")
+        fill = _compile_imputer(body[0], numeric=False) if body else None
+        if isinstance(encoder, HashingEncoder):
+            return _HashBlock(columns=columns, fill=fill, width=int(encoder.n_features))
+        if encoder.drop is not None:
+            raise NotCompilable("OneHotEncoder with drop")
+        if encoder.handle_unknown not in ("ignore", "infrequent_if_exist"):
+            raise NotCompilable("OneHotEncoder must ignore unknown categories")
+        # with infrequent levels, each column's frequent levels come first (in categories_
+        # order), then one column shared by its infrequent (and, if allowed, unseen) levels
+        infrequent = getattr(encoder, "infrequent_categories_", None) or [None] * len(encoder.categories_)
+        lookups, unknown, offset = [], [], 0
+        for cats, rare in zip(encoder.categories_, infrequent):
+            rare = set(rare.tolist()) if rare is not None else set()
+            frequent = [c for c in cats.tolist() if c not in rare]
+            lookup = {c: offset + k for k, c in enumerate(frequent)}
+            offset += len(frequent)
+            slot = None
+            if rare:
+                slot = offset
+                lookup.update({c: slot for c in rare})
+                offset += 1
+            lookups.append(lookup)
+            unknown.append(slot if encoder.handle_unknown == "infrequent_if_exist" else None)
+        return _OneHotBlock(columns=columns, fill=fill, lookups=lookups, width=offset,
+                            unknown=unknown if any(u is not None for u in unknown) else None)
+
+    fill = mean = scale = None
+    for step in body:
+        if isinstance(step, SimpleImputer) and fill is None and mean is None and scale is None:
+            fill = _compile_imputer(step, numeric=True)
+        elif isinstance(step, StandardScaler) and mean is None and scale is None:
+            mean = np.asarray(step.mean_, dtype=np.float64) if step.with_mean else None
+            scale = np.asarray(step.scale_, dtype=np.float64) if step.with_std else None
+        else:
+            raise NotCompilable(f"unsupported numeric step {type(step).__name__}")
+    return _NumericBlock(columns=columns, fill=fill, mean=mean, scale=scale)
+
+
+def _compile_column_transformer(ct: ColumnTransformer) -> List[Any]:
+    blocks = []
+    for name, trans, cols in ct.transformers_:
+        if trans == "drop":
+            continue
+        if isinstance(cols, str):
+            cols = [cols]
+        cols = list(cols)
+        if not cols:
+            continue
+        if not all(isinstance(c, str) for c in cols):
+            raise NotCompilable("ColumnTransformer columns must be selected by name")
+        blocks.append(_compile_block(trans, cols))
+    return blocks
+
+
+# --------------------------------------------------------------------------------------
+# Forest as flat node arrays
+# --------------------------------------------------------------------------------------
+@dataclass
+class _FlatForest:
+    """
+    All trees' nodes concatenated into contiguous arrays. Leaves point to
+    themselves, so every tree can be walked in lock-step for max_depth steps.
+    """
+    roots: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    feature: np.ndarray
+    threshold: np.ndarray
+    missing_left: Optional[np.ndarray]
+    leaf_proba: np.ndarray  # (n_nodes, n_classes), normalized like DecisionTreeClassifier.predict_proba
+    max_depth: int
+    classes: np.ndarray
+
+    @classmethod
+    def from_forest(cls, est: Any) -> "_FlatForest":
+        if getattr(est, "n_outputs_", 1) != 1:
+            raise NotCompilable("multi-output forests")
+        n_classes = int(est.n_classes_)
+        roots, lefts, rights, feats, thrs, mls, probas = [], [], [], [], [], [], []
+        offset, max_depth, has_missing = 0, 0, True
+        for tree in est.estimators_:
+            t = tree.tree_
+            idx = np.arange(t.node_count, dtype=np.intp)
+            leaf = t.children_left == _LEAF
+            roots.append(offset)
+            lefts.append(np.where(leaf, idx, t.children_left) + offset)
+            rights.append(np.where(leaf, idx, t.children_right) + offset)
+            feats.append(np.where(leaf, 0, t.feature).astype(np.intp))
+            thrs.append(np.asarray(t.threshold, dtype=np.float64))
+            ml = getattr(t, "missing_go_to_left", None)
+            has_missing = has_missing and ml is not None
+            mls.append(np.asarray(ml, dtype=bool) if ml is not None else None)
+
+            proba = np.array(t.value[:, 0, :n_classes], dtype=np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+            probas.append(proba)
+
+            max_depth = max(max_depth, int(t.max_depth))
+            offset += t.node_count
+
+        return cls(
+            roots=np.asarray(roots, dtype=np.intp),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            feature=np.ascontiguousarray(np.concatenate(feats), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thrs)),
+            missing_left=np.concatenate(mls) if has_missing else None,
+            leaf_proba=np.ascontiguousarray(np.concatenate(probas)),
+            max_depth=max_depth,
+            classes=est.classes_,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the node arrays: a second copy of the forest, next to the estimator's own trees."""
+        arrays = (self.roots, self.left, self.right, self.feature, self.threshold, self.missing_left, self.leaf_proba)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def predict_proba_one(self, x: np.ndarray) -> np.ndarray:
+        # Round to float32 exactly as the sklearn tree input validation does.
+        xv = x.astype(_TREE_DTYPE).astype(np.float64)
+        node = self.roots
+        for step in range(self.max_depth):
+            if step % 8 == 7 and (self.left[node] == node).all():
+                break  # every tree already sits on a leaf
+            v = xv[self.feature[node]]
+            go_left = v <= self.threshold[node]
+            if self.missing_left is not None:
+                nan = np.isnan(v)
+                if nan.any():
+                    go_left = np.where(nan, self.missing_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+        # cumsum accumulates tree by tree, in the same order as ForestClassifier.predict_proba
+        proba = np.cumsum(self.leaf_proba[node], axis=0)[-1]
+        proba /= len(self.roots)
+        return proba
+
+    def predict_one(self, x: np.ndarray) -> Any:
+        return self.classes[int(np.argmax(self.predict_proba_one(x)))]
+
+
+# --------------------------------------------------------------------------------------
+# Public entry point
+# --------------------------------------------------------------------------------------
+class CompiledPredictor:
+    """
+    NumPy-only single-row scorer for (ColumnTransformer -> forest classifier).
+    Rows are mappings of raw column -> value; values missing from a column that
+    the transformer needs raise ValueError, the same as the sklearn path.
+    """
+
+    def __init__(self, blocks: List[Any], forest: _FlatForest):
+        self.blocks = blocks
+        self.forest = forest
+        self.required_columns = [c for b in blocks for c in b.columns]
+        self.n_features_out = sum(b.width for b in blocks)
+
+    def transform_one(self, row: Mapping[str, Any]) -> np.ndarray:
+        missing = [c for c in self.required_columns if c not in row]
+        if missing:
+            raise ValueError(f"columns are missing: {set(missing)}")
+        out = np.zeros(self.n_features_out, dtype=np.float64)
+        start = 0
+        for b in self.blocks:
+            b.write(row, out, start)
+            start += b.width
+        return out
+
+    def predict_one(self, row: Mapping[str, Any]) -> Any:
+        return self.forest.predict_one(self.transform_one(row))
+
+    def predict_proba_one(self, row: Mapping[str, Any]) -> np.ndarray:
+        return self.forest.predict_proba_one(self.transform_one(row))
+
+
+def compile_model(obj: Any, preprocessor: Optional[Any] = None) -> Optional[CompiledPredictor]:
+    """
+    Compile a fitted Pipeline([ColumnTransformer, forest]) -- or a bare forest plus
+    its fitted ColumnTransformer -- into a CompiledPredictor.
+    Returns None when any step is unsupported, so callers keep the sklearn path.
+    """
+    try:
+        if isinstance(obj, Pipeline):
+            steps: Sequence[Any] = [s for _, s in obj.steps if s is not None and s != "passthrough"]
+            if len(steps) != 2:
+                raise NotCompilable("expected exactly (preprocessor, estimator)")
+            preprocessor, estimator = steps
+        else:
+            estimator = obj
+        if not isinstance(preprocessor, ColumnTransformer):
+            raise NotCompilable("preprocessor must be a ColumnTransformer")
+        if type(estimator) not in (RandomForestClassifier, ExtraTreesClassifier):
+            raise NotCompilable(f"unsupported estimator {type(estimator).__name__}")
+
+        blocks = _compile_column_transformer(preprocessor)
+        forest = _FlatForest.from_forest(estimator)
+        compiled = CompiledPredictor(blocks, forest)
+        n_in = getattr(estimator, "n_features_in_", compiled.n_features_out)
+        if n_in != compiled.n_features_out:
+            raise NotCompilable("transformer width does not match estimator input")
+        return compiled
+    except NotCompilable:
+        return None
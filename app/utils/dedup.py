@@ -0,0 +1,76 @@
+# app/utils/dedup.py
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash per row over its values (NaN hashes equal to NaN)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class Deduplicator:
+    """
+    Collapses identical rows of a batch (already reindexed to feature_names)
+    before scoring and scatters predictions back to every original position.
+
+    mode "auto" hashes each batch and only takes the unique-rows path when the
+    duplicate fraction reaches min_duplicate_fraction. Hashing costs a few
+    percent of a forest predict, and below that fraction the extra take() and
+    scatter would not pay for it. mode "on" always collapses; "off" never does.
+    """
+
+    MODES = ("auto", "on", "off")
+
+    def __init__(self, mode: str = "auto", min_duplicate_fraction: float = 0.05, min_rows: int = 16):
+        if mode not in self.MODES:
+            raise ValueError(f"dedup mode must be one of {self.MODES}, got '{mode}'")
+        self.mode = mode
+        self.min_duplicate_fraction = float(min_duplicate_fraction)
+        self.min_rows = int(min_rows)
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.batches_collapsed = 0
+        self.rows = 0
+        self.rows_scored = 0
+
+    def predict(self, df: pd.DataFrame, predict_fn: Callable[[pd.DataFrame], Any]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Returns (predictions for every row of df, per-batch dedup info)."""
+        n = len(df)
+        first = inverse = ratio = unique = None
+        if self.mode != "off" and n >= self.min_rows:
+            _, first, inverse = np.unique(row_hashes(df), return_index=True, return_inverse=True)
+            unique = len(first)
+            ratio = 1.0 - unique / n
+            if self.mode == "auto" and ratio < self.min_duplicate_fraction:
+                first = None  # not worth it: score the batch as-is
+
+        if first is None:
+            preds = np.asarray(predict_fn(df))
+        else:
+            preds = np.asarray(predict_fn(df.iloc[first]))[inverse]
+
+        applied = first is not None
+        with self._lock:
+            self.batches += 1
+            self.batches_collapsed += int(applied)
+            self.rows += n
+            self.rows_scored += unique if applied else n
+        return preds, {"rows": n, "unique_rows": unique, "dedup_ratio": ratio, "applied": applied}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "min_duplicate_fraction": self.min_duplicate_fraction,
+                "batches": self.batches,
+                "batches_collapsed": self.batches_collapsed,
+                "rows": self.rows,
+                "rows_scored": self.rows_scored,
+                "dedup_ratio": (1.0 - self.rows_scored / self.rows) if self.rows else 0.0,
+            }
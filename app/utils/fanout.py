@@ -0,0 +1,162 @@
+# app/utils/fanout.py
+"""
+Score one payload with several models, sharing preprocessing between them.
+
+Models are grouped by (feature_names, fitted-preprocessor fingerprint). Each
+distinct input frame is built once, and each group's transform runs once on
+the request thread. The group's estimators then predict on a thread pool.
+Their predictions overlap with each other and with the next group's transform.
+
+The fingerprint is joblib.hash of the fitted preprocessor: the pipeline steps
+before the estimator, or the fallback preprocessor. Two models trained with
+the same get_preprocessing_pipeline on the same data share it. A model with no
+fingerprint (e.g. a bare estimator on raw features) forms a group of its own.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+
+def preprocessor_fingerprint(obj: Any, fallback_preprocessor: Any = None) -> Optional[str]:
+    """Content hash of the fitted preprocessing half of a model, None if it has none."""
+    if fallback_preprocessor is not None:
+        prep = fallback_preprocessor
+    elif isinstance(obj, Pipeline) and len(obj.steps) > 1:
+        prep = obj[:-1]
+    else:
+        return None
+    try:
+        return joblib.hash(prep)
+    except Exception:
+        return None
+
+
+class FanOutScorer:
+    """Thread pool for the estimator half of fan-out requests."""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = int(max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fanout")
+        self._lock = threading.Lock()  # counters are bumped from concurrent request threads
+        self.requests = 0
+        self.transforms = 0
+        self.transforms_saved = 0
+        self.candidate_retries = 0
+
+    def score(
+        self,
+        models: Dict[str, Any],
+        build_frames: Callable[[Any], List[pd.DataFrame]],
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        models maps name -> LoadedModel. build_frames(lm) builds that model's
+        candidate input frames, in the order /v1/predict tries them (one, or two
+        for a 4-item payload whose shape the model did not resolve at load); it
+        is called once per distinct (feature_names, payload shape). The group's
+        shared transform uses the first candidate that transforms; a model whose
+        predict fails on it retries the later candidates on its own.
+        Returns (per-model results, per-group info). A model that fails gets an
+        "error" entry and does not fail the others.
+        """
+        groups: Dict[tuple, List[str]] = {}
+        for name, lm in models.items():
+            shape = lm.payload_adapter.shape if lm.payload_adapter is not None else None
+            fp = getattr(lm, "prep_fingerprint", None)
+            key = (tuple(lm.feature_names), shape, fp if fp is not None else f"model:{name}")
+            groups.setdefault(key, []).append(name)
+
+        frames: Dict[tuple, List[pd.DataFrame]] = {}
+        results: Dict[str, Dict[str, Any]] = {}
+        group_info: List[Dict[str, Any]] = []
+        pending = []
+        transforms = saved = 0
+        for (features, shape, fp), names in groups.items():
+            first = models[names[0]]
+            info = {"models": names, "fingerprint": None if fp.startswith("model:") else fp[:12]}
+            group_info.append(info)
+            try:
+                t0 = time.perf_counter()
+                if (features, shape) not in frames:
+                    frames[(features, shape)] = build_frames(first)
+                candidates = frames[(features, shape)]
+                t1 = time.perf_counter()
+                X, used = _transform_first(first, candidates)
+                t2 = time.perf_counter()
+            except Exception as e:
+                for name in names:
+                    results[name] = {"error": f"build/transform failed: {e}"}
+                continue
+            info.update(rows=len(candidates[used]), build_ms=1000 * (t1 - t0), transform_ms=1000 * (t2 - t1))
+            transforms += 1
+            saved += len(names) - 1
+            for name in names:
+                fut = self._pool.submit(_timed_predict, models[name], X)
+                pending.append((name, info, fut, candidates[used + 1:]))
+
+        retries = 0
+        for name, info, fut, later in pending:
+            try:
+                preds, predict_sec = fut.result()
+            except Exception as e:
+                preds, predict_sec, err = None, 0.0, e
+                for df in later:  # same fallback as /v1/predict's candidate loop
+                    retries += 1
+                    try:
+                        preds, predict_sec = _timed_predict(models[name], df, raw=True)
+                        break
+                    except Exception as e2:
+                        err = e2
+                if preds is None:
+                    results[name] = {"error": f"predict failed: {err}"}
+                    continue
+            results[name] = {
+                "predictions": [int(p) for p in np.asarray(preds)],
+                "model_version": models[name].version,
+                "preprocess_group": info["fingerprint"],
+                "timings_ms": {
+                    "build": info["build_ms"],
+                    "transform": info["transform_ms"],  # shared by every model of the group
+                    "predict": 1000 * predict_sec,
+                },
+            }
+        with self._lock:
+            self.requests += 1
+            self.transforms += transforms
+            self.transforms_saved += saved
+            self.candidate_retries += retries
+        return results, group_info
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "requests": self.requests,
+                "transforms": self.transforms,
+                "transforms_saved": self.transforms_saved,
+                "candidate_retries": self.candidate_retries,
+            }
+
+
+def _transform_first(lm: Any, candidates: List[pd.DataFrame]) -> Tuple[Any, int]:
+    """Transform the first candidate frame that transforms; (X, its index)."""
+    err: Optional[Exception] = None
+    for i, df in enumerate(candidates):
+        try:
+            return lm.transform_frame(df), i
+        except Exception as e:
+            err = e
+    raise err if err is not None else ValueError("no input frame")
+
+
+def _timed_predict(lm: Any, X: Any, raw: bool = False) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    preds = lm.predict_frame(X) if raw else lm.predict_transformed(X)
+    return preds, time.perf_counter() - t0
@@ -0,0 +1,232 @@
+# app/utils/metrics.py
+"""
+Prometheus instrumentation for the serving path.
+
+StageTimer splits one request into stages (decode, build, admission, cache,
+transform, predict, encode) and records them as per-model histograms when the request
+finishes. Label children are resolved once and reused, so a request costs a
+few perf_counter() calls and one observe() per stage.
+
+Registry counters (loads, failures, reloads, evictions, ...) and admission
+control state are read at scrape time by RegistryCollector and
+AdmissionCollector, so they add nothing to requests.
+
+Under a multi-process server (app.prefork, gunicorn) set PROMETHEUS_MULTIPROC_DIR
+and /metrics aggregates the histograms of every worker.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Single-row stages sit in the 0.1-10 ms range; batches reach seconds.
+STAGE_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+METRICS_REGISTRY = CollectorRegistry(auto_describe=True)
+
+STAGE_SECONDS = Histogram(
+    "ml_api_stage_seconds",
+    "Time spent in one stage of a prediction request.",
+    ["model", "endpoint", "stage"],
+    buckets=STAGE_BUCKETS,
+    registry=METRICS_REGISTRY,
+)
+REQUEST_SECONDS = Histogram(
+    "ml_api_request_seconds",
+    "End-to-end handler time of a prediction request, by HTTP status code.",
+    ["model", "endpoint", "status"],
+    buckets=STAGE_BUCKETS,
+    registry=METRICS_REGISTRY,
+)
+ROWS_TOTAL = Counter(
+    "ml_api_rows",
+    "Rows scored.",
+    ["model", "endpoint"],
+    registry=METRICS_REGISTRY,
+)
+
+SHADOW_ROWS = Counter(
+    "ml_shadow_rows",
+    "Mirrored rows by outcome: agree/disagree with the primary, or dropped on a full queue.",
+    ["model", "shadow", "result"],
+    registry=METRICS_REGISTRY,
+)
+
+_CHILDREN: Dict[Tuple[str, ...], Any] = {}
+_CHILDREN_LOCK = threading.Lock()
+
+
+def _child(metric: Any, *labels: str) -> Any:
+    key = (id(metric),) + labels
+    child = _CHILDREN.get(key)
+    if child is None:
+        with _CHILDREN_LOCK:
+            child = _CHILDREN.get(key)
+            if child is None:
+                child = _CHILDREN[key] = metric.labels(*labels)
+    return child
+
+
+class StageTimer:
+    """Accumulates per-stage wall time for one request; observe()s on done()."""
+
+    enabled = True
+    __slots__ = ("model", "endpoint", "_start", "_last", "_stages")
+
+    def __init__(self, model: str, endpoint: str):
+        self.model = model
+        self.endpoint = endpoint
+        self._start = self._last = time.perf_counter()
+        self._stages: Dict[str, float] = {}
+
+    def mark(self, stage: str) -> None:
+        """Charge the time since the previous mark to stage."""
+        now = time.perf_counter()
+        self._stages[stage] = self._stages.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def done(self, status: str = "ok", rows: int = 0) -> None:
+        now = time.perf_counter()
+        for stage, sec in self._stages.items():
+            _child(STAGE_SECONDS, self.model, self.endpoint, stage).observe(sec)
+        _child(REQUEST_SECONDS, self.model, self.endpoint, status).observe(now - self._start)
+        if rows:
+            _child(ROWS_TOTAL, self.model, self.endpoint).inc(rows)
+
+
+class _NullTimer:
+    enabled = False
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def done(self, status: str = "ok", rows: int = 0) -> None:
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def stage_timer(model: str, endpoint: str, enabled: bool = True):
+    return StageTimer(model, endpoint) if enabled else NULL_TIMER
+
+
+def shadow_recorder(model: str, shadow: str):
+    """ShadowEvaluator on_result callback feeding ml_shadow_rows_total."""
+    agree = _child(SHADOW_ROWS, model, shadow, "agree")
+    disagree = _child(SHADOW_ROWS, model, shadow, "disagree")
+    dropped = _child(SHADOW_ROWS, model, shadow, "dropped")
+
+    def record(n_agree: int, n_disagree: int, n_dropped: int) -> None:
+        if n_agree:
+            agree.inc(n_agree)
+        if n_disagree:
+            disagree.inc(n_disagree)
+        if n_dropped:
+            dropped.inc(n_dropped)
+
+    return record
+
+
+class RegistryCollector:
+    """Exports ModelRegistry load/eviction counters and per-model residency at scrape time."""
+
+    def __init__(self, registry: Any):
+        self.registry = registry
+
+    def collect(self):
+        st = self.registry.stats()
+        for key, doc in (
+            ("loads", "Model loads (cold loads and reloads)."),
+            ("load_failures", "Model loads that raised."),
+            ("reloads", "Hot reloads that swapped in a new version."),
+            ("single_flight_waits", "Requests that waited on another thread's load of the same model."),
+            ("backoff_rejections", "Requests rejected while a failed model was backing off."),
+            ("preprocessor_cache_hits", "Fallback preprocessors loaded from the disk cache."),
+            ("preprocessor_cache_misses", "Fallback preprocessors fitted from the training CSV."),
+        ):
+            yield CounterMetricFamily(f"ml_registry_{key}", doc, value=st[key])
+
+        evictions = CounterMetricFamily("ml_registry_evictions", "Models evicted from memory.", labels=["model"])
+        loaded = GaugeMetricFamily("ml_registry_model_loaded", "1 if the model is resident.", labels=["model"])
+        resident = GaugeMetricFamily(
+            "ml_registry_model_estimated_bytes", "Estimated resident size of a loaded model.", labels=["model"]
+        )
+        for name, info in self.registry.list_models().items():
+            mem = info["memory"]
+            evictions.add_metric([name], mem["evictions"])
+            loaded.add_metric([name], 1 if info["loaded"] else 0)
+            resident.add_metric([name], mem["estimated_bytes"] or 0)
+        yield evictions
+        yield loaded
+        yield resident
+
+
+class AdmissionCollector:
+    """Exports per-model admission control slots, queue depth and rejections at scrape time."""
+
+    def __init__(self, stats_fn: Callable[[], Dict[str, Dict[str, Any]]]):
+        self.stats_fn = stats_fn  # model name -> AdmissionController.stats()
+
+    def collect(self):
+        in_use = GaugeMetricFamily("ml_api_admission_in_use", "Inference slots held.", labels=["model"])
+        limit = GaugeMetricFamily("ml_api_admission_max_concurrent", "Inference slots available.", labels=["model"])
+        queued = GaugeMetricFamily("ml_api_admission_queued", "Slots requested by queued requests.", labels=["model"])
+        rejected = CounterMetricFamily(
+            "ml_api_admission_rejections", "Requests answered 429.", labels=["model", "reason"]
+        )
+        for name, st in self.stats_fn().items():
+            in_use.add_metric([name], st["in_use"])
+            limit.add_metric([name], st["max_concurrent"])
+            queued.add_metric([name], st["queued"])
+            for reason, n in st["rejected"].items():
+                rejected.add_metric([name, reason], n)
+        yield in_use
+        yield limit
+        yield queued
+        yield rejected
+
+
+_REGISTRY_COLLECTOR: Optional[RegistryCollector] = None
+_ADMISSION_COLLECTOR: Optional[AdmissionCollector] = None
+
+
+def register_model_registry(registry: Any) -> None:
+    """Export a ModelRegistry's counters on /metrics (one registry per process)."""
+    global _REGISTRY_COLLECTOR
+    if _REGISTRY_COLLECTOR is not None:
+        METRICS_REGISTRY.unregister(_REGISTRY_COLLECTOR)
+    _REGISTRY_COLLECTOR = RegistryCollector(registry)
+    METRICS_REGISTRY.register(_REGISTRY_COLLECTOR)
+
+
+def register_admission(stats_fn: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+    """Export admission control state on /metrics (one source per process)."""
+    global _ADMISSION_COLLECTOR
+    if _ADMISSION_COLLECTOR is not None:
+        METRICS_REGISTRY.unregister(_ADMISSION_COLLECTOR)
+    _ADMISSION_COLLECTOR = AdmissionCollector(stats_fn)
+    METRICS_REGISTRY.register(_ADMISSION_COLLECTOR)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Exposition body + content type for /metrics."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        reg = CollectorRegistry()
+        multiprocess.MultiProcessCollector(reg)
+        if _REGISTRY_COLLECTOR is not None:
+            reg.register(_REGISTRY_COLLECTOR)
+        if _ADMISSION_COLLECTOR is not None:
+            reg.register(_ADMISSION_COLLECTOR)
+        return generate_latest(reg), CONTENT_TYPE_LATEST
+    return generate_latest(METRICS_REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,130 @@
+# app/utils/ndjson_stream.py
+"""
+Incremental NDJSON scoring helpers for /v1/stream_predict.
+
+Input is one JSON value per line. It can be a row object ({col: value, ...}),
+an object with a "features" key holding a row object or list, or a list in
+feature order. Bytes are fed in whatever pieces the server reads. Complete
+lines are parsed and grouped into chunks of at most chunk_rows rows, so at
+most one chunk plus one partial line is held in memory at a time.
+
+Each input line produces exactly one output line, in input order:
+    {"row": 0, "prediction": 1}
+    {"row": 1, "error": "..."}
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class Chunk:
+    """Parsed rows (with their input line index) plus the lines that failed to parse."""
+
+    __slots__ = ("indices", "rows", "errors")
+
+    def __init__(self):
+        self.indices: List[int] = []
+        self.rows: List[Any] = []
+        self.errors: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.indices) + len(self.errors)
+
+
+def _parse_line(line: bytes, feature_names: List[str]) -> dict:
+    value = json.loads(line)
+    if isinstance(value, dict) and "features" in value:
+        value = value["features"]
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, list):
+        if len(value) != len(feature_names):
+            raise ValueError(f"Feature length mismatch. Got {len(value)} items; expected {len(feature_names)}.")
+        return dict(zip(feature_names, value))
+    raise ValueError("each line must be a JSON object or list")
+
+
+class NDJSONChunker:
+    """Turns a byte stream into Chunks of at most chunk_rows lines."""
+
+    def __init__(self, feature_names: List[str], chunk_rows: int = 1000):
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be >= 1")
+        self.feature_names = feature_names
+        self.chunk_rows = int(chunk_rows)
+        self._buf = b""
+        self._next_index = 0
+        self._chunk = Chunk()
+
+    def feed(self, data: bytes) -> List[Chunk]:
+        """Consume bytes; return every chunk that filled up."""
+        ready: List[Chunk] = []
+        self._buf += data
+        *lines, self._buf = self._buf.split(b"\n")
+        for line in lines:
+            full = self._add(line)
+            if full is not None:
+                ready.append(full)
+        return ready
+
+    def finish(self) -> Optional[Chunk]:
+        """Flush the trailing line (no final newline) and the last partial chunk."""
+        if self._buf:
+            self._add(self._buf)
+            self._buf = b""
+        chunk, self._chunk = self._chunk, Chunk()
+        return chunk if len(chunk) else None
+
+    def _add(self, line: bytes) -> Optional[Chunk]:
+        line = line.strip()
+        if not line:
+            return None
+        i = self._next_index
+        self._next_index += 1
+        try:
+            self._chunk.rows.append(_parse_line(line, self.feature_names))
+            self._chunk.indices.append(i)
+        except ValueError as e:  # json.JSONDecodeError is a ValueError
+            self._chunk.errors.append((i, str(e)))
+        if len(self._chunk) >= self.chunk_rows:
+            chunk, self._chunk = self._chunk, Chunk()
+            return chunk
+        return None
+
+
+def iter_chunks(reads: Iterable[bytes], chunker: NDJSONChunker) -> Iterator[Chunk]:
+    for data in reads:
+        yield from chunker.feed(data)
+    last = chunker.finish()
+    if last is not None:
+        yield last
+
+
+def score_chunk(
+    chunk: Chunk,
+    feature_names: List[str],
+    predict_frame: Callable[[pd.DataFrame], Any],
+) -> bytes:
+    """
+    Score one chunk and return its output lines. If the whole frame fails,
+    rows are scored one at a time so a single bad row only fails its own line.
+    """
+    out = {i: {"row": i, "error": msg} for i, msg in chunk.errors}
+    if chunk.rows:
+        df = pd.DataFrame(chunk.rows).reindex(columns=feature_names)
+        try:
+            preds = predict_frame(df)
+            for i, p in zip(chunk.indices, preds):
+                out[i] = {"row": i, "prediction": int(p)}
+        except Exception:
+            for pos, i in enumerate(chunk.indices):
+                try:
+                    out[i] = {"row": i, "prediction": int(predict_frame(df.iloc[[pos]])[0])}
+                except Exception as e:
+                    out[i] = {"row": i, "error": str(e)}
+    return b"".join(json.dumps(out[i]).encode() + b"\n" for i in sorted(out))
@@ -0,0 +1,185 @@
+# app/utils/parallel.py
+"""
+Adaptive execution plan for batch scoring.
+
+A small batch is scored inline on the request thread, with the estimator's own
+joblib threading off (n_jobs=1). For a few hundred rows, dispatch costs more
+than it saves. A batch of inline_max_rows or more is cut into row chunks that
+are scored on a thread pool. Tree traversal and most of the NumPy work release
+the GIL, so the chunks run on separate cores.
+
+inline_max_rows comes from calibrate(), which runs at warm-up. It times both
+strategies on resampled training rows and fits time = fixed + per_row * n to
+each. The threshold goes where the parallel line drops below the inline one.
+With a single worker, or when the parallel run never wins, every batch stays
+inline. Requests never trigger a calibration: a model that was not warmed up
+uses the configured inline_max_rows, or scores every batch inline.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+CALIBRATION_SIZES = (256, 2048, 16384)
+
+
+def disable_estimator_threads(obj: Any) -> Optional[int]:
+    """
+    Set n_jobs=1 on the final estimator (the plan owns parallelism now) and
+    return the previous value, or None if there was nothing to change.
+    """
+    est = obj.steps[-1][1] if hasattr(obj, "steps") else obj
+    n_jobs = getattr(est, "n_jobs", None)
+    if n_jobs in (None, 1):
+        return None
+    est.n_jobs = 1
+    return n_jobs
+
+
+class ExecutionPolicy:
+    """Picks inline or chunked-parallel scoring per batch size; see the module docstring."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_chunk_rows: int = 50000,
+        inline_max_rows: Optional[int] = None,
+        margin: float = 0.1,
+    ):
+        if max_chunk_rows < 1:
+            raise ValueError("max_chunk_rows must be >= 1")
+        self.workers = int(workers) if workers else (os.cpu_count() or 1)
+        self.max_chunk_rows = int(max_chunk_rows)
+        self.margin = float(margin)  # parallel must be this much cheaper per row to count as a win
+        self.inline_max_rows = int(inline_max_rows) if inline_max_rows else None  # None = always inline
+        self.calibration: Optional[Dict[str, Any]] = (
+            {"source": "config"} if self.inline_max_rows is not None else None
+        )
+        self.estimator_n_jobs: Optional[int] = None  # value disable_estimator_threads() replaced
+
+        self._lock = threading.Lock()
+        self.batches_inline = 0
+        self.batches_parallel = 0
+        self.rows_parallel = 0
+
+    # ----------------------------- planning -----------------------------
+
+    def plan(self, n_rows: int) -> Dict[str, Any]:
+        """How a batch of n_rows would be scored right now."""
+        if self.workers < 2 or self.inline_max_rows is None or n_rows < self.inline_max_rows:
+            return {"mode": "inline", "rows": n_rows, "chunks": 1, "workers": 1,
+                    "inline_max_rows": self.inline_max_rows}
+        chunks = max(self.workers, math.ceil(n_rows / self.max_chunk_rows))
+        return {"mode": "parallel", "rows": n_rows, "chunks": chunks, "workers": min(self.workers, chunks),
+                "inline_max_rows": self.inline_max_rows}
+
+    def run(
+        self,
+        df: pd.DataFrame,
+        predict_fn: Callable[[pd.DataFrame], Any],
+        chunk_fn: Optional[Callable[[pd.DataFrame], Any]] = None,
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Score df according to plan(len(df)); returns (predictions, plan).
+        chunk_fn scores the chunks of a parallel plan (default predict_fn); it
+        must be safe to call from several threads at once.
+        """
+        plan = self.plan(len(df))
+        if plan["mode"] == "inline":
+            preds = np.asarray(predict_fn(df))
+            with self._lock:
+                self.batches_inline += 1
+            return preds, plan
+        preds = self._run_chunked(df, chunk_fn or predict_fn, plan["chunks"])
+        with self._lock:
+            self.batches_parallel += 1
+            self.rows_parallel += len(df)
+        return preds, plan
+
+    def _run_chunked(self, df: pd.DataFrame, predict_fn: Callable[[pd.DataFrame], Any], chunks: int) -> np.ndarray:
+        bounds = np.linspace(0, len(df), chunks + 1).astype(int)
+        parts = [df.iloc[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        # A pool per batch: thread start-up is noise next to a batch this size, and
+        # nothing lingers when the LoadedModel is evicted or replaced.
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(parts)), thread_name_prefix="score") as pool:
+            results = list(pool.map(predict_fn, parts))
+        return np.concatenate([np.asarray(r) for r in results])
+
+    # ----------------------------- calibration -----------------------------
+
+    def calibrate(
+        self,
+        predict_fn: Callable[[pd.DataFrame], Any],
+        sample: pd.DataFrame,
+        sizes: Sequence[int] = CALIBRATION_SIZES,
+        repeats: int = 2,
+    ) -> Dict[str, Any]:
+        """Time inline vs chunked scoring at each size and set inline_max_rows from the fit."""
+        t0 = time.perf_counter()
+        if self.workers < 2:
+            result: Dict[str, Any] = {"source": "calibration", "inline_max_rows": None, "reason": "single worker"}
+            self.inline_max_rows, self.calibration = None, result
+            return result
+
+        rng = np.random.default_rng(0)
+        sizes = sorted(int(n) for n in sizes)
+        inline_sec: List[float] = []
+        parallel_sec: List[float] = []
+        for n in sizes:
+            df = sample.iloc[rng.integers(0, len(sample), n)].reset_index(drop=True)
+            inline_sec.append(_best_of(lambda: predict_fn(df), repeats))
+            parallel_sec.append(_best_of(lambda: self._run_chunked(df, predict_fn, self.workers), repeats))
+
+        per_row_in, fixed_in = np.polyfit(sizes, inline_sec, 1)
+        per_row_par, fixed_par = np.polyfit(sizes, parallel_sec, 1)
+        if per_row_par >= per_row_in * (1.0 - self.margin):
+            threshold, reason = None, "parallel never cheaper per row"
+        else:
+            crossover = (fixed_par - fixed_in) / (per_row_in - per_row_par)
+            threshold, reason = max(sizes[0], int(math.ceil(crossover))), "crossover"
+
+        result = {
+            "source": "calibration",
+            "inline_max_rows": threshold,
+            "reason": reason,
+            "workers": self.workers,
+            "sizes": sizes,
+            "inline_ms": [round(1000 * s, 3) for s in inline_sec],
+            "parallel_ms": [round(1000 * s, 3) for s in parallel_sec],
+            "speedup_per_row": float(per_row_in / per_row_par) if per_row_par > 0 else None,
+            "calibration_sec": round(time.perf_counter() - t0, 3),
+        }
+        self.inline_max_rows, self.calibration = threshold, result
+        return result
+
+    # ----------------------------- admin -----------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_chunk_rows": self.max_chunk_rows,
+                "inline_max_rows": self.inline_max_rows,
+                "estimator_n_jobs": self.estimator_n_jobs,
+                "calibration": self.calibration,
+                "batches_inline": self.batches_inline,
+                "batches_parallel": self.batches_parallel,
+                "rows_parallel": self.rows_parallel,
+            }
+
+
+def _best_of(fn: Callable[[], Any], repeats: int) -> float:
+    fn()  # warm caches / pool threads
+    best = math.inf
+    for _ in range(max(1, repeats)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
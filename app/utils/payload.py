@@ -0,0 +1,181 @@
+# app/utils/payload.py
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+# Minimal vs full Titanic raw schemas
+MINIMAL_FEATURES = ["Pclass", "Sex", "Age", "Fare"]
+FULL_TITANIC_FEATURES = [
+    "PassengerId", "Pclass", "Name", "Sex", "Age", "SibSp",
+    "Parch", "Ticket", "Fare", "Cabin", "Embarked",
+]
+
+# Row used at load time to find out which 4-item shape a model accepts.
+PROBE_MINIMAL_VALUES = [3, 0, 22.0, 7.25]
+
+
+# --------------------------------------------------------------------------------------
+# Row building
+# --------------------------------------------------------------------------------------
+def normalize_minimal_dict(d: dict) -> dict:
+    """Ensure minimal dict uses consistent types/values."""
+    out = dict(d)
+    # Sex can be 0/1 or string
+    sex = out.get("Sex")
+    if isinstance(sex, (int, float)):
+        out["Sex"] = "male" if int(sex) == 0 else "female"
+    elif isinstance(sex, str):
+        s = sex.strip().lower()
+        if s in ("0", "male", "m"):
+            out["Sex"] = "male"
+        elif s in ("1", "female", "f"):
+            out["Sex"] = "female"
+        else:
+            out["Sex"] = s
+    else:
+        out["Sex"] = "male"  # safe default
+
+    # Light coercion
+    out["Pclass"] = int(out.get("Pclass", 3) or 3)
+    out["Age"] = float(out.get("Age", 0) or 0)
+    out["Fare"] = float(out.get("Fare", 0) or 0)
+    return out
+
+
+def expand_minimal_to_full(mini: dict) -> dict:
+    mini = normalize_minimal_dict(mini)
+    return {
+        "PassengerId": 0,
+        "Pclass": mini["Pclass"],
+        "Name": "",
+        "Sex": mini["Sex"],
+        "Age": mini["Age"],
+        "SibSp": 0,
+        "Parch": 0,
+        "Ticket": "",
+        "Fare": mini["Fare"],
+        "Cabin": "",
+        "Embarked": "S",
+    }
+
+
+def minimal_row(mini: dict, feature_names: List[str]) -> dict:
+    """4-item payload as-is, restricted to the minimal columns the model knows."""
+    return {c: mini[c] for c in feature_names if c in MINIMAL_FEATURES}
+
+
+def full_row(mini: dict, feature_names: List[str]) -> dict:
+    """4-item payload expanded to the full Titanic schema, reindexed to feature_names."""
+    mini_full = expand_minimal_to_full(mini)
+    return {c: mini_full.get(c, float("nan")) for c in feature_names}
+
+
+def flex_build_one_row(features, feature_names: List[str]):
+    """
+    Accept dict or list. Robust to both 4-col and full 11-col requests.
+    Returns a row dict keyed by the columns the one-row frame would have.
+    - dict: if exactly minimal keys, expand to full; else reindex to model's feature_names.
+    - list: if length == model feature count, use directly; if length==4, return two candidates.
+    """
+    # dict payload
+    if isinstance(features, dict):
+        f = features
+        if set(f.keys()) == set(MINIMAL_FEATURES):
+            f = expand_minimal_to_full(f)
+        return {c: f.get(c, float("nan")) for c in feature_names}
+
+    # list payload
+    if isinstance(features, list):
+        if len(features) == len(feature_names):
+            return dict(zip(feature_names, features))
+
+        if len(features) == 4:
+            mini = dict(zip(MINIMAL_FEATURES, features))
+            return {"_candidates": [minimal_row(mini, feature_names), full_row(mini, feature_names)]}
+
+        raise ValueError(
+            f"Feature length mismatch. Got {len(features)} items; "
+            f"expected {len(feature_names)} or 4 (minimal)."
+        )
+
+    raise ValueError("features must be a dict or list")
+
+
+def row_to_df(row: dict) -> pd.DataFrame:
+    return pd.DataFrame([row], columns=list(row.keys()))
+
+
+# --------------------------------------------------------------------------------------
+# Per-model payload adapter
+# --------------------------------------------------------------------------------------
+class PayloadAdapter:
+    """
+    Builds exactly one input row per request for a model whose 4-item shape
+    ("minimal" or "full") was resolved at load time. With shape "unknown" it
+    keeps the old behaviour and returns both candidates.
+    """
+
+    SHAPES = ("minimal", "full", "unknown")
+
+    def __init__(self, shape: str, feature_names: List[str]):
+        if shape not in self.SHAPES:
+            raise ValueError(f"Unknown payload shape '{shape}'")
+        self.shape = shape
+        self.feature_names = feature_names
+        self._lock = threading.Lock()
+        self.resolved_requests = 0
+        self.candidate_builds_saved = 0
+        self.failed_predicts_saved = 0
+
+    def build(self, features):
+        """Like flex_build_one_row, but a 4-item list yields a single row."""
+        if (
+            self.shape != "unknown"
+            and isinstance(features, list)
+            and len(features) == 4
+            and len(features) != len(self.feature_names)
+        ):
+            mini = dict(zip(MINIMAL_FEATURES, features))
+            with self._lock:
+                # The old path built both candidates and, for "full" models,
+                # ran (and failed) a predict on the minimal one first.
+                self.resolved_requests += 1
+                self.candidate_builds_saved += 1
+                if self.shape == "full":
+                    self.failed_predicts_saved += 1
+            if self.shape == "minimal":
+                return minimal_row(mini, self.feature_names)
+            return full_row(mini, self.feature_names)
+        return flex_build_one_row(features, self.feature_names)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "shape": self.shape,
+                "resolved_requests": self.resolved_requests,
+                "candidate_builds_saved": self.candidate_builds_saved,
+                "failed_predicts_saved": self.failed_predicts_saved,
+            }
+
+
+def resolve_payload_adapter(
+    predict_fn: Callable[[pd.DataFrame], Any],
+    feature_names: List[str],
+) -> PayloadAdapter:
+    """
+    Probe which 4-item shape the model accepts, trying the same order the
+    request path used to: minimal first, then expanded to full.
+    """
+    mini = dict(zip(MINIMAL_FEATURES, PROBE_MINIMAL_VALUES))
+    for shape, row in (("minimal", minimal_row(mini, feature_names)), ("full", full_row(mini, feature_names))):
+        if not row:
+            continue
+        try:
+            predict_fn(row_to_df(row))
+            return PayloadAdapter(shape, feature_names)
+        except Exception:
+            continue
+    return PayloadAdapter("unknown", feature_names)
@@ -0,0 +1,113 @@
+# app/utils/pred_cache.py
+from __future__ import annotations
+
+import math
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+# Stand-in for NaN inside keys: NaN != NaN, so it can't be looked up as-is.
+_NAN = ("__nan__",)
+
+
+def _canon(v: Any) -> Any:
+    if isinstance(v, float) and math.isnan(v):
+        return _NAN
+    if hasattr(v, "item") and not isinstance(v, (str, bytes)):  # numpy scalar -> python
+        v = v.item()
+        if isinstance(v, float) and math.isnan(v):
+            return _NAN
+    return v
+
+
+def row_key(values: Iterable[Any]) -> Tuple[Any, ...]:
+    """
+    Canonical, hashable key for one row already ordered like feature_names.
+    Equal values hash equal across python/numpy types (3 == 3.0 == np.int64(3)),
+    which matches how both the numeric and one-hot paths treat them.
+    """
+    return tuple(_canon(v) for v in values)
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of row key -> prediction with a size bound and an
+    optional TTL. The cache is bound to one LoadedModel instance and clears
+    itself when a different instance is presented (reload, eviction, ...).
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_sec: Optional[float] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = int(max_entries)
+        self.ttl_sec = float(ttl_sec) if ttl_sec else None
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._owner: Optional[weakref.ref] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # ----------------------------- public API -----------------------------
+
+    def bind(self, lm: Any) -> None:
+        """Drop every entry if lm is not the model the cache was filled from."""
+        owner = self._owner() if self._owner is not None else None
+        if owner is lm:
+            return
+        with self._lock:
+            owner = self._owner() if self._owner is not None else None
+            if owner is not lm:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self._owner = weakref.ref(lm)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires = item
+            if expires and expires < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl_sec if self.ttl_sec else 0.0
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_sec": self.ttl_sec,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
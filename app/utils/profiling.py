@@ -0,0 +1,243 @@
+# app/utils/profiling.py
+"""
+Per-request cProfile for the prediction endpoints (api.profiling in config.yaml).
+
+There are two ways a request gets profiled.
+
+On demand: send header X-Profile: 1 or query ?profile=1, plus X-Profile-Token
+if a token is configured. That one request runs under cProfile, and two files
+are written to the profile directory:
+
+- <id>.prof: raw pstats, for snakeviz or pstats.Stats.
+- <id>.txt: a report with own time grouped by package (pandas, sklearn, numpy,
+  app, ...), the top functions by cumulative and own time, and the callees of
+  the hottest functions.
+
+The response carries X-Profile-Url pointing at the report.
+
+Sampled: with sample_every=N, one request in N is profiled automatically and
+folded into a rolling aggregate per (model, endpoint). Each aggregate covers
+roughly the last `window` samples. It is kept as two generations of merged
+pstats, so memory does not grow with traffic.
+
+Only one request is profiled at a time. cProfile sees only the request thread,
+so work a request hands to another thread (micro-batcher flush, parallel
+chunks, shadow scoring) appears as a wait.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import itertools
+import pstats
+import re
+import sysconfig
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PROFILE_ID_RE = re.compile(r"^[0-9A-Za-z_.-]+$")
+_STDLIB = sysconfig.get_paths()["stdlib"].replace("\\", "/")
+
+# own-time buckets by source path; first match wins
+_PACKAGES = (
+    ("pandas", "/pandas/"),
+    ("sklearn", "/sklearn/"),
+    ("numpy", "/numpy/"),
+    ("scipy", "/scipy/"),
+    ("joblib", "/joblib/"),
+    ("pyarrow", "/pyarrow/"),
+    ("msgspec", "/msgspec/"),
+    ("flask/werkzeug", "/werkzeug/"),
+    ("flask/werkzeug", "/flask/"),
+    ("app", "/app/"),
+)
+
+
+def _package(filename: str) -> str:
+    if filename == "~":
+        return "builtins/C"
+    path = filename.replace("\\", "/")
+    for name, marker in _PACKAGES:
+        if marker in path:
+            return name
+    if path.startswith(_STDLIB) and "-packages/" not in path:
+        return "stdlib"
+    return "other"
+
+
+def report(stats: pstats.Stats, title: str, top_n: int = 30) -> str:
+    """Text report: own time by package, top functions, and callees of the hottest ones."""
+    total = stats.total_tt or 1e-12
+    by_pkg: Dict[str, float] = defaultdict(float)
+    for (filename, _, _), (_, _, tt, _, _) in stats.stats.items():
+        by_pkg[_package(filename)] += tt
+
+    out = io.StringIO()
+    out.write(f"{title}\n")
+    out.write(f"profiled time {1000 * stats.total_tt:.2f} ms, {stats.total_calls} calls\n\n")
+    out.write("Own time by package\n")
+    for pkg, tt in sorted(by_pkg.items(), key=lambda kv: -kv[1]):
+        out.write(f"  {pkg:<16} {1000 * tt:9.2f} ms  {100 * tt / total:5.1f}%\n")
+
+    stats.stream = out
+    out.write("\n== Top functions by cumulative time ==\n")
+    stats.sort_stats("cumulative").print_stats(top_n)
+    out.write("\n== Top functions by own time ==\n")
+    stats.sort_stats("tottime").print_stats(top_n)
+    out.write("\n== Call tree (callees of the top cumulative functions) ==\n")
+    stats.sort_stats("cumulative").print_callees(max(1, top_n // 3))
+    return out.getvalue()
+
+
+class _Rolling:
+    """Merged pstats over roughly the last `window` samples (two generations)."""
+
+    def __init__(self, window: int):
+        self.half = max(1, window // 2)
+        self.current: Optional[pstats.Stats] = None
+        self.previous: Optional[pstats.Stats] = None
+        self.current_n = 0
+        self.samples = 0
+        self.wall_sec = 0.0
+
+    def add(self, prof: cProfile.Profile, wall_sec: float) -> None:
+        if self.current_n >= self.half:
+            self.previous, self.current, self.current_n = self.current, None, 0
+        if self.current is None:
+            self.current = pstats.Stats(prof)
+        else:
+            self.current.add(prof)
+        self.current_n += 1
+        self.samples += 1
+        self.wall_sec += wall_sec
+
+    def merged(self) -> Optional[pstats.Stats]:
+        parts = [s for s in (self.previous, self.current) if s is not None]
+        if not parts:
+            return None
+        merged = pstats.Stats()  # fresh copy: printing sorts in place
+        merged.add(*parts)
+        return merged
+
+
+class RequestProfiler:
+    """Runs selected requests under cProfile; see the module docstring."""
+
+    def __init__(
+        self,
+        out_dir: Path,
+        token: Optional[str] = None,
+        sample_every: int = 0,
+        window: int = 100,
+        keep: int = 50,
+        top_n: int = 30,
+    ):
+        self.out_dir = Path(out_dir)
+        self.token = str(token) if token else None
+        self.sample_every = max(0, int(sample_every))
+        self.window = int(window)
+        self.keep = max(1, int(keep))
+        self.top_n = int(top_n)
+
+        self._busy = threading.Lock()  # one profile at a time
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._recent: deque = deque()  # explicit profiles, oldest first
+        self._rolling: Dict[Tuple[str, str], _Rolling] = {}
+
+        self.explicit = 0
+        self.sampled = 0
+        self.skipped_busy = 0
+
+    # ----------------------------- request side -----------------------------
+
+    def mode(self, requested: bool, token: Optional[str]) -> Optional[str]:
+        """'explicit', 'sampled' or None. Raises PermissionError for a bad token."""
+        if requested:
+            if not self.authorized(token):
+                raise PermissionError("Profiling requires a valid X-Profile-Token.")
+            return "explicit"
+        if self.sample_every and next(self._counter) % self.sample_every == 0:
+            return "sampled"
+        return None
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return self.token is None or token == self.token
+
+    def run(self, fn: Callable[[], Any], model: str, endpoint: str, mode: str) -> Tuple[Any, Optional[str]]:
+        """Call fn under the profiler; returns (fn's result, profile id or None)."""
+        if not self._busy.acquire(blocking=False):
+            with self._lock:
+                self.skipped_busy += 1
+            return fn(), None
+        prof = cProfile.Profile()
+        t0 = time.perf_counter()
+        try:
+            result = prof.runcall(fn)
+        finally:
+            self._busy.release()
+        wall = time.perf_counter() - t0
+
+        if mode == "sampled":
+            with self._lock:
+                self.sampled += 1
+                self._rolling.setdefault((model, endpoint), _Rolling(self.window)).add(prof, wall)
+            return result, None
+        return result, self._write(prof, model, endpoint, wall)
+
+    def _write(self, prof: cProfile.Profile, model: str, endpoint: str, wall: float) -> str:
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{model}-{endpoint}-{uuid.uuid4().hex[:6]}"
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(str(self.out_dir / f"{profile_id}.prof"))
+        title = f"{endpoint} model={model} wall={1000 * wall:.2f} ms id={profile_id}"
+        text = report(pstats.Stats(prof), title, self.top_n)
+        (self.out_dir / f"{profile_id}.txt").write_text(text, encoding="utf-8")
+
+        with self._lock:
+            self.explicit += 1
+            self._recent.append({"id": profile_id, "model": model, "endpoint": endpoint,
+                                 "wall_ms": 1000 * wall, "created": time.time()})
+            expired = [self._recent.popleft() for _ in range(len(self._recent) - self.keep)]
+        for old in expired:
+            for suffix in (".prof", ".txt"):
+                (self.out_dir / f"{old['id']}{suffix}").unlink(missing_ok=True)
+        return profile_id
+
+    # ----------------------------- reading -----------------------------
+
+    def path(self, profile_id: str, suffix: str) -> Optional[Path]:
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        p = self.out_dir / f"{profile_id}{suffix}"
+        return p if p.exists() else None
+
+    def aggregate(self, model: str, endpoint: str) -> Optional[Tuple[str, pstats.Stats]]:
+        """(text report, merged stats) of the rolling sampled aggregate, or None if empty."""
+        with self._lock:
+            rolling = self._rolling.get((model, endpoint))
+            merged = rolling.merged() if rolling is not None else None
+            if merged is None:
+                return None
+            title = (f"{endpoint} model={model} sampled aggregate: {rolling.samples} samples since start, "
+                     f"avg wall {1000 * rolling.wall_sec / rolling.samples:.2f} ms")
+        return report(merged, title, self.top_n), merged
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            aggregates: List[Dict[str, Any]] = [
+                {"model": m, "endpoint": e, "samples": r.samples,
+                 "avg_wall_ms": 1000 * r.wall_sec / r.samples if r.samples else None}
+                for (m, e), r in self._rolling.items()
+            ]
+            return {
+                "sample_every": self.sample_every,
+                "explicit": self.explicit,
+                "sampled": self.sampled,
+                "skipped_busy": self.skipped_busy,
+                "recent": list(self._recent)[::-1],
+                "aggregates": aggregates,
+            }
@@ -1,17 +1,44 @@
 # app/utils/registry.py
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import joblib
+import numpy as np
 import pandas as pd
+import sklearn
 import yaml
 from sklearn.pipeline import Pipeline
 
+import preprocessing.schema as data_schema
+from app.utils import tracing
+from app.utils.compiled import compile_model
+from app.utils.fanout import preprocessor_fingerprint
+from app.utils.parallel import ExecutionPolicy, disable_estimator_threads
+from app.utils.typed_io import build_codec
+from app.utils.payload import (
+    MINIMAL_FEATURES,
+    PROBE_MINIMAL_VALUES,
+    PayloadAdapter,
+    flex_build_one_row,
+    full_row,
+    minimal_row,
+    resolve_payload_adapter,
+    row_to_df,
+)
+
 
 @dataclass
 class LoadedModel:
@@ -23,6 +50,107 @@ class LoadedModel:
     is_pipeline: bool
     fallback_preprocessor: Optional[Any]  # fitted preprocessor if obj is not a full pipeline
     train_csv_path: Path
+    schema: Optional[Dict[str, Any]] = None  # dtype/category manifest of the train CSV (preprocessing.schema)
+    compiled: Optional[Any] = None  # NumPy-only single-row predictor, None if not compilable
+    payload_adapter: Optional[PayloadAdapter] = None  # 4-item payload shape resolved at load
+    codec: Optional[Any] = None  # msgspec request decoders/encoders (app.utils.typed_io), None if off
+    exec_policy: Optional[Any] = None  # inline vs chunked-parallel batch plan (app.utils.parallel), None if off
+    prep_fingerprint: Optional[str] = None  # hash of the fitted preprocessor; equal => fan-out shares the transform
+    load_total_sec: float = 0.0  # whole _load_model (artifact, feature names, fallback, compile, probe)
+    warmup_sec: Optional[float] = None
+    first_prediction_sec: Optional[float] = None  # load start -> first completed prediction
+    load_started: float = 0.0  # perf_counter() when loading began
+    version: str = ""  # short content hash of model + feature-names artifacts
+    artifact_stamp: tuple = ()  # (mtime_ns, size) of those artifacts, for cheap change checks
+    estimated_bytes: int = 0  # resident size estimate used by the memory budget
+    last_access: float = 0.0  # time.time() of the last ModelRegistry.get hit
+
+    def predict_frame(self, df: pd.DataFrame):
+        """Predict a DataFrame with either pipeline or (preproc + model)."""
+        if self.is_pipeline:
+            return self.obj.predict(df)
+        X = self.fallback_preprocessor.transform(df)
+        return self.obj.predict(X)
+
+    def transform_frame(self, df: pd.DataFrame):
+        """Preprocessing half of predict_frame (pipeline steps before the estimator)."""
+        if self.is_pipeline:
+            return self.obj[:-1].transform(df) if len(self.obj.steps) > 1 else df
+        return self.fallback_preprocessor.transform(df)
+
+    def predict_transformed(self, X):
+        """Estimator half of predict_frame; transform_frame then this == predict_frame."""
+        if self.is_pipeline:
+            return self.obj.steps[-1][1].predict(X)
+        return self.obj.predict(X)
+
+    def mark_prediction(self) -> None:
+        """Record time-to-first-prediction (no-op after the first one)."""
+        if self.first_prediction_sec is None:
+            self.first_prediction_sec = time.perf_counter() - self.load_started
+
+    def timings(self) -> Dict[str, Optional[float]]:
+        return {
+            "loaded_sec": self.loaded_sec,
+            "load_total_sec": self.load_total_sec,
+            "warmup_sec": self.warmup_sec,
+            "first_prediction_sec": self.first_prediction_sec,
+        }
+
+
+_HASH_CHUNK = 1 << 20
+
+
+class ModelLoadError(RuntimeError):
+    """A recent load of this model failed and it is still inside its retry backoff."""
+
+
+class ModelNotFound(KeyError):
+    """The model name is not configured under models: in config.yaml."""
+
+    def __str__(self) -> str:
+        return str(self.args[0]) if self.args else ""
+
+
+def _estimate_nbytes(obj: Any, skip: tuple = ()) -> int:
+    """
+    Rough resident size of an object graph: numpy buffers by nbytes, containers
+    and scalars by sys.getsizeof, everything else through __getstate__ (which is
+    how sklearn trees expose their node arrays). Shared objects count once, and
+    objects in `skip` (counted separately by the caller) not at all.
+    """
+    seen: set = {id(o) for o in skip}
+    keep: list = []  # keep temporary state dicts alive so their ids aren't reused
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        keep.append(o)
+        if isinstance(o, np.ndarray):
+            total += o.nbytes + sys.getsizeof(o) - (o.nbytes if o.flags.owndata else 0)
+            if o.dtype == object:
+                stack.extend(o.ravel().tolist())
+        elif isinstance(o, (str, bytes, int, float, bool, type(None))):
+            total += sys.getsizeof(o)
+        elif isinstance(o, dict):
+            total += sys.getsizeof(o)
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            total += sys.getsizeof(o)
+            stack.extend(o)
+        else:
+            total += sys.getsizeof(o)
+            try:
+                state = o.__getstate__()
+            except Exception:
+                state = None
+            if state is not None and state is not o:
+                stack.append(state)
+    return total
 
 
 class ModelRegistry:
@@ -40,6 +168,15 @@ class ModelRegistry:
           feature_names_path: model/ash_test_model/feature_names.json
           train_csv_path: data/raw/train.csv
           target_col: Survived
+          compile: true        # optional, build a NumPy-only single-row predictor
+
+    With api.warmup.enabled, start_warmup() loads every model concurrently and
+    runs a synthetic predict on each; `ready` stays False until all are warm.
+
+    With api.hot_reload.enabled, start_watcher() polls each loaded model's
+    artifacts and reload()s it when their content changes: the new version is
+    loaded and warmed in the background, then swapped in. Requests that already
+    hold the old LoadedModel finish on it. rollback() swaps the previous version back.
     """
 
     def __init__(self, config_path: Path):
@@ -52,53 +189,449 @@ class ModelRegistry:
         self._model_cfgs: Dict[str, Dict[str, Any]] = self.config.get("models", {}) or {}
         self._cache: Dict[str, LoadedModel] = {}
 
+        # eager warm-up state (lazy mode never sets _warmup_started)
+        self._warmup_started = False
+        self._warmup_done = threading.Event()
+        self._warm_state: Dict[str, Dict[str, Any]] = {}
+        self._warmup_thread: Optional[threading.Thread] = None
+
+        # hot reload state
+        reload_cfg = self.api_cfg.get("hot_reload") or {}
+        self._keep_versions = max(1, int(reload_cfg.get("keep_versions", 1)))
+        self._history: Dict[str, deque] = {}
+        self._ignored_stamps: Dict[str, tuple] = {}  # disk state a rollback chose not to serve
+        self._reload_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.reload_count = 0
+
+        # on-disk cache of fitted fallback preprocessors
+        self.preprocessor_cache_hits = 0
+        self.preprocessor_cache_misses = 0
+
+        # single-flight loading: one lock per configured model, failures kept for a backoff
+        self._load_locks: Dict[str, threading.Lock] = {n: threading.Lock() for n in self._model_cfgs}
+        self._failed_loads: Dict[str, tuple] = {}  # name -> (retry_after_monotonic, exception)
+        self._load_failure_backoff = float(self.api_cfg.get("load_failure_backoff_sec", 5))
+        self._stats_lock = threading.Lock()
+        self.loads = 0
+        self.load_failures = 0
+        self.single_flight_waits = 0
+        self.backoff_rejections = 0
+
+        # memory budget: LRU eviction of unpinned models once resident estimates exceed it
+        budget_mb = self.api_cfg.get("memory_budget_mb")
+        self._memory_budget: Optional[int] = int(float(budget_mb) * 1024 * 1024) if budget_mb else None
+        self._evictions: Dict[str, int] = {}
+        self._budget_lock = threading.Lock()
+
     # ----------------------------- public API -----------------------------
 
-    def list_models(self) -> Dict[str, Dict[str, str]]:
+    def list_models(self) -> Dict[str, Dict[str, Any]]:
         """Return a lightweight view of configured models."""
-        out: Dict[str, Dict[str, str]] = {}
+        out: Dict[str, Dict[str, Any]] = {}
         for name, cfg in self._model_cfgs.items():
             out[name] = {
                 "model_path": str(self._abs(cfg.get("model_path"))),
                 "feature_names_path": str(self._abs(cfg.get("feature_names_path"))) if cfg.get("feature_names_path") else "",
                 "train_csv_path": str(self._abs(cfg.get("train_csv_path"))),
+                "schema_path": str(self._abs(cfg.get("schema_path"))) if cfg.get("schema_path") else "",
                 "target_col": str(cfg.get("target_col", "")),
             }
+            lm = self._cache.get(name)
+            out[name]["loaded"] = lm is not None
+            out[name]["version"] = lm.version if lm is not None else None
+            out[name]["previous_versions"] = [p.version for p in self._history.get(name, ())]
+            out[name]["timings"] = lm.timings() if lm is not None else None
+            out[name]["warmup"] = self._warm_state.get(name)
+            out[name]["memory"] = {
+                "resident": lm is not None,
+                "pinned": bool(cfg.get("pin", False)),
+                "estimated_bytes": lm.estimated_bytes if lm is not None else None,
+                "compiled_bytes": lm.compiled.forest.nbytes if lm is not None and lm.compiled is not None else None,
+                "last_access": lm.last_access if lm is not None else None,
+                "evictions": self._evictions.get(name, 0),
+            }
         return out
 
+    @property
+    def ready(self) -> bool:
+        """True unless an eager warm-up is running or left a model cold."""
+        if not self._warmup_started:
+            return True
+        return self._warmup_done.is_set() and all(
+            st.get("status") == "warm" for st in self._warm_state.values()
+        )
+
+    def start_warmup(self, max_workers: Optional[int] = None) -> threading.Thread:
+        """Run warm_up_all() in a background thread so the server can answer /health meanwhile."""
+        self._warmup_started = True
+        t = threading.Thread(target=self._warm_up_all, args=(max_workers,), name="registry-warmup", daemon=True)
+        self._warmup_thread = t
+        t.start()
+        return t
+
+    def warm_up_all(self, max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Load every configured model concurrently on a thread pool, then run a
+        synthetic predict on each. Returns the per-model warm-up state.
+        If start_warmup() already has one running, waits for it instead of
+        starting a second (which would calibrate the same models concurrently).
+        """
+        t = self._warmup_thread
+        if t is not None and t.is_alive():
+            t.join()
+            return dict(self._warm_state)
+        return self._warm_up_all(max_workers)
+
+    def _warm_up_all(self, max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        self._warmup_started = True
+        self._warmup_done.clear()
+        names = list(self._model_cfgs.keys())
+        for name in names:
+            self._warm_state[name] = {"status": "pending"}
+        workers = max_workers or min(8, len(names)) or 1
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup") as ex:
+                list(ex.map(self._warm_one, names))
+        finally:
+            self._warmup_done.set()
+        return dict(self._warm_state)
+
+    def model_config(self, name: str) -> Dict[str, Any]:
+        """Raw config block for one model (empty dict if not configured)."""
+        return dict(self._model_cfgs.get(name, {}) or {})
+
+    def feature_names(self, name: str) -> List[str]:
+        """Raw feature order for a model, without loading the model itself."""
+        lm = self._cache.get(name)
+        if lm is not None:
+            return lm.feature_names
+        if name not in self._model_cfgs:
+            raise ModelNotFound(f"Model '{name}' not found in config.")
+        cfg = self._model_cfgs[name]
+        return self._load_feature_names(
+            self._abs_optional(cfg, "feature_names_path"),
+            self._abs_required(cfg, "train_csv_path"),
+            cfg.get("target_col", None),
+            self._load_schema(cfg),
+        )
+
+    def peek(self, name: str) -> Optional[LoadedModel]:
+        """Return the model if it is already loaded, without loading it."""
+        return self._cache.get(name)
+
+    def artifact_version(self, name: str) -> str:
+        """Version the model's current artifacts would load as (content hash), without loading."""
+        if name not in self._model_cfgs:
+            raise ModelNotFound(f"Model '{name}' not found in config.")
+        return self._artifact_hash(self._model_cfgs[name])
+
     def get(self, name: str) -> LoadedModel:
-        """Get a loaded model (cache hit if already loaded)."""
-        if name in self._cache:
-            return self._cache[name]
+        """
+        Get a loaded model (cache hit if already loaded).
+        Cold loads are single-flight: one thread loads, concurrent callers wait
+        for it. A failed load is remembered for load_failure_backoff_sec, and
+        callers in that window get ModelLoadError without retrying.
+        """
+        if not tracing.enabled():
+            return self._get(name)
+        with tracing.span("registry.get", model=name, cache_hit=name in self._cache):
+            lm = self._get(name)
+            tracing.set_attributes(model_version=lm.version)
+            return lm
+
+    def _get(self, name: str) -> LoadedModel:
+        lm = self._cache.get(name)
+        if lm is not None:
+            lm.last_access = time.time()
+            return lm
         if name not in self._model_cfgs:
-            raise KeyError(f"Model '{name}' not found in config.")
-        lm = self._load_model(name, self._model_cfgs[name])
-        self._cache[name] = lm
+            raise ModelNotFound(f"Model '{name}' not found in config.")
+
+        lock = self._load_locks[name]
+        if not lock.acquire(blocking=False):
+            with self._stats_lock:
+                self.single_flight_waits += 1
+            lock.acquire()
+        try:
+            lm = self._cache.get(name)
+            if lm is not None:
+                return lm
+
+            failed = self._failed_loads.get(name)
+            if failed is not None and time.monotonic() < failed[0]:
+                with self._stats_lock:
+                    self.backoff_rejections += 1
+                retry_in = failed[0] - time.monotonic()
+                raise ModelLoadError(
+                    f"Model '{name}' failed to load; retrying in {retry_in:.1f}s. Last error: {failed[1]}"
+                ) from failed[1]
+
+            try:
+                with tracing.span("registry.load_model", model=name):
+                    lm = self._load_model(name, self._model_cfgs[name])
+            except Exception as e:
+                self._failed_loads[name] = (time.monotonic() + self._load_failure_backoff, e)
+                with self._stats_lock:
+                    self.load_failures += 1
+                raise
+            self._failed_loads.pop(name, None)
+            lm.last_access = time.time()
+            self._cache[name] = lm
+            with self._stats_lock:
+                self.loads += 1
+        finally:
+            lock.release()
+        self._enforce_memory_budget(keep=name)
         return lm
 
+    def stats(self) -> Dict[str, Any]:
+        """Registry-level load counters."""
+        with self._stats_lock:
+            return {
+                "loaded_models": sorted(self._cache.keys()),
+                "loads": self.loads,
+                "load_failures": self.load_failures,
+                "single_flight_waits": self.single_flight_waits,
+                "backoff_rejections": self.backoff_rejections,
+                "in_backoff": sorted(n for n, f in self._failed_loads.items() if time.monotonic() < f[0]),
+                "reloads": self.reload_count,
+                "preprocessor_cache_hits": self.preprocessor_cache_hits,
+                "preprocessor_cache_misses": self.preprocessor_cache_misses,
+                "memory_budget_bytes": self._memory_budget,
+                "resident_bytes": sum(m.estimated_bytes for m in list(self._cache.values())),
+                "evictions": sum(self._evictions.values()),
+            }
+
+    def reload(self, name: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Load, warm and atomically swap in a model's current artifacts.
+        Without force, nothing happens unless the artifact content changed.
+        A failed load leaves the serving version untouched and raises.
+        """
+        if name not in self._model_cfgs:
+            raise ModelNotFound(f"Model '{name}' not found in config.")
+        cfg = self._model_cfgs[name]
+        with self._reload_lock:
+            current = self._cache.get(name)
+            if current is not None and not force:
+                stamp = self._artifact_stamp(cfg)
+                if stamp == current.artifact_stamp or stamp == self._ignored_stamps.get(name):
+                    return {"model": name, "status": "unchanged", "version": current.version}
+                if self._artifact_hash(cfg) == current.version:
+                    current.artifact_stamp = stamp  # touched, not changed
+                    return {"model": name, "status": "unchanged", "version": current.version}
+
+            new = self._load_model(name, cfg)
+            self._warm_predict(new)
+            if current is not None and current.exec_policy is not None and \
+                    (current.exec_policy.calibration or {}).get("source") == "calibration":
+                self.calibrate(new)  # the version it replaces was calibrated at warm-up
+
+            if current is not None:
+                self._history.setdefault(name, deque(maxlen=self._keep_versions)).append(current)
+            new.last_access = time.time()
+            self._cache[name] = new
+            self._failed_loads.pop(name, None)
+            self._ignored_stamps.pop(name, None)
+            self.reload_count += 1
+        self._enforce_memory_budget(keep=name)
+        return {
+            "model": name,
+            "status": "reloaded",
+            "version": new.version,
+            "previous_version": current.version if current is not None else None,
+        }
+
+    def rollback(self, name: str) -> Dict[str, Any]:
+        """Swap the most recent previous version back in (calling it again swaps forward)."""
+        with self._reload_lock:
+            history = self._history.get(name)
+            if not history:
+                raise ValueError(f"No previous version of '{name}' to roll back to.")
+            previous = history.pop()
+            current = self._cache.get(name)
+            self._cache[name] = previous
+            if current is not None:
+                history.append(current)
+            # Don't let the watcher immediately reload what is on disk again.
+            self._ignored_stamps[name] = self._artifact_stamp(self._model_cfgs[name])
+            return {
+                "model": name,
+                "status": "rolled_back",
+                "version": previous.version,
+                "replaced_version": current.version if current is not None else None,
+            }
+
+    def start_watcher(self, interval_sec: float = 5.0) -> threading.Thread:
+        """Poll loaded models' artifacts every interval_sec and reload on change."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop, args=(interval_sec,), name="registry-watcher", daemon=True
+        )
+        self._watcher.start()
+        return self._watcher
+
+    def stop_watcher(self) -> None:
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+
     # ----------------------------- internals -----------------------------
 
+    def _enforce_memory_budget(self, keep: Optional[str] = None) -> None:
+        """Evict least-recently-used unpinned models until under budget (never `keep`)."""
+        if self._memory_budget is None:
+            return
+        with self._budget_lock:
+            while True:
+                resident = dict(self._cache)
+                total = sum(m.estimated_bytes for m in resident.values())
+                if total <= self._memory_budget:
+                    return
+                victims = [
+                    m for n, m in resident.items()
+                    if n != keep and not self._model_cfgs.get(n, {}).get("pin", False)
+                ]
+                if not victims:
+                    print(f"[ModelRegistry] Over memory budget ({total} > {self._memory_budget} bytes) "
+                          f"but every other resident model is pinned.")
+                    return
+                victim = min(victims, key=lambda m: m.last_access)
+                del self._cache[victim.name]
+                self._evictions[victim.name] = self._evictions.get(victim.name, 0) + 1
+                print(f"[ModelRegistry] Evicted '{victim.name}' (~{victim.estimated_bytes} bytes) to stay under budget.")
+
+    def _watch_loop(self, interval_sec: float) -> None:
+        while not self._watch_stop.wait(interval_sec):
+            for name in list(self._cache.keys()):
+                try:
+                    self.reload(name)
+                except Exception as e:
+                    print(f"[ModelRegistry] Hot reload of '{name}' failed, keeping current version: {e}")
+
+    def _artifact_paths(self, cfg: Dict[str, Any]) -> List[Path]:
+        paths = [self._abs(cfg.get("model_path"))]
+        if cfg.get("feature_names_path"):
+            paths.append(self._abs(cfg.get("feature_names_path")))
+        return paths
+
+    def _artifact_stamp(self, cfg: Dict[str, Any]) -> tuple:
+        stamp = []
+        for p in self._artifact_paths(cfg):
+            try:
+                st = p.stat()
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _artifact_hash(self, cfg: Dict[str, Any]) -> str:
+        h = hashlib.sha256()
+        for p in self._artifact_paths(cfg):
+            if not p.exists():
+                continue
+            with open(p, "rb") as f:
+                for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                    h.update(chunk)
+        return h.hexdigest()[:12]
+
+    def _warm_one(self, name: str) -> None:
+        self._warm_state[name] = {"status": "loading"}
+        try:
+            lm = self.get(name)
+        except Exception as e:
+            self._warm_state[name] = {"status": "error", "error": f"load failed: {e}"}
+            return
+        self._warm_state[name] = {"status": "warming"}
+        try:
+            self._warm_predict(lm)
+            self.calibrate(lm)
+            self._warm_state[name] = {"status": "warm"}
+        except Exception as e:
+            self._warm_state[name] = {"status": "error", "error": f"warm-up predict failed: {e}"}
+
+    @staticmethod
+    def _warm_predict(lm: LoadedModel) -> None:
+        """Synthetic predict through every path a request can take."""
+        t0 = time.perf_counter()
+        shape = lm.payload_adapter.shape if lm.payload_adapter is not None else "unknown"
+        mini = dict(zip(MINIMAL_FEATURES, PROBE_MINIMAL_VALUES))
+        if shape == "minimal":
+            row = minimal_row(mini, lm.feature_names)
+        elif shape == "full":
+            row = full_row(mini, lm.feature_names)
+        else:
+            row = flex_build_one_row({}, lm.feature_names)
+        lm.predict_frame(row_to_df(row))
+        if lm.compiled is not None:
+            lm.compiled.predict_one(row)
+        lm.warmup_sec = time.perf_counter() - t0
+        lm.mark_prediction()
+
+    def calibrate(self, lm: LoadedModel) -> None:
+        """
+        Time inline vs chunked batch scoring on resampled training rows and set the
+        model's inline_max_rows. Only warm-up (and reloading a calibrated model)
+        calls this: it predicts ~100k rows, which should not compete with requests.
+        A model that was never warmed keeps the configured inline_max_rows, or
+        scores every batch inline.
+        """
+        policy = lm.exec_policy
+        if policy is None or policy.calibration is not None:
+            return
+        try:
+            result = policy.calibrate(lm.predict_frame, self._calibration_sample(lm))
+        except Exception as e:  # keep serving inline rather than failing the warm-up
+            policy.calibration = {"source": "calibration", "inline_max_rows": None, "error": str(e)}
+            print(f"[ModelRegistry] Batch plan calibration failed for '{lm.name}' ({e}). Scoring inline.")
+            return
+        print(f"[ModelRegistry] '{lm.name}' batch plan: inline below {result['inline_max_rows']} rows "
+              f"({result.get('reason')}, {policy.workers} workers).")
+
+    @staticmethod
+    def _calibration_sample(lm: LoadedModel) -> pd.DataFrame:
+        df = pd.read_csv(lm.train_csv_path)
+        return df.reindex(columns=lm.feature_names)
+
     def _load_model(self, name: str, cfg: Dict[str, Any]) -> LoadedModel:
         model_path = self._abs_required(cfg, "model_path")
         feature_names_path = self._abs_optional(cfg, "feature_names_path")
         train_csv_path = self._abs_required(cfg, "train_csv_path")
         target_col = cfg.get("target_col", None)
+        load_started = time.perf_counter()
+        # stamp before hash: if the file changes mid-load, the next poll sees it
+        artifact_stamp = self._artifact_stamp(cfg)
+        version = self._artifact_hash(cfg)
 
         # 1) load object
         t0 = time.time()
-        obj = joblib.load(str(model_path))
+        obj = self._load_artifact(name, model_path, version)
         loaded_sec = time.time() - t0
 
-        # 2) feature names
-        feature_names = self._load_feature_names(feature_names_path, train_csv_path, target_col)
+        # 2) feature names (and the train CSV's schema manifest, if there is one)
+        schema = self._load_schema(cfg)
+        feature_names = self._load_feature_names(feature_names_path, train_csv_path, target_col, schema)
 
         # 3) if not a pipeline, fit a fallback preprocessor on training raw X
         is_pipeline = isinstance(obj, Pipeline)
         fallback_preprocessor = None
         if not is_pipeline:
-            fallback_preprocessor = self._fit_fallback_preprocessor(train_csv_path, target_col, feature_names)
+            fallback_preprocessor = self._fit_fallback_preprocessor(
+                train_csv_path, target_col, feature_names, schema, cfg.get("fallback_encoding", "onehot")
+            )
+
+        # 4) optional NumPy-only fast path; any unsupported step keeps the sklearn path
+        compiled = None
+        if cfg.get("compile", True):
+            compiled = compile_model(obj, fallback_preprocessor)
+            if compiled is None:
+                print(f"[ModelRegistry] Model '{name}' is not compilable. Using the sklearn path.")
 
-        return LoadedModel(
+        lm = LoadedModel(
             name=name,
             obj=obj,
             feature_names=feature_names,
@@ -106,13 +639,81 @@ class ModelRegistry:
             is_pipeline=is_pipeline,
             fallback_preprocessor=fallback_preprocessor,
             train_csv_path=train_csv_path,
+            schema=schema,
+            compiled=compiled,
+            load_started=load_started,
+            version=version,
+            artifact_stamp=artifact_stamp,
         )
 
+        # 5) resolve once which 4-item payload shape the model accepts
+        lm.payload_adapter = resolve_payload_adapter(lm.predict_frame, feature_names)
+
+        # 6) typed (msgspec) request codec built from feature_names + column kinds
+        if self.api_cfg.get("typed_io", True):
+            try:
+                lm.codec = build_codec(name, obj, feature_names, fallback_preprocessor)
+            except Exception as e:
+                print(f"[ModelRegistry] No typed codec for '{name}' ({e}). Using generic JSON.")
+
+        # 7) batch execution plan; calibrated at warm-up (see calibrate())
+        par_cfg = cfg.get("parallel") or {}
+        if par_cfg.get("enabled", True):
+            lm.exec_policy = ExecutionPolicy(
+                workers=par_cfg.get("workers"),
+                max_chunk_rows=int(par_cfg.get("max_chunk_rows", 50000)),
+                inline_max_rows=par_cfg.get("inline_max_rows"),
+            )
+            lm.exec_policy.estimator_n_jobs = disable_estimator_threads(obj)
+
+        # 8) fitted-preprocessor fingerprint (fan-out transforms once per distinct one)
+        lm.prep_fingerprint = preprocessor_fingerprint(obj, fallback_preprocessor)
+        # the compiled forest copies every tree's nodes: count its flat arrays explicitly
+        forest = compiled.forest if compiled is not None else None
+        lm.estimated_bytes = _estimate_nbytes(lm, skip=(forest,)) + (forest.nbytes if forest is not None else 0)
+        lm.load_total_sec = time.perf_counter() - load_started
+        return lm
+
+    def _load_artifact(self, name: str, model_path: Path, version: str) -> Any:
+        """
+        joblib.load the model. With api.mmap_models, numpy arrays are memory-mapped
+        read-only from a private copy of the artifact (keyed by version), so an
+        in-place retrain can't change them underneath us. Only arrays sklearn keeps
+        as loaded stay mapped (scaler means, encoder categories, ...): Tree.__setstate__
+        copies the node arrays, so a forest's trees are private memory either way.
+        """
+        if not self.api_cfg.get("mmap_models", False):
+            return joblib.load(str(model_path))
+        mmap_path = self._abs(self.api_cfg.get("mmap_cache_dir", ".cache/mmap")) / f"{name}-{version}.joblib"
+        if not mmap_path.exists():
+            mmap_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(mmap_path.parent), suffix=".tmp")
+            os.close(fd)
+            try:
+                shutil.copyfile(model_path, tmp)
+                os.replace(tmp, mmap_path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        return joblib.load(str(mmap_path), mmap_mode="r")
+
+    def _load_schema(self, cfg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The schema manifest at schema_path, or None (CSV reads then infer types)."""
+        schema_path = self._abs_optional(cfg, "schema_path")
+        if schema_path is None:
+            return None
+        try:
+            return data_schema.load_schema(schema_path)
+        except Exception as e:
+            print(f"[ModelRegistry] Ignoring unreadable schema manifest {schema_path}: {e}")
+            return None
+
     def _load_feature_names(
         self,
         feature_names_path: Optional[Path],
         train_csv_path: Path,
         target_col: Optional[str],
+        schema: Optional[Dict[str, Any]] = None,
     ) -> List[str]:
         # Prefer explicit JSON file
         if feature_names_path and feature_names_path.exists():
@@ -121,9 +722,11 @@ class ModelRegistry:
             except Exception as e:
                 print(f"[ModelRegistry] Failed to read feature_names.json at {feature_names_path}: {e}. Falling back to CSV.")
 
-        # Fallback: derive from train CSV (all cols except target)
-        df = pd.read_csv(train_csv_path)
-        cols = list(df.columns)
+        # Fallback: the manifest's columns, else the train CSV header (all cols except target)
+        if schema is not None:
+            cols = data_schema.column_names(schema, drop_target=False)
+        else:
+            cols = list(pd.read_csv(train_csv_path, nrows=0).columns)
         if target_col and target_col in cols:
             cols.remove(target_col)
         return cols
@@ -133,20 +736,81 @@ class ModelRegistry:
         train_csv_path: Path,
         target_col: Optional[str],
         feature_names: List[str],
+        schema: Optional[Dict[str, Any]] = None,
+        encoding: Any = "onehot",
     ):
         """
         Fit the project's preprocessing pipeline on raw X (from train CSV).
         This is used when the persisted object is NOT a full sklearn Pipeline.
+        `encoding` must be the categorical encoding the estimator was trained
+        with (models.<m>.fallback_encoding); bare estimators predate the
+        cardinality-aware default, so it is one-hot unless configured.
+
+        The fitted preprocessor is cached on disk under a key made of the train
+        CSV content hash, the feature names and the preprocessing code version,
+        so later boots and other workers load it (memory-mapped) instead of refitting.
         """
         # Import lazily to avoid import cycles
-        from preprocessing.pipeline import get_preprocessing_pipeline  # type: ignore
+        import preprocessing.pipeline as prep_module  # type: ignore
+
+        cache_path = None
+        if self.api_cfg.get("preprocessor_cache", True):
+            key = self._preprocessor_cache_key(
+                train_csv_path, feature_names, Path(prep_module.__file__), schema, encoding
+            )
+            cache_path = self._abs(self.api_cfg.get("preprocessor_cache_dir", ".cache/preprocessors")) / f"{key}.joblib"
+            if cache_path.exists():
+                try:
+                    prep = joblib.load(str(cache_path), mmap_mode="r")
+                    self.preprocessor_cache_hits += 1
+                    return prep
+                except Exception as e:
+                    print(f"[ModelRegistry] Ignoring unreadable preprocessor cache {cache_path}: {e}")
 
-        df = pd.read_csv(train_csv_path)
-        X = df[feature_names].copy()
-        prep = get_preprocessing_pipeline(X)
+        X = data_schema.read_csv(train_csv_path, schema, columns=feature_names)
+        prep = prep_module.get_preprocessing_pipeline(X, schema, encoding=encoding)
         prep.fit(X)
+        self.preprocessor_cache_misses += 1
+
+        if cache_path is not None:
+            try:
+                self._dump_atomic(prep, cache_path)
+            except OSError as e:
+                print(f"[ModelRegistry] Could not write preprocessor cache {cache_path}: {e}")
         return prep
 
+    @staticmethod
+    def _preprocessor_cache_key(
+        train_csv_path: Path,
+        feature_names: List[str],
+        code_path: Path,
+        schema: Optional[Dict[str, Any]] = None,
+        encoding: Any = "onehot",
+    ) -> str:
+        h = hashlib.sha256()
+        with open(train_csv_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                h.update(chunk)
+        h.update(json.dumps(feature_names).encode("utf-8"))
+        h.update(code_path.read_bytes())
+        h.update(json.dumps(schema, sort_keys=True).encode("utf-8"))
+        h.update(json.dumps(encoding, sort_keys=True).encode("utf-8"))
+        h.update(sklearn.__version__.encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    @staticmethod
+    def _dump_atomic(obj: Any, path: Path) -> None:
+        """Uncompressed joblib dump (so it can be mmap'd), renamed into place."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        os.close(fd)
+        try:
+            joblib.dump(obj, tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
     # ----------------------------- path helpers -----------------------------
 
     def _abs(self, maybe_path: Optional[str | Path]) -> Path:
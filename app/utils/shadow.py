@@ -0,0 +1,195 @@
+# app/utils/shadow.py
+from __future__ import annotations
+
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ShadowEvaluator:
+    """
+    Scores mirrored traffic with a candidate ("shadow") model off the request path.
+
+    The request thread calls submit() with the input it already built and the
+    primary's predictions; that is a put_nowait() onto a bounded queue, and when
+    the queue is full the work is dropped (counted) instead of blocking. A
+    worker thread drains the queue in batches, scores them with the shadow model
+    (loaded through get_model, so cold loads happen here too) and records
+    agreement with the primary and per-row latency of both.
+    """
+
+    def __init__(
+        self,
+        primary: str,
+        shadow: str,
+        get_model: Callable[[str], Any],
+        queue_size: int = 1000,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 50.0,
+        sample_rate: float = 1.0,
+        on_result: Optional[Callable[[int, int, int], None]] = None,
+    ):
+        if queue_size < 1 or max_batch_size < 1:
+            raise ValueError("queue_size and max_batch_size must be >= 1")
+        self.primary = primary
+        self.shadow = shadow
+        self.get_model = get_model
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = float(max_wait_ms) / 1000.0
+        self.sample_rate = float(sample_rate)
+        self.on_result = on_result  # (agree, disagree, dropped) deltas, e.g. for Prometheus
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=int(queue_size))
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.submitted = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.rows_scored = 0
+        self.agree = 0
+        self.disagree = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.primary_sec = 0.0
+        self.shadow_sec = 0.0
+        self._pending = 0  # submitted items not yet scored
+
+        self._worker = threading.Thread(target=self._run, name=f"shadow-{primary}->{shadow}", daemon=True)
+        self._worker.start()
+
+    # ----------------------------- request side -----------------------------
+
+    def submit(self, rows: Any, primary_preds: Any, primary_sec: float) -> bool:
+        """
+        Mirror one request. rows is a row dict or a DataFrame (not copied: callers
+        must not mutate it afterwards). Never blocks; returns False if dropped.
+        """
+        if self._closed:
+            return False
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            with self._lock:
+                self.sampled_out += 1
+            return False
+        with self._lock:
+            self._pending += 1  # before the put, so the worker can never see it go negative
+        try:
+            self._queue.put_nowait((rows, primary_preds, primary_sec))
+        except queue.Full:
+            with self._lock:
+                self._pending -= 1
+                self.dropped += 1
+            if self.on_result is not None:
+                self.on_result(0, 0, 1)
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    # ----------------------------- worker side -----------------------------
+
+    def _run(self) -> None:
+        while not self._closed:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            items = [first]
+            n = _rows(first[0])
+            deadline = time.monotonic() + self.max_wait
+            while n < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                items.append(item)
+                n += _rows(item[0])
+            self._score(items)
+
+    def _score(self, items: List[tuple]) -> None:
+        try:
+            lm = self.get_model(self.shadow)
+            frames, frame_preds, dict_rows, dict_preds = [], [], [], []
+            for rows, preds, _ in items:
+                if isinstance(rows, pd.DataFrame):
+                    frames.append(rows)
+                    frame_preds.append(np.atleast_1d(np.asarray(preds)))
+                else:
+                    dict_rows.append(rows)
+                    dict_preds.append(np.atleast_1d(np.asarray(preds)))
+            if dict_rows:  # single-row requests become one frame, not one frame each
+                frames.append(pd.DataFrame(dict_rows))
+                frame_preds.append(np.concatenate(dict_preds))
+            df = pd.concat(frames, ignore_index=True).reindex(columns=lm.feature_names)
+            primary_preds = np.concatenate(frame_preds)
+
+            t0 = time.perf_counter()
+            shadow_preds = np.asarray(lm.predict_frame(df))
+            shadow_sec = time.perf_counter() - t0
+        except Exception as e:
+            with self._lock:
+                self.errors += len(items)
+                self.last_error = str(e)
+                self._pending -= len(items)
+            return
+
+        agree = int((shadow_preds == primary_preds).sum())
+        disagree = len(primary_preds) - agree
+        with self._lock:
+            self.rows_scored += len(primary_preds)
+            self.agree += agree
+            self.disagree += disagree
+            self.shadow_sec += shadow_sec
+            self.primary_sec += sum(sec for _, _, sec in items)
+            self._pending -= len(items)
+        if self.on_result is not None:
+            self.on_result(agree, disagree, 0)
+
+    # ----------------------------- admin -----------------------------
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """Wait until everything submitted so far has been scored (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._pending == 0:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def close(self) -> None:
+        self._closed = True
+        self._worker.join(timeout=2.0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            compared = self.agree + self.disagree
+            return {
+                "shadow_model": self.shadow,
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self._queue.maxsize,
+                "sample_rate": self.sample_rate,
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "sampled_out": self.sampled_out,
+                "rows_scored": self.rows_scored,
+                "agree": self.agree,
+                "disagree": self.disagree,
+                "agreement_rate": (self.agree / compared) if compared else None,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "primary_ms_per_row": (1000 * self.primary_sec / self.rows_scored) if self.rows_scored else None,
+                "shadow_ms_per_row": (1000 * self.shadow_sec / self.rows_scored) if self.rows_scored else None,
+            }
+
+
+def _rows(rows: Any) -> int:
+    return len(rows) if isinstance(rows, pd.DataFrame) else 1
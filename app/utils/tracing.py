@@ -0,0 +1,203 @@
+# app/utils/tracing.py
+"""
+Opt-in OpenTelemetry tracing for the serving path (api.tracing in config.yaml).
+
+When tracing is enabled, each prediction request becomes a trace with these spans:
+
+- a root span per request, named after its route (POST /v1/predict, ...);
+- registry.get, with a registry.load_model child on a cold load;
+- one span per StageTimer stage (decode, build, admission, cache, transform,
+  predict, encode), created from the timer's marks, so the stage boundaries
+  match the /metrics histograms exactly;
+- one predict.candidate span per payload shape tried.
+
+Attributes carry the model name, version and batch size. The "ml." prefix
+keeps them apart from the semantic conventions. A request answered 4xx/5xx
+(429 from admission control included) has its root span status set to ERROR,
+with the response's error message.
+
+A BatchSpanProcessor hands finished spans to the exporter off the request
+thread. "file" appends one JSON object per span to a local JSONL file, which
+serves as a stand-in for a collector. Sort it by duration to find tail-latency
+requests. "console" prints the spans.
+
+When tracing is off, span() returns a shared no-op context and the timer is not
+wrapped, so requests pay nothing.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Status, StatusCode
+
+_NOOP = nullcontext()
+_TRACER: Optional[trace.Tracer] = None  # None = tracing off
+_PROVIDER: Optional[TracerProvider] = None
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends finished spans to a JSONL file, one compact object per line."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(_span_record(s), separators=(",", ":")) + "\n" for s in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)  # one write per batch
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _span_record(span: ReadableSpan) -> Dict[str, Any]:
+    ctx = span.get_span_context()
+    return {
+        "name": span.name,
+        "trace_id": f"{ctx.trace_id:032x}",
+        "span_id": f"{ctx.span_id:016x}",
+        "parent_id": f"{span.parent.span_id:016x}" if span.parent is not None else None,
+        "start_ns": span.start_time,
+        "duration_ms": (span.end_time - span.start_time) / 1e6,
+        "status": span.status.status_code.name,
+        "attributes": dict(span.attributes or {}),
+    }
+
+
+# --------------------------------------------------------------------------------------
+# Setup
+# --------------------------------------------------------------------------------------
+def configure(cfg: Dict[str, Any], root: Path, exporter: Optional[SpanExporter] = None) -> bool:
+    """
+    Install tracing from the api.tracing config block; returns whether it is on.
+    exporter overrides the configured one (tests pass an in-memory exporter).
+    """
+    global _TRACER, _PROVIDER
+    shutdown()
+    if not cfg.get("enabled", False):
+        return False
+    if exporter is None:
+        kind = cfg.get("exporter", "file")
+        if kind == "file":
+            path = Path(cfg.get("path", "artifacts/traces/spans.jsonl"))
+            exporter = JsonLinesSpanExporter(path if path.is_absolute() else root / path)
+        elif kind == "console":
+            exporter = ConsoleSpanExporter()
+        else:
+            raise ValueError(f"Unknown tracing exporter '{kind}' (expected 'file' or 'console').")
+
+    _PROVIDER = TracerProvider(
+        resource=Resource.create({"service.name": cfg.get("service_name", "ml-api")}),
+        sampler=ParentBased(TraceIdRatioBased(float(cfg.get("sample_ratio", 1.0)))),
+    )
+    _PROVIDER.add_span_processor(BatchSpanProcessor(
+        exporter,
+        max_queue_size=int(cfg.get("max_queue_size", 2048)),
+        max_export_batch_size=int(cfg.get("max_export_batch_size", 512)),
+        schedule_delay_millis=float(cfg.get("schedule_delay_ms", 2000)),
+    ))
+    _TRACER = _PROVIDER.get_tracer("app.model_api")
+    return True
+
+
+def shutdown() -> None:
+    """Flush pending spans and turn tracing off."""
+    global _TRACER, _PROVIDER
+    if _PROVIDER is not None:
+        _PROVIDER.shutdown()
+    _TRACER = _PROVIDER = None
+
+
+def force_flush() -> None:
+    if _PROVIDER is not None:
+        _PROVIDER.force_flush()
+
+
+def enabled() -> bool:
+    return _TRACER is not None
+
+
+# --------------------------------------------------------------------------------------
+# Spans
+# --------------------------------------------------------------------------------------
+def _attrs(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    return {f"ml.{k}": v for k, v in attrs.items() if v is not None}
+
+
+def span(name: str, context: Any = None, **attrs: Any):
+    """Context manager for a child of the current span (no-op when tracing is off)."""
+    if _TRACER is None:
+        return _NOOP
+    return _TRACER.start_as_current_span(name, context=context, attributes=_attrs(attrs))
+
+
+@contextmanager
+def request_span(name: str, **attrs: Any) -> Iterator[Any]:
+    """Root span of one request; yields the span (None when tracing is off)."""
+    if _TRACER is None:
+        yield None
+        return
+    with _TRACER.start_as_current_span(name, kind=trace.SpanKind.SERVER, attributes=_attrs(attrs)) as sp:
+        yield sp
+
+
+def set_attributes(**attrs: Any) -> None:
+    """Attach ml.* attributes to the current span."""
+    if _TRACER is not None:
+        trace.get_current_span().set_attributes(_attrs(attrs))
+
+
+def set_error(message: str) -> None:
+    """Mark the current span as failed (4xx/5xx responses)."""
+    if _TRACER is not None:
+        trace.get_current_span().set_status(Status(StatusCode.ERROR, message))
+
+
+def current_context() -> Any:
+    """Context to parent spans created after the request returned (streamed chunks)."""
+    return trace.set_span_in_context(trace.get_current_span()) if _TRACER is not None else None
+
+
+class TracedTimer:
+    """
+    Wraps a StageTimer (or NULL_TIMER) and turns each mark() into a span
+    covering the time since the previous mark, parented to the current span.
+    """
+
+    enabled = True  # keeps transform and predict apart even with metrics off
+    __slots__ = ("inner", "_tracer", "_last")
+
+    def __init__(self, inner: Any, tracer: trace.Tracer):
+        self.inner = inner
+        self._tracer = tracer
+        self._last = time.time_ns()
+
+    def mark(self, stage: str) -> None:
+        now = time.time_ns()
+        self.inner.mark(stage)
+        self._tracer.start_span(stage, start_time=self._last, attributes={"ml.stage": stage}).end(end_time=now)
+        self._last = now
+
+    def done(self, status: str = "ok", rows: int = 0) -> None:
+        self.inner.done(status, rows)
+        set_attributes(status=status, rows=rows)
+
+
+def wrap_timer(timer: Any) -> Any:
+    return TracedTimer(timer, _TRACER) if _TRACER is not None else timer
@@ -0,0 +1,253 @@
+# app/utils/typed_io.py
+"""
+msgspec-typed request decoding and response encoding.
+
+Each model gets a ModelCodec built at load time from its feature_names. Column
+kinds are read off the fitted ColumnTransformer. Numeric columns decode as
+float | bool | None; numeric strings (and "true"/"false") are coerced,
+anything else is rejected.
+Categorical and unused columns take any JSON scalar. Nested objects and lists
+never get past decode, so a malformed payload is rejected before any pandas
+work starts.
+
+Decoded payloads are handed to the same row builders as the generic path
+(PayloadAdapter / flex_build_one_row), so accepted requests predict exactly as
+before. Keys that are not features are dropped by the structs, but a dict with
+the minimal keys plus others keeps them, since the builders only expand an
+exactly-minimal dict to the full schema.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Union
+
+import msgspec
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+
+from app.utils.payload import MINIMAL_FEATURES
+from preprocessing.pipeline import HashingEncoder
+
+Scalar = Union[str, int, float, bool, None]
+Number = Union[float, bool, None]  # booleans count as 0/1, as pandas/sklearn treat them
+
+_ENCODER = msgspec.json.Encoder()
+
+
+class PayloadError(ValueError):
+    """Request body failed typed validation (maps to HTTP 400)."""
+
+
+# --------------------------------------------------------------------------------------
+# Column kinds
+# --------------------------------------------------------------------------------------
+def _find_column_transformer(obj: Any, preprocessor: Any = None) -> Optional[ColumnTransformer]:
+    for cand in (preprocessor, obj):
+        if isinstance(cand, ColumnTransformer):
+            return cand
+        if isinstance(cand, Pipeline):
+            for _, step in cand.steps:
+                if isinstance(step, ColumnTransformer):
+                    return step
+    return None
+
+
+def column_kinds(obj: Any, feature_names: List[str], preprocessor: Any = None) -> Dict[str, str]:
+    """
+    "number" for columns the preprocessor converts to float (imputer/scaler chains
+    and encoders with numeric categories); "any" for everything else.
+    """
+    kinds = {c: "any" for c in feature_names}
+    ct = _find_column_transformer(obj, preprocessor)
+    if ct is None:
+        return kinds
+    for _, trans, cols in getattr(ct, "transformers_", []):
+        if trans in ("drop", "passthrough") or not isinstance(cols, (list, tuple)):
+            continue
+        steps = [s for _, s in trans.steps] if isinstance(trans, Pipeline) else [trans]
+        if any(isinstance(s, HashingEncoder) for s in steps):
+            continue  # hashed columns take any value
+        encoder = next((s for s in steps if isinstance(s, (OneHotEncoder, OrdinalEncoder))), None)
+        for i, c in enumerate(cols):
+            if c not in kinds:
+                continue
+            if encoder is None:
+                kinds[c] = "number"
+            elif encoder.categories_[i].dtype.kind in "iuf":
+                kinds[c] = "number"
+    return kinds
+
+
+# --------------------------------------------------------------------------------------
+# Response structs
+# --------------------------------------------------------------------------------------
+class PredictResponse(msgspec.Struct):
+    model: str
+    prediction: int
+    model_loaded_sec: float
+    is_pipeline: bool
+    compiled: bool
+    model_version: str
+
+
+class DedupInfo(msgspec.Struct):
+    rows: int
+    unique_rows: Optional[int]
+    dedup_ratio: Optional[float]
+    applied: bool
+
+
+class ExecutionPlan(msgspec.Struct):
+    mode: str
+    rows: int
+    chunks: int
+    workers: int
+    inline_max_rows: Optional[int]
+
+
+class BatchResponse(msgspec.Struct):
+    model: str
+    predictions: List[int]
+    count: int
+    model_version: str
+    dedup: Optional[DedupInfo] = None
+    plan: Optional[ExecutionPlan] = None
+
+
+def encode(obj: Any) -> bytes:
+    return _ENCODER.encode(obj)
+
+
+# --------------------------------------------------------------------------------------
+# Per-model codec
+# --------------------------------------------------------------------------------------
+class _Minimal(msgspec.Struct):
+    Pclass: Scalar = None  # kept as sent: the row builders coerce it (int()) like the generic path
+    Sex: Scalar = None
+    Age: Number = None
+    Fare: Number = None
+
+
+class _FeatureKeys(msgspec.Struct):
+    features: Union[Dict[str, msgspec.Raw], None] = None  # values are not parsed
+
+
+def _field_type(kind: str) -> Any:
+    return Number if kind == "number" else Scalar
+
+
+class ModelCodec:
+    """Typed decoders for one model's /v1/predict and /v1/batch_predict bodies."""
+
+    def __init__(self, name: str, feature_names: List[str], kinds: Dict[str, str]):
+        self.feature_names = list(feature_names)
+        self.kinds = kinds
+        unset = msgspec.UnsetType
+        # Omitted keys stay UNSET (not None) so "exactly the minimal keys" is still detectable.
+        fields = [(c, Union[_field_type(kinds[c]), unset], msgspec.UNSET) for c in self.feature_names]
+        self.Row = msgspec.defstruct(f"{name}Row", fields)
+        self.RowArray = msgspec.defstruct(
+            f"{name}RowArray", [(c, _field_type(kinds[c])) for c in self.feature_names], array_like=True
+        )
+
+        Features = Union[self.Row, List[Scalar], unset]
+        self.PredictRequest = msgspec.defstruct(f"{name}PredictRequest", [("features", Features, msgspec.UNSET)])
+        self.BatchRequest = msgspec.defstruct(
+            f"{name}BatchRequest",
+            [
+                ("rows", Union[List[self.Row], unset], msgspec.UNSET),
+                ("matrix", Union[List[self.RowArray], unset], msgspec.UNSET),
+                ("columns", Union[Dict[str, List[Scalar]], unset], msgspec.UNSET),
+            ],
+        )
+        self._predict_decoder = msgspec.json.Decoder(self.PredictRequest, strict=False)
+        self._keys_decoder = msgspec.json.Decoder(_FeatureKeys)
+        self._batch_decoder = msgspec.json.Decoder(self.BatchRequest, strict=False)
+
+    # ----------------------------- decode -----------------------------
+
+    @staticmethod
+    def _decode(decoder: msgspec.json.Decoder, typ: Any, body: bytes):
+        try:
+            return decoder.decode(body)
+        except msgspec.ValidationError as e:
+            raise PayloadError(str(e)) from None
+        except msgspec.DecodeError as e:
+            # Python clients (json.dumps, pandas) send NaN/Infinity, which strict JSON
+            # forbids but the generic path always accepted: re-parse, then validate.
+            try:
+                obj = json.loads(body)
+            except ValueError:
+                raise PayloadError(str(e)) from None
+            try:
+                return msgspec.convert(obj, typ, strict=False)
+            except msgspec.ValidationError as e2:
+                raise PayloadError(str(e2)) from None
+
+    def decode_features(self, body: bytes):
+        """
+        Validate a /v1/predict body and return its features as a dict or list
+        ready for PayloadAdapter.build. None means 'features' was absent.
+        """
+        req = self._decode(self._predict_decoder, self.PredictRequest, body)
+        return self._features(req.features, lambda: self._raw_feature_keys(body))
+
+    def convert_features(self, features: Any):
+        """decode_features for a 'features' value that is already parsed (the ASGI app)."""
+        try:
+            req = msgspec.convert({"features": features}, self.PredictRequest, strict=False)
+        except msgspec.ValidationError as e:
+            raise PayloadError(str(e)) from None
+        return self._features(req.features, lambda: list(features))
+
+    def _features(self, features: Any, raw_keys: Any):
+        if features is msgspec.UNSET:
+            return None
+        if isinstance(features, list):
+            return self._coerce_list(features)
+        out = msgspec.to_builtins(features)  # drops UNSET fields
+        if len(out) == len(MINIMAL_FEATURES) and set(out) == set(MINIMAL_FEATURES):
+            # Row drops keys that are not features, but the builders expand a dict to
+            # the full schema only when it has exactly the minimal keys: keep the others.
+            out.update({k: None for k in raw_keys() if k not in out})
+        return out
+
+    def _raw_feature_keys(self, body: bytes) -> List[str]:
+        try:
+            features = self._keys_decoder.decode(body).features
+        except msgspec.DecodeError:  # NaN/Infinity: see _decode
+            features = json.loads(body).get("features")
+        return list(features) if isinstance(features, dict) else []
+
+    def _coerce_list(self, values: List[Any]) -> List[Any]:
+        try:
+            if len(values) == len(self.feature_names):
+                row = msgspec.convert(values, self.RowArray, strict=False)
+                return list(msgspec.structs.astuple(row))
+            if len(values) == len(MINIMAL_FEATURES):
+                mini = msgspec.convert(dict(zip(MINIMAL_FEATURES, values)), _Minimal, strict=False)
+                return list(msgspec.structs.astuple(mini))
+        except msgspec.ValidationError as e:
+            raise PayloadError(str(e)) from None
+        raise PayloadError(
+            f"Feature length mismatch. Got {len(values)} items; "
+            f"expected {len(self.feature_names)} or 4 (minimal)."
+        )
+
+    def decode_batch(self, body: bytes):
+        """Validate a /v1/batch_predict JSON body; returns (form, payload) or (None, None)."""
+        req = self._decode(self._batch_decoder, self.BatchRequest, body)
+        if req.rows is not msgspec.UNSET:
+            return "rows", msgspec.to_builtins(req.rows)
+        if req.matrix is not msgspec.UNSET:
+            return "matrix", [msgspec.structs.astuple(r) for r in req.matrix]
+        if req.columns is not msgspec.UNSET:
+            if len({len(v) for v in req.columns.values()}) > 1:
+                raise PayloadError("'columns' values must be lists of equal length")
+            return "columns", req.columns
+        return None, None
+
+
+def build_codec(name: str, obj: Any, feature_names: List[str], preprocessor: Any = None) -> ModelCodec:
+    return ModelCodec(name, feature_names, column_kinds(obj, feature_names, preprocessor))
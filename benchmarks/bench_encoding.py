@@ -0,0 +1,99 @@
+# benchmarks/bench_encoding.py
+"""
+Compare categorical encodings of get_preprocessing_pipeline on the training data.
+
+Fits the training script's model (preprocessor + RandomForest) once per
+encoding. For each it prints the per-column plan, the transformed width, the
+pickled artifact size, the training accuracy on a held-out split, and predict
+latency. Latency is measured for single rows (sklearn and the compiled NumPy
+path) and for a large batch.
+
+Usage:
+    python -m benchmarks.bench_encoding --repeats 200 --batch-rows 5000
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from app.utils.compiled import compile_model
+from preprocessing.pipeline import describe_preprocessor, get_preprocessing_pipeline
+from preprocessing.schema import load_schema, read_csv
+
+ROOT = Path(__file__).resolve().parents[1]
+
+VARIANTS = {
+    "onehot": {"encoding": "onehot"},                     # every categorical column one-hot (previous default)
+    "auto": {"encoding": "auto", "near_unique": "drop"},  # the default
+    "auto+hash": {"encoding": "auto", "near_unique": "hash"},
+}
+
+
+def _timed(fn, repeats: int) -> dict:
+    lat = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t0)
+    lat.sort()
+    return {"p50_ms": 1000 * statistics.median(lat), "p99_ms": 1000 * lat[min(len(lat) - 1, int(0.99 * len(lat)))]}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeats", type=int, default=200, help="timed calls per single-row measurement")
+    ap.add_argument("--batch-rows", type=int, default=5000)
+    ap.add_argument("--batch-repeats", type=int, default=10)
+    ap.add_argument("--variants", default=",".join(VARIANTS))
+    args = ap.parse_args()
+
+    schema = load_schema(ROOT / "model" / "ash_test_model" / "schema.json")
+    df = read_csv(ROOT / "data" / "raw" / "train.csv", schema)
+    X, y = df.drop(columns=["Survived"]), df["Survived"]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # requests arrive as plain JSON values, not pandas categories
+    X_req = X_test.astype(object).where(X_test.notna(), float("nan"))
+    one = X_req.head(1)
+    row = one.iloc[0].to_dict()
+    batch = X_req.sample(args.batch_rows, replace=True, random_state=0)
+
+    results = {}
+    for name in args.variants.split(","):
+        prep = get_preprocessing_pipeline(X_train, schema, **VARIANTS[name])
+        model = Pipeline([("prep", prep), ("clf", RandomForestClassifier(n_estimators=100, random_state=42))])
+        t0 = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_sec = time.perf_counter() - t0
+        info = describe_preprocessor(model.named_steps["prep"], model)
+        compiled = compile_model(model)
+
+        results[name] = {
+            **info,
+            "fit_sec": fit_sec,
+            "accuracy": accuracy_score(y_test, model.predict(X_req)),
+            "row_sklearn": _timed(lambda: model.predict(one), args.repeats),
+            "row_compiled": _timed(lambda: compiled.predict_one(row), args.repeats) if compiled else None,
+            "batch": _timed(lambda: model.predict(batch), args.batch_repeats),
+        }
+        plan = ", ".join(f"{c}={e}" for c, e in info["encodings"].items())
+        print(f"{name}: {plan}")
+
+    print()
+    print(f"{'variant':10} {'width':>6} {'artifact KB':>12} {'fit s':>7} {'acc':>6} "
+          f"{'row p50 ms':>11} {'row p99 ms':>11} {'compiled p50':>13} {f'{args.batch_rows} rows p50':>15}")
+    for name, r in results.items():
+        compiled = f"{r['row_compiled']['p50_ms']:.3f}" if r["row_compiled"] else "n/a"
+        print(f"{name:10} {r['n_features_out']:>6} {r['artifact_bytes'] / 1024:>12.0f} {r['fit_sec']:>7.2f} "
+              f"{r['accuracy']:>6.3f} {r['row_sklearn']['p50_ms']:>11.2f} {r['row_sklearn']['p99_ms']:>11.2f} "
+              f"{compiled:>13} {r['batch']['p50_ms']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
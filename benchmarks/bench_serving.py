@@ -0,0 +1,116 @@
+# benchmarks/bench_serving.py
+"""
+Compare the Flask API (app/model_api.py) with the ASGI API (app/asgi_api.py).
+
+Starts each server in a subprocess, waits for /health, then drives it with
+concurrent clients and prints throughput and latency percentiles for
+single-row /v1/predict and for /v1/batch_predict.
+
+Usage:
+    python -m benchmarks.bench_serving --concurrency 16 --requests 2000 --batch-rows 5000
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SERVERS = {
+    "flask": [
+        sys.executable, "-c",
+        "import app.model_api as m; m.app.run(host='127.0.0.1', port={port}, debug=False, "
+        "use_reloader=False, threaded=True)",
+    ],
+    "asgi": [
+        sys.executable, "-m", "uvicorn", "app.asgi_api:app",
+        "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning",
+    ],
+}
+
+
+def _start(kind: str, port: int) -> subprocess.Popen:
+    cmd = [c.replace("{port}", str(port)) for c in SERVERS[kind]]
+    proc = subprocess.Popen(cmd, cwd=str(ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    proc.kill()
+    raise RuntimeError(f"{kind} server did not become healthy on port {port}")
+
+
+def _drive(url: str, payloads: list, concurrency: int) -> dict:
+    local = threading.local()
+
+    def call(payload):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        s = local.session
+        t0 = time.perf_counter()
+        r = s.post(url, json=payload, timeout=120)
+        dt = time.perf_counter() - t0
+        if r.status_code != 200:
+            raise RuntimeError(f"{url} -> {r.status_code}: {r.text[:200]}")
+        return dt
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        lat = sorted(ex.map(call, payloads))
+    wall = time.perf_counter() - t0
+    return {
+        "requests": len(lat),
+        "rps": len(lat) / wall,
+        "p50_ms": 1000 * statistics.median(lat),
+        "p99_ms": 1000 * lat[min(len(lat) - 1, int(0.99 * len(lat)))],
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model", default="titanic")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--batch-rows", type=int, default=5000)
+    ap.add_argument("--batch-requests", type=int, default=20)
+    ap.add_argument("--servers", default="flask,asgi")
+    args = ap.parse_args()
+
+    df = pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"])
+    singles = [{"features": [3, i % 2, 20 + i % 50, 7.25 + i % 30]} for i in range(args.requests)]
+    big = df.sample(args.batch_rows, replace=True, random_state=0)
+    batch = {"columns": big.astype(object).where(big.notna(), None).to_dict("list")}
+
+    results = {}
+    for port, kind in enumerate(args.servers.split(","), start=8100):
+        proc = _start(kind, port)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            results[(kind, "predict")] = _drive(f"{base}/v1/predict/{args.model}", singles, args.concurrency)
+            results[(kind, "batch_predict")] = _drive(
+                f"{base}/v1/batch_predict/{args.model}", [batch] * args.batch_requests, args.concurrency
+            )
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    print(f"{'server':8} {'endpoint':14} {'requests':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for (kind, endpoint), r in results.items():
+        print(f"{kind:8} {endpoint:14} {r['requests']:>8} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
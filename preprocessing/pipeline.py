@@ -1,28 +1,129 @@
 # preprocessing/pipeline.py
 
+import pickle
+
+import numpy as np
 import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.compose import ColumnTransformer
+from sklearn.feature_extraction import FeatureHasher
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple, Union
+
+from preprocessing.schema import split_by_type
+
+# Per-column categorical encodings picked by get_preprocessing_pipeline(encoding="auto")
+ONEHOT_MAX_LEVELS = 15    # up to this many distinct values: plain one-hot
+NEAR_UNIQUE_RATIO = 0.5   # distinct / non-missing values at or above this: near-unique (names, tickets, IDs)
+MIN_FREQUENCY = 5         # capped one-hot: levels seen fewer times share one "infrequent" column
+MAX_CATEGORIES = 20       # capped one-hot: at most this many output columns per feature
+HASH_FEATURES = 32        # width of the hashed block shared by all hashed columns
+ENCODINGS = ("onehot", "capped", "hash", "drop")
+
+# ColumnTransformer block name -> encoding of its columns
+_BLOCKS = {"cat": "onehot", "cat_capped": "capped", "cat_hashed": "hash", "cat_dropped": "drop"}
+
+
+class HashingEncoder(BaseEstimator, TransformerMixin):
+    """
+    Hash "<column index>=<value>" tokens into n_features columns (sparse counts).
+    Fixed width whatever the number of levels, and nothing to store per level.
+    """
+
+    def __init__(self, n_features: int = HASH_FEATURES):
+        self.n_features = n_features
+
+    def fit(self, X, y=None):
+        self.n_features_in_ = np.asarray(X).shape[1]
+        return self
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=object)
+        tokens = [[f"{j}={v}" for j, v in enumerate(row)] for row in X]
+        hasher = FeatureHasher(n_features=self.n_features, input_type="string", alternate_sign=False)
+        return hasher.transform(tokens)
 
+    def get_feature_names_out(self, input_features=None):
+        return np.array([f"hash{i}" for i in range(self.n_features)], dtype=object)
 
-def split_features_by_type(df: pd.DataFrame) -> Tuple[list, list]:
+
+def split_features_by_type(df: pd.DataFrame, schema: Optional[dict] = None) -> Tuple[list, list]:
     """
     Split DataFrame columns into numeric and categorical features.
 
     Args:
         df (pd.DataFrame): The input DataFrame.
+        schema (dict, optional): Schema manifest; when given, its recorded dtypes
+            decide instead of the frame's inferred ones.
 
     Returns:
         Tuple[list, list]: Lists of numeric and categorical feature names.
     """
+    if schema is not None:
+        return split_by_type(schema, list(df.columns))
     numeric_features = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
     categorical_features = df.select_dtypes(include=["object", "category"]).columns.tolist()
     return numeric_features, categorical_features
 
 
+def choose_categorical_encoding(series: pd.Series, near_unique: str = "drop") -> str:
+    """
+    Pick an encoding for one categorical column from its measured cardinality.
+
+    Args:
+        series (pd.Series): The column's training values.
+        near_unique (str): Encoding for near-unique columns, "drop" or "hash".
+
+    Returns:
+        str: "onehot" for few levels, "capped" for a moderate number, and
+        `near_unique` when almost every value is distinct.
+    """
+    values = series.dropna()
+    levels = values.nunique()
+    if levels <= ONEHOT_MAX_LEVELS:
+        return "onehot"
+    if levels >= NEAR_UNIQUE_RATIO * len(values):
+        return near_unique
+    return "capped"
+
+
+def plan_categorical_encoding(
+    df: pd.DataFrame,
+    categorical_features: list,
+    encoding: Union[str, Dict[str, str]] = "auto",
+    near_unique: str = "drop",
+) -> Dict[str, str]:
+    """
+    Encoding per categorical column.
+
+    Args:
+        df (pd.DataFrame): Training data.
+        categorical_features (list): Columns to plan.
+        encoding (str | dict): "auto" (by cardinality), "onehot" (every column,
+            the previous behaviour), or a column -> encoding dict; columns missing
+            from the dict are planned as "auto".
+        near_unique (str): Encoding "auto" uses for near-unique columns ("drop" or "hash").
+
+    Returns:
+        Dict[str, str]: Column name -> one of ENCODINGS.
+    """
+    if near_unique not in ("drop", "hash"):
+        raise ValueError(f"near_unique must be 'drop' or 'hash', got '{near_unique}'")
+    if encoding == "onehot":
+        return {c: "onehot" for c in categorical_features}
+    overrides = encoding if isinstance(encoding, dict) else {}
+    if not isinstance(encoding, dict) and encoding != "auto":
+        raise ValueError(f"encoding must be 'auto', 'onehot' or a dict, got '{encoding}'")
+    plan = {}
+    for c in categorical_features:
+        plan[c] = overrides.get(c) or choose_categorical_encoding(df[c], near_unique)
+        if plan[c] not in ENCODINGS:
+            raise ValueError(f"Unknown encoding '{plan[c]}' for column '{c}' (expected one of {ENCODINGS})")
+    return plan
+
+
 def build_numeric_pipeline() -> Pipeline:
     """
     Build preprocessing pipeline for numeric features.
@@ -49,21 +150,97 @@ def build_categorical_pipeline() -> Pipeline:
     ])
 
 
-def get_preprocessing_pipeline(df: pd.DataFrame) -> ColumnTransformer:
+def build_capped_categorical_pipeline() -> Pipeline:
+    """
+    Build preprocessing pipeline for moderate-cardinality categorical features.
+    Rare and unseen levels share one "infrequent" column per feature.
+
+    Returns:
+        Pipeline: Scikit-learn pipeline for capped one-hot encoding.
+    """
+    return Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("encoder", OneHotEncoder(handle_unknown="infrequent_if_exist",
+                                  min_frequency=MIN_FREQUENCY, max_categories=MAX_CATEGORIES))
+    ])
+
+
+def build_hashed_categorical_pipeline() -> Pipeline:
+    """
+    Build preprocessing pipeline for near-unique categorical features kept as hashes.
+
+    Returns:
+        Pipeline: Scikit-learn pipeline for hashed encoding.
+    """
+    return Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="constant", fill_value="__missing__")),
+        ("encoder", HashingEncoder(n_features=HASH_FEATURES))
+    ])
+
+
+def get_preprocessing_pipeline(
+    df: pd.DataFrame,
+    schema: Optional[dict] = None,
+    encoding: Union[str, Dict[str, str]] = "auto",
+    near_unique: str = "drop",
+) -> ColumnTransformer:
     """
     Constructs a ColumnTransformer with preprocessing steps for numeric and categorical features.
 
+    Categorical columns are encoded by measured cardinality (see
+    plan_categorical_encoding): one-hot for few levels, capped one-hot for a
+    moderate number, and dropped or hashed when nearly every value is distinct.
+
     Args:
         df (pd.DataFrame): The input dataset to analyze feature types.
+        schema (dict, optional): Schema manifest with the recorded column dtypes.
+        encoding (str | dict): "auto", "onehot" or a column -> encoding dict.
+        near_unique (str): "drop" or "hash" for near-unique columns under "auto".
 
     Returns:
         ColumnTransformer: A transformer that can be applied to training or test datasets.
     """
-    numeric_features, categorical_features = split_features_by_type(df)
+    numeric_features, categorical_features = split_features_by_type(df, schema)
+    plan = plan_categorical_encoding(df, categorical_features, encoding, near_unique)
+    by_encoding = {e: [c for c in categorical_features if plan[c] == e] for e in ENCODINGS}
 
-    preprocessor = ColumnTransformer(transformers=[
+    transformers = [
         ("num", build_numeric_pipeline(), numeric_features),
-        ("cat", build_categorical_pipeline(), categorical_features)
-    ])
+        ("cat", build_categorical_pipeline(), by_encoding["onehot"])
+    ]
+    if by_encoding["capped"]:
+        transformers.append(("cat_capped", build_capped_categorical_pipeline(), by_encoding["capped"]))
+    if by_encoding["hash"]:
+        transformers.append(("cat_hashed", build_hashed_categorical_pipeline(), by_encoding["hash"]))
+    if by_encoding["drop"]:
+        transformers.append(("cat_dropped", "drop", by_encoding["drop"]))
+
+    preprocessor = ColumnTransformer(transformers=transformers)
 
     return preprocessor
+
+
+def describe_preprocessor(preprocessor: Any, artifact: Any = None) -> Dict[str, Any]:
+    """
+    Summarise a fitted preprocessor: encoding per categorical column, output width
+    and pickled size.
+
+    Args:
+        preprocessor (ColumnTransformer): A fitted get_preprocessing_pipeline result.
+        artifact (Any, optional): The object that gets saved (e.g. the full model
+            Pipeline); its pickled size is reported as artifact_bytes.
+
+    Returns:
+        Dict[str, Any]: encodings, n_features_out, preprocessor_bytes and artifact_bytes.
+    """
+    encodings = {}
+    for name, _, cols in preprocessor.transformers_:
+        if name in _BLOCKS:
+            encodings.update({c: _BLOCKS[name] for c in cols})
+    return {
+        "encodings": encodings,
+        "n_features_out": len(preprocessor.get_feature_names_out()),
+        "preprocessor_bytes": len(pickle.dumps(preprocessor, protocol=pickle.HIGHEST_PROTOCOL)),
+        "artifact_bytes": (len(pickle.dumps(artifact, protocol=pickle.HIGHEST_PROTOCOL))
+                           if artifact is not None else None),
+    }
@@ -1,4 +1,7 @@
 import pandas as pd
+from typing import Optional
+
+from preprocessing.schema import load_schema, read_csv
 
 def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -14,24 +17,27 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     df = df.copy()
     df["Age"].fillna(df["Age"].mean().astype("float"))
-    df["Sex"] = df["Sex"].map({"male": 0, "female": 1})
+    df["Sex"] = df["Sex"].astype(object).map({"male": 0, "female": 1})  # may be category (schema reads)
     df["Pclass"] = df["Pclass"].astype("int64")  # Optional, for clarity
 
     return df
 
-def load_and_preprocess_data(file_path: str) -> tuple[pd.DataFrame, pd.Series]:
+def load_and_preprocess_data(file_path: str, schema_path: Optional[str] = None) -> tuple[pd.DataFrame, pd.Series]:
     """
     Loads CSV file, applies preprocessing, and returns features and target.
 
     Args:
         file_path (str): Path to Titanic CSV file.
+        schema_path (str, optional): Schema manifest (schema.json) giving the column
+            dtypes; without it the types are inferred.
 
     Returns:
         Tuple of:
             - X (pd.DataFrame): Feature matrix.
             - y (pd.Series): Target vector.
     """
-    df = pd.read_csv(file_path)
+    schema = load_schema(schema_path) if schema_path else None
+    df = read_csv(file_path, schema, columns=["Pclass", "Sex", "Age", "Fare", "Survived"])
     df = preprocess_data(df)
     X = df[["Pclass", "Sex", "Age", "Fare"]]
     y = df["Survived"]
@@ -0,0 +1,163 @@
+# preprocessing/schema.py
+"""
+Schema manifest for the training data, and the CSV loader that uses it.
+
+The manifest is written at training time next to feature_names.json. It records
+each column's dtype and nullability. For categorical (string) columns it also
+records the number of distinct values and, up to max_levels, the levels themselves:
+
+    {"format": 1, "rows": 891, "target": "Survived",
+     "columns": [{"name": "Pclass", "dtype": "int64", "nullable": false},
+                 {"name": "Sex", "dtype": "category", "nullable": false,
+                  "cardinality": 2, "categories": ["female", "male"]}, ...]}
+
+read_csv() reads with pyarrow using those types instead of inferring them.
+String columns are decoded straight into dictionary arrays, so they arrive as
+pandas `category` rather than object. The values (and NaN for missing) are the
+same as pd.read_csv gives.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+SCHEMA_FORMAT = 1
+NUMERIC_DTYPES = ("int64", "float64")
+CATEGORICAL_DTYPES = ("category",)
+
+_ARROW_TYPES = {"int64": pa.int64(), "float64": pa.float64(), "bool": pa.bool_()}
+
+
+def _dtype_name(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series):
+        return "int64"
+    if pd.api.types.is_float_dtype(series):
+        return "float64"
+    return "category"
+
+
+def infer_schema(df: pd.DataFrame, target_col: Optional[str] = None, max_levels: int = 50) -> Dict[str, Any]:
+    """
+    Build the manifest for a training frame.
+
+    Args:
+        df (pd.DataFrame): The raw training data, target included.
+        target_col (str, optional): Name of the target column, recorded for readers.
+        max_levels (int): Categorical levels are listed only up to this cardinality.
+
+    Returns:
+        Dict[str, Any]: The manifest (JSON-serialisable).
+    """
+    columns = []
+    for name in df.columns:
+        s = df[name]
+        entry: Dict[str, Any] = {"name": str(name), "dtype": _dtype_name(s), "nullable": bool(s.isna().any())}
+        if entry["dtype"] == "category":
+            levels = pd.Series(s.dropna().unique()).astype(str)
+            entry["cardinality"] = int(len(levels))
+            if len(levels) <= max_levels:
+                entry["categories"] = sorted(levels.tolist())
+        columns.append(entry)
+    return {"format": SCHEMA_FORMAT, "rows": int(len(df)), "target": target_col, "columns": columns}
+
+
+def save_schema(schema: Dict[str, Any], path: Union[str, Path]) -> None:
+    Path(path).write_text(json.dumps(schema, indent=2) + "\n", encoding="utf-8")
+
+
+def load_schema(path: Union[str, Path]) -> Dict[str, Any]:
+    schema = json.loads(Path(path).read_text(encoding="utf-8"))
+    if schema.get("format") != SCHEMA_FORMAT:
+        raise ValueError(f"Unsupported schema format {schema.get('format')!r} in {path}")
+    return schema
+
+
+def column_names(schema: Dict[str, Any], drop_target: bool = True) -> List[str]:
+    """Column order recorded in the manifest, optionally without the target."""
+    target = schema.get("target") if drop_target else None
+    return [c["name"] for c in schema["columns"] if c["name"] != target]
+
+
+def split_by_type(schema: Dict[str, Any], columns: Sequence[str]) -> Tuple[list, list]:
+    """Numeric and categorical columns among `columns`, by their recorded dtype."""
+    kinds = {c["name"]: c["dtype"] for c in schema["columns"]}
+    numeric = [c for c in columns if kinds.get(c) in NUMERIC_DTYPES]
+    categorical = [c for c in columns if kinds.get(c) in CATEGORICAL_DTYPES]
+    return numeric, categorical
+
+
+def arrow_column_types(schema: Dict[str, Any], dictionary: bool = True) -> Dict[str, pa.DataType]:
+    """
+    pyarrow CSV column types for the manifest. Categorical columns become
+    dictionary<int32, string> (pandas category), or plain strings with dictionary=False.
+    """
+    string_type = pa.dictionary(pa.int32(), pa.string()) if dictionary else pa.string()
+    return {c["name"]: _ARROW_TYPES.get(c["dtype"], string_type) for c in schema["columns"]}
+
+
+def read_csv(
+    path: Union[str, Path],
+    schema: Optional[Dict[str, Any]] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Load a CSV with the manifest's dtypes.
+
+    Args:
+        path (str | Path): CSV file to read.
+        schema (dict, optional): Manifest from load_schema(). Without one this is pd.read_csv.
+        columns (Sequence[str], optional): Only read these columns, in this order.
+
+    Returns:
+        pd.DataFrame: Numeric columns as int64/float64 (float64 if a value is
+        missing), string columns as category. Recorded levels come first in
+        each category's order; levels the manifest has not seen are appended.
+    """
+    if schema is None:
+        df = pd.read_csv(path, usecols=list(columns) if columns is not None else None)
+        return df if columns is None else df[list(columns)]
+
+    table = pacsv.read_csv(
+        str(path),
+        convert_options=pacsv.ConvertOptions(
+            column_types=arrow_column_types(schema),
+            include_columns=list(columns) if columns is not None else None,
+            strings_can_be_null=True,  # "" and "NA" are missing, as with pd.read_csv
+        ),
+    )
+    df = table.to_pandas()
+    for c in schema["columns"]:
+        known = c.get("categories")
+        if known is None or c["name"] not in df.columns:
+            continue
+        col = df[c["name"]]
+        seen = set(known)
+        unseen = [v for v in col.cat.categories if v not in seen]
+        df[c["name"]] = col.cat.set_categories(list(known) + unseen)
+    return df
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write the schema manifest for a training CSV.")
+    parser.add_argument("csv", help="training CSV")
+    parser.add_argument("--out", required=True, help="where to write schema.json")
+    parser.add_argument("--target", default=None, help="target column name")
+    parser.add_argument("--max-levels", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    schema = infer_schema(pd.read_csv(args.csv), target_col=args.target, max_levels=args.max_levels)
+    save_schema(schema, args.out)
+    print(f"✅ Wrote {args.out} ({len(schema['columns'])} columns)")
+
+
+if __name__ == "__main__":
+    main()
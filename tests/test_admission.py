@@ -0,0 +1,121 @@
+# tests/test_admission.py
+import threading
+import time
+
+import pytest
+
+import app.model_api as api
+from app.utils.admission import AdmissionController, Overloaded
+
+
+def _hold(ctrl, rows=1):
+    """Occupy slots from another thread until the returned event is set."""
+    held, release = threading.Event(), threading.Event()
+
+    def run():
+        with ctrl.slot(rows):
+            held.set()
+            release.wait(5)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    assert held.wait(5)
+    return release, t
+
+
+def test_batches_are_weighted_by_rows():
+    ctrl = AdmissionController("m", max_concurrent=4, batch_rows_per_slot=100)
+    assert [ctrl.weight(n) for n in (1, 100, 101, 250, 10**6)] == [1, 1, 2, 3, 4]
+
+
+def test_full_queue_rejects_at_once_and_timeout_rejects_later():
+    ctrl = AdmissionController("m", max_concurrent=2, max_queue=1, queue_timeout_ms=50)
+    release, t = _hold(ctrl, rows=2000)                 # a batch takes both slots
+    with pytest.raises(Overloaded) as e:
+        with ctrl.slot(rows=2000):                      # wants 2 slots, only 1 may queue
+            pass
+    assert e.value.reason == "queue_full" and e.value.retry_after_sec >= 1
+
+    t0 = time.perf_counter()
+    with pytest.raises(Overloaded) as e:
+        with ctrl.slot():
+            pass
+    assert e.value.reason == "queue_timeout" and time.perf_counter() - t0 >= 0.05
+    release.set()
+    t.join()
+
+    st = ctrl.stats()
+    assert st["rejected"] == {"queue_full": 1, "queue_timeout": 1}
+    assert (st["in_use"], st["queued"], st["admitted"]) == (0, 0, 1)
+
+
+def test_queued_requests_are_admitted_in_arrival_order():
+    ctrl = AdmissionController("m", max_concurrent=2, max_queue=8, queue_timeout_ms=5000, batch_rows_per_slot=1)
+    release, t = _hold(ctrl, rows=2)
+    order = []
+
+    def request(tag, rows):
+        with ctrl.slot(rows):
+            order.append(tag)
+
+    threads = []
+    for tag, rows, queued in (("batch", 2, 2), ("row", 1, 3)):
+        threads.append(threading.Thread(target=request, args=(tag, rows)))
+        threads[-1].start()
+        while ctrl.stats()["queued"] < queued:       # wait until it is in line
+            time.sleep(0.001)
+    release.set()
+    for th in threads + [t]:
+        th.join(5)
+    assert order == ["batch", "row"]    # the single row did not jump the queued batch
+    assert ctrl.stats()["admitted_after_wait"] == 2
+
+
+def test_api_answers_429_with_retry_after(monkeypatch):
+    ctrl = AdmissionController("titanic", max_concurrent=1, max_queue=0)
+    monkeypatch.setitem(api._ADMISSION, "titanic", ctrl)
+    client = api.app.test_client()
+    assert client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]}).status_code == 200
+
+    release, t = _hold(ctrl)
+    try:
+        r = client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]})
+        assert r.status_code == 429 and int(r.headers["Retry-After"]) >= 1
+        assert r.get_json()["reason"] == "queue_full"
+        r = client.post("/v1/batch_predict/titanic", json={"rows": [{"Pclass": 3}]})
+        assert r.status_code == 429
+        assert client.get("/health").status_code == 200   # not subject to admission
+    finally:
+        release.set()
+        t.join()
+
+    assert client.get("/v1/models").get_json()["titanic"]["admission"]["rejected"]["queue_full"] == 2
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'ml_api_admission_rejections_total{model="titanic",reason="queue_full"} 2.0' in text
+    assert 'ml_api_request_seconds_count{endpoint="predict",model="titanic",status="429"} 1.0' in text
+
+
+def test_unknown_models_get_404_without_an_admission_entry():
+    client = api.app.test_client()
+    before = dict(api._ADMISSION)
+    for i in range(5):
+        r = client.post(f"/v1/predict/nope{i}", json={"features": [3, 0, 22, 7.25]})
+        assert r.status_code == 404 and "not found in config" in r.get_json()["error"]
+        assert client.post(f"/v1/batch_predict/nope{i}", json={"rows": [{"Pclass": 3}]}).status_code == 404
+    assert api._ADMISSION == before
+
+
+def test_an_open_stream_keeps_its_place_until_it_is_closed(monkeypatch):
+    ctrl = AdmissionController("titanic", max_concurrent=1, max_queue=0)
+    monkeypatch.setitem(api._ADMISSION, "titanic", ctrl)
+    client = api.app.test_client()
+    body = b'{"Pclass": 1, "Sex": "female"}\n{"Pclass": 3}\n'
+
+    stream = client.post("/v1/stream_predict/titanic", data=body, buffered=False)
+    assert stream.status_code == 200 and ctrl.stats()["in_handler"] == 1  # rows not scored yet
+    assert client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]}).status_code == 429
+    assert len(stream.get_data().splitlines()) == 2
+    stream.close()
+
+    assert ctrl.stats()["in_handler"] == 0
+    assert client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]}).status_code == 200
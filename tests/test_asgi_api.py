@@ -0,0 +1,62 @@
+# tests/test_asgi_api.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.asgi_api as asgi
+import app.model_api as flask_api
+
+
+@pytest.fixture(params=[0, 1], ids=["threads", "processes"])
+def client(request, monkeypatch):
+    monkeypatch.setattr(asgi, "ASGI_CFG", {"process_workers": request.param, "start_method": "spawn"})
+    with TestClient(asgi.app) as c:
+        yield c
+
+
+def test_same_contract_as_flask(client):
+    assert client.get("/health").json()["ready"] is True
+    assert "titanic" in client.get("/v1/models").json()
+    assert client.get("/v1/schema/titanic").json()["expected_raw_features"][0] == "PassengerId"
+
+    r = client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]})
+    assert r.status_code == 200
+    assert r.json()["prediction"] in (0, 1)
+
+    r = client.post("/v1/batch_predict/titanic", json={"rows": [{"Pclass": 1, "Sex": "female"}, {"Pclass": 3}]})
+    assert r.json()["count"] == 2
+
+
+def test_bad_requests_are_rejected(client):
+    assert client.post("/v1/predict/titanic", json={}).status_code == 400
+    assert client.post("/v1/predict/titanic", json={"features": [1, 2]}).status_code != 200
+    assert client.post("/v1/predict/titanic", content=b"just text").status_code != 200
+    r = client.post("/v1/batch_predict/titanic", json={"columns": {"Pclass": [1, 2], "Age": [3]}})
+    assert r.status_code == 400 and r.json()["error"].startswith("Invalid payload")
+    r = client.post("/v1/batch_predict/titanic", content=b"not arrow at all",
+                    headers={"content-type": "application/vnd.apache.arrow.stream"})
+    assert r.status_code == 400 and r.json()["error"].startswith("Invalid payload")
+
+
+@pytest.mark.parametrize("model, features, status", [
+    ("titanic", [1, 2], 400),                        # wrong feature count
+    ("titanic", {"Age": "old"}, 400),                # non-numeric string in a numeric column
+    ("titanic", {"Fare": {"amount": 7.25}}, 400),    # nested object
+    ("titanic", "3,male,22,7.25", 400),              # neither a dict nor a list
+    ("nope", [3, 0, 22, 7.25], 404),                 # unknown model
+])
+def test_bad_features_get_the_same_answer_as_flask(client, model, features, status):
+    expected = flask_api.app.test_client().post(f"/v1/predict/{model}", json={"features": features})
+    r = client.post(f"/v1/predict/{model}", json={"features": features})
+    assert r.status_code == expected.status_code == status
+    assert r.json()["error"] == expected.get_json()["error"]
+
+
+def test_stream_predict(client):
+    body = b'{"Pclass": 1, "Sex": "female"}\n{"Pclass": 3}\nnot json\n'
+    r = client.post("/v1/stream_predict/titanic", content=body)
+    assert r.status_code == 200
+    lines = [json.loads(x) for x in r.text.splitlines()]
+    assert [x["row"] for x in lines] == [0, 1, 2]
+    assert "error" in lines[2]
@@ -0,0 +1,70 @@
+# tests/test_batch_formats.py
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from app.model_api import REGISTRY, app
+from app.utils.arrow_io import ARROW_STREAM_MIMETYPE
+
+ROOT = Path(__file__).resolve().parents[1]
+URL = "/v1/batch_predict/titanic"
+
+
+def _frame(n=50):
+    return pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"]).head(n)
+
+
+def _arrow_body(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_columns_rows_and_arrow_agree():
+    df = _frame()
+    client = app.test_client()
+
+    rows = client.post(URL, json={"rows": df.to_dict("records")}).get_json()["predictions"]
+    cols = client.post(URL, json={"columns": df.to_dict("list")}).get_json()
+    arrow = client.post(URL, data=_arrow_body(df), content_type=ARROW_STREAM_MIMETYPE).get_json()
+
+    assert cols["count"] == len(df)
+    assert cols["predictions"] == rows
+    assert arrow["predictions"] == rows
+
+
+@pytest.mark.parametrize("body", [b"not arrow at all", _arrow_body(_frame(5))[:-40]])
+def test_garbage_arrow_body_is_a_bad_request(body):
+    r = app.test_client().post(URL, data=body, content_type=ARROW_STREAM_MIMETYPE)
+    assert r.status_code == 400
+    assert r.get_json()["error"].startswith("Invalid payload: body is not a valid Arrow IPC stream")
+    assert "traceback" not in r.get_json()
+
+
+def test_arrow_response():
+    df = _frame(10)
+    r = app.test_client().post(
+        URL + "?format=arrow", json={"columns": df.to_dict("list")},
+    )
+    assert r.status_code == 200
+    assert r.mimetype == ARROW_STREAM_MIMETYPE
+    table = pa.ipc.open_stream(pa.py_buffer(r.data)).read_all()
+    assert table.num_rows == 10
+    assert set(table.column("prediction").to_pylist()) <= {0, 1}
+
+
+@pytest.mark.parametrize("typed", [True, False])
+@pytest.mark.parametrize("columns", [{"Pclass": [1, 2], "Age": [3]}, {"Pclass": [1, 2], "Age": 3}])
+def test_columns_must_have_equal_lengths(columns, typed, monkeypatch):
+    if not typed:
+        monkeypatch.setattr(REGISTRY.get("titanic"), "codec", None)
+    r = app.test_client().post(URL, json={"columns": columns})
+    assert r.status_code == 400
+    error = r.get_json()["error"]
+    assert error.startswith("Invalid payload")
+    if isinstance(columns["Age"], list) or not typed:  # the typed decoder names the bad field instead
+        assert "'columns' values must be lists" in error
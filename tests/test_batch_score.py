@@ -0,0 +1,78 @@
+# tests/test_batch_score.py
+import os
+import shutil
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+
+from app.batch_score import score_file
+
+ROOT = Path(__file__).resolve().parents[1]
+TRAIN_CSV = ROOT / "data" / "raw" / "train.csv"
+MODEL_PATH = ROOT / "model" / "ash_test_model" / "ash_test_model.pkl"
+
+
+def _expected():
+    df = pd.read_csv(TRAIN_CSV).drop(columns=["Survived"])
+    return df, joblib.load(MODEL_PATH).predict(df)
+
+
+def test_csv_and_parquet_match_sklearn(tmp_path):
+    df, expected = _expected()
+    pq_path = tmp_path / "in.parquet"
+    df.to_parquet(pq_path, row_group_size=100)
+
+    rep = score_file(TRAIN_CSV, "titanic", tmp_path / "csv_out", id_col="PassengerId", chunk_rows=200)
+    assert rep["rows_scored"] == len(df) and rep["chunks_scored"] == 5
+    out = pd.read_parquet(tmp_path / "csv_out").sort_values("PassengerId")
+    assert out["PassengerId"].tolist() == df["PassengerId"].tolist()
+    assert (out["prediction"].values == expected).all()
+
+    score_file(pq_path, "titanic", tmp_path / "pq_out", chunk_rows=200)
+    out = pd.read_parquet(tmp_path / "pq_out").sort_values("row")
+    assert out["row"].tolist() == list(range(len(df)))
+    assert (out["prediction"].values == expected).all()
+
+
+def test_resume_skips_finished_chunks(tmp_path):
+    out_dir = tmp_path / "out"
+    score_file(TRAIN_CSV, "titanic", out_dir, chunk_rows=300)
+    (out_dir / "part-000001.parquet").unlink()
+
+    with pytest.raises(SystemExit):
+        score_file(TRAIN_CSV, "titanic", out_dir, chunk_rows=300)            # no --resume
+    with pytest.raises(SystemExit, match="chunk_rows"):
+        score_file(TRAIN_CSV, "titanic", out_dir, chunk_rows=100, resume=True)
+
+    rep = score_file(TRAIN_CSV, "titanic", out_dir, chunk_rows=300, resume=True)
+    assert (rep["chunks_scored"], rep["chunks_skipped"], rep["rows_scored"]) == (1, 2, 300)
+    assert len(pd.read_parquet(out_dir)) == 891
+
+
+def test_resume_refuses_a_rewritten_input_of_the_same_size(tmp_path):
+    src = tmp_path / "in.csv"
+    shutil.copy(TRAIN_CSV, src)
+    out_dir = tmp_path / "out"
+    score_file(src, "titanic", out_dir, chunk_rows=300)
+    st = src.stat()
+
+    data = src.read_bytes()
+    i = data.index(b"\n") + 1
+    rewritten = data[:i] + (b"2" if data[i:i + 1] != b"2" else b"3") + data[i + 1:]  # first PassengerId
+    assert len(rewritten) == len(data)
+    src.write_bytes(rewritten)
+    with pytest.raises(SystemExit, match="input_mtime_ns"):
+        score_file(src, "titanic", out_dir, chunk_rows=300, resume=True)
+
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns))  # same size and mtime: only the content differs
+    with pytest.raises(SystemExit, match="input_fingerprint"):
+        score_file(src, "titanic", out_dir, chunk_rows=300, resume=True)
+
+
+def test_process_pool_reports_rows_per_worker(tmp_path):
+    rep = score_file(TRAIN_CSV, "titanic", tmp_path / "out", chunk_rows=300, workers=2)
+    assert rep["rows_scored"] == 891
+    assert sum(w["rows"] for w in rep["workers"].values()) == 891
+    assert all(w["rows_per_sec"] > 0 for w in rep["workers"].values())
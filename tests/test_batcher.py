@@ -0,0 +1,90 @@
+# tests/test_batcher.py
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import app.model_api as api
+from app.utils.batcher import MicroBatcher
+from app.utils.registry import ModelRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _row(i):
+    return pd.DataFrame([{"x": i}])
+
+
+def test_concurrent_rows_share_a_batch_and_get_own_result():
+    calls = []
+
+    def predict_fn(lm, df):
+        calls.append(len(df))
+        return (df["x"] * 10).tolist()
+
+    b = MicroBatcher("fake", predict_fn, max_batch_size=16, max_wait_ms=50)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as ex:
+            results = list(ex.map(lambda i: b.predict(None, _row(i)), range(16)))
+    finally:
+        b.close()
+
+    assert results == [i * 10 for i in range(16)]
+    assert max(calls) > 1
+    stats = b.stats()
+    assert stats["items"] == 16
+    assert stats["max_batch_size_seen"] > 1
+
+
+def test_bad_row_does_not_fail_its_neighbours():
+    def predict_fn(lm, df):
+        if (df["x"] < 0).any():
+            raise ValueError("negative")
+        return df["x"].tolist()
+
+    b = MicroBatcher("fake", predict_fn, max_batch_size=8, max_wait_ms=50)
+    try:
+        futs = [b.submit(None, _row(i)) for i in (1, -1, 2)]
+        assert futs[0].result(timeout=5) == 1
+        assert isinstance(futs[1].exception(timeout=5), ValueError)
+        assert futs[2].result(timeout=5) == 2
+    finally:
+        b.close()
+
+
+def test_batched_predictions_match_direct_predict():
+    reg = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
+    lm = reg.get("titanic")
+    df = pd.read_csv(ROOT / "data" / "raw" / "train.csv").head(20)[lm.feature_names]
+    expected = lm.obj.predict(df)
+
+    b = MicroBatcher("titanic", lambda m, frame: m.obj.predict(frame), max_batch_size=20, max_wait_ms=50)
+    try:
+        with ThreadPoolExecutor(max_workers=20) as ex:
+            got = list(ex.map(lambda i: b.predict(lm, df.iloc[[i]]), range(len(df))))
+    finally:
+        b.close()
+
+    assert [int(y) for y in got] == [int(y) for y in expected]
+
+
+def test_api_rows_form_batches_with_compile_on(monkeypatch):
+    assert api.REGISTRY.model_config("titanic").get("compile", True)  # the shipped default
+    lm = api.REGISTRY.get("titanic")
+    assert lm.compiled is not None
+    b = MicroBatcher("titanic", api._predict_frame, max_batch_size=16, max_wait_ms=50)
+    monkeypatch.setitem(api._BATCHERS, "titanic", b)
+
+    def post(i):
+        features = [1 + i % 3, i % 2, 20 + i, 7.25]
+        return api.app.test_client().post("/v1/predict/titanic", json={"features": features})
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as ex:
+            responses = list(ex.map(post, range(16)))
+    finally:
+        b.close()
+
+    assert all(r.status_code == 200 for r in responses)
+    stats = b.stats()
+    assert stats["items"] == 16 and stats["max_batch_size_seen"] > 1
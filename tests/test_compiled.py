@@ -0,0 +1,50 @@
+# tests/test_compiled.py
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from app.utils.compiled import compile_model
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "model" / "ash_test_model" / "ash_test_model.pkl"
+DATA_PATH = ROOT / "data" / "raw" / "train.csv"
+
+
+def test_compiled_matches_pipeline_bit_for_bit():
+    model = joblib.load(MODEL_PATH)
+    compiled = compile_model(model)
+    assert compiled is not None
+
+    X = pd.read_csv(DATA_PATH).drop("Survived", axis=1)
+    expected_proba = model.predict_proba(X)
+    expected = model.predict(X)
+
+    for i, row in enumerate(X.to_dict("records")):
+        assert np.array_equal(compiled.predict_proba_one(row), expected_proba[i])
+        assert compiled.predict_one(row) == expected[i]
+
+
+def test_compiled_handles_missing_and_unknown_values():
+    model = joblib.load(MODEL_PATH)
+    compiled = compile_model(model)
+    cols = list(model.named_steps["prep"].feature_names_in_)
+
+    rows = [
+        {"Pclass": 3, "Age": 22, "Fare": 7.25},                        # mostly NaN -> imputed
+        {"Pclass": "1", "Sex": "female", "Age": None, "Name": None},   # string number, None
+        {"Pclass": 2, "Sex": 0, "Age": 30.5, "Fare": 0, "Ticket": "?"},  # unknown categories
+    ]
+    for r in rows:
+        full = {c: r.get(c, np.nan) for c in cols}
+        expected = model.predict_proba(pd.DataFrame([full]))[0]
+        assert np.array_equal(compiled.predict_proba_one(full), expected)
+
+
+def test_unsupported_models_fall_back():
+    model = joblib.load(MODEL_PATH)
+    other = Pipeline([("prep", model.named_steps["prep"]), ("clf", LogisticRegression())])
+    assert compile_model(other) is None
@@ -0,0 +1,62 @@
+# tests/test_dedup.py
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import app.model_api as api
+from app.utils.dedup import Deduplicator
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "model" / "ash_test_model" / "ash_test_model.pkl"
+
+
+def _frame():
+    return pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"])
+
+
+def test_collapsed_predictions_match_full_scoring():
+    df = _frame().sample(3000, replace=True, random_state=1).reset_index(drop=True)   # NaNs included
+    model = joblib.load(MODEL_PATH)
+    seen = []
+
+    def predict(frame):
+        seen.append(len(frame))
+        return model.predict(frame)
+
+    preds, info = Deduplicator(mode="on").predict(df, predict)
+    assert (preds == model.predict(df)).all()
+    assert info["applied"] and seen == [info["unique_rows"]]
+    assert info["unique_rows"] == len(df.drop_duplicates())
+    assert np.isclose(info["dedup_ratio"], 1 - info["unique_rows"] / len(df))
+
+
+def test_auto_mode_only_collapses_when_it_pays_off():
+    dedup = Deduplicator(mode="auto", min_duplicate_fraction=0.05, min_rows=16)
+    unique = _frame().head(100)
+    _, info = dedup.predict(unique, lambda f: np.zeros(len(f)))
+    assert info == {"rows": 100, "unique_rows": 100, "dedup_ratio": 0.0, "applied": False}
+
+    _, info = dedup.predict(pd.concat([unique] * 3), lambda f: np.zeros(len(f)))
+    assert info["applied"] and info["unique_rows"] == 100
+
+    _, info = dedup.predict(unique.head(5), lambda f: np.zeros(len(f)))   # below min_rows
+    assert info["unique_rows"] is None and not info["applied"]
+
+    st = dedup.stats()
+    assert (st["batches"], st["batches_collapsed"], st["rows"], st["rows_scored"]) == (3, 1, 405, 205)
+
+
+def test_batch_predict_reports_dedup_ratio(monkeypatch):
+    rows = [[3, "male", 22.0, 7.25], [1, "female", 38.0, 71.3]] * 40
+    rows = [{"Pclass": p, "Sex": s, "Age": a, "Fare": f} for p, s, a, f in rows]
+    client = api.app.test_client()
+    seen = []
+    real = api._predict_frame
+    monkeypatch.setattr(api, "_predict_frame", lambda lm, frame, *a: seen.append(len(frame)) or real(lm, frame, *a))
+
+    r = client.post("/v1/batch_predict/titanic", json={"rows": rows}).get_json()
+    assert r["count"] == 80 and r["predictions"][:2] * 40 == r["predictions"]
+    assert r["dedup"] == {"rows": 80, "unique_rows": 2, "dedup_ratio": 0.975, "applied": True}
+    assert seen == [2]
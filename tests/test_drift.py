@@ -1,18 +1,21 @@
 # tests/test_drift.py
-import pandas as pd
 from evidently.report import Report
 from evidently.metric_preset import DataDriftPreset
 
+from preprocessing.schema import load_schema, read_csv
+
 TRAIN_DATA_PATH = "data/raw/train.csv"
 CURRENT_DATA_PATH = "data/processed/current.csv"  # Replace with your latest batch
+SCHEMA_PATH = "model/ash_test_model/schema.json"
 
 # Threshold: percentage of features allowed to drift before failing test
 DRIFT_THRESHOLD = 0.3  # 30% of features
 
 def test_data_drift():
     # Load reference (training) and current datasets
-    reference_df = pd.read_csv(TRAIN_DATA_PATH)
-    current_df = pd.read_csv(CURRENT_DATA_PATH)
+    schema = load_schema(SCHEMA_PATH)
+    reference_df = read_csv(TRAIN_DATA_PATH, schema)
+    current_df = read_csv(CURRENT_DATA_PATH, schema)
 
     # Align columns
     common_cols = list(set(reference_df.columns) & set(current_df.columns))
@@ -0,0 +1,106 @@
+# tests/test_encoding.py
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from app.utils.compiled import compile_model
+from app.utils.registry import ModelRegistry
+from app.utils.typed_io import column_kinds
+from preprocessing.pipeline import (
+    MAX_CATEGORIES,
+    choose_categorical_encoding,
+    describe_preprocessor,
+    get_preprocessing_pipeline,
+    plan_categorical_encoding,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_PATH = ROOT / "data" / "raw" / "train.csv"
+CATEGORICAL = ["Name", "Sex", "Ticket", "Cabin", "Embarked"]
+
+
+def _xy():
+    df = pd.read_csv(DATA_PATH)
+    return df.drop(columns=["Survived"]), df["Survived"]
+
+
+def test_encoding_follows_cardinality():
+    X, _ = _xy()
+    assert plan_categorical_encoding(X, CATEGORICAL) == {
+        "Name": "drop", "Sex": "onehot", "Ticket": "drop", "Cabin": "drop", "Embarked": "onehot"}
+    assert set(plan_categorical_encoding(X, CATEGORICAL, near_unique="hash").values()) == {"onehot", "hash"}
+    assert set(plan_categorical_encoding(X, CATEGORICAL, "onehot").values()) == {"onehot"}
+    assert plan_categorical_encoding(X, CATEGORICAL, {"Cabin": "capped"})["Cabin"] == "capped"
+
+    moderate = pd.Series([f"level{i % 40}" for i in range(1000)])  # 40 levels, each seen 25 times
+    assert choose_categorical_encoding(moderate) == "capped"
+    with pytest.raises(ValueError):
+        plan_categorical_encoding(X, CATEGORICAL, {"Cabin": "ordinal"})
+
+
+def test_auto_encoding_is_narrower_and_smaller_than_onehot():
+    X, y = _xy()
+    sizes = {}
+    for encoding in ("onehot", "auto"):
+        model = Pipeline([("prep", get_preprocessing_pipeline(X, encoding=encoding)),
+                          ("clf", RandomForestClassifier(n_estimators=20, random_state=0))]).fit(X, y)
+        sizes[encoding] = describe_preprocessor(model.named_steps["prep"], model)
+    assert sizes["auto"]["n_features_out"] == 11  # 6 numeric + Sex (2) + Embarked (3)
+    assert sizes["onehot"]["n_features_out"] > 1000
+    assert sizes["auto"]["artifact_bytes"] < sizes["onehot"]["artifact_bytes"]
+    assert sizes["auto"]["encodings"]["Name"] == "drop"
+
+
+@pytest.mark.parametrize("encoding,near_unique", [({"Cabin": "capped", "Ticket": "capped"}, "hash"), ("auto", "hash")])
+def test_compiled_path_matches_capped_and_hashed_columns(encoding, near_unique):
+    X, y = _xy()
+    model = Pipeline([("prep", get_preprocessing_pipeline(X, encoding=encoding, near_unique=near_unique)),
+                      ("clf", RandomForestClassifier(n_estimators=20, random_state=0))]).fit(X, y)
+    compiled = compile_model(model)
+    assert compiled is not None
+
+    rows = X.head(200).to_dict(orient="records")
+    rows += [dict(r, Cabin="Z99", Ticket="unseen", Name="Someone, Mr. New") for r in rows[:30]]
+    rows += [dict(r, Cabin=np.nan, Ticket=np.nan) for r in rows[:30]]
+    frame = pd.DataFrame(rows)
+    expected = model[:-1].transform(frame)
+    expected = expected.toarray() if hasattr(expected, "toarray") else expected
+    assert np.array_equal(np.stack([compiled.transform_one(r) for r in rows]), expected)
+    assert list(model.predict(frame)) == [compiled.predict_one(r) for r in rows]
+    assert column_kinds(model, list(X.columns))["Name"] == "any"
+
+    capped = model.named_steps["prep"].named_transformers_.get("cat_capped")
+    if capped is not None:  # rare cabins/tickets (and the unseen ones above) share a column
+        encoder = capped.named_steps["encoder"]
+        assert all(rare is not None for rare in encoder.infrequent_categories_)
+        assert all(len(cats) - len(rare) + 1 <= MAX_CATEGORIES
+                   for cats, rare in zip(encoder.categories_, encoder.infrequent_categories_))
+
+
+@pytest.mark.parametrize("encoding", ["onehot", "auto"])
+def test_registry_rebuilds_fallback_with_the_training_encoding(tmp_path, encoding):
+    X, y = _xy()
+    prep = get_preprocessing_pipeline(X, encoding=encoding).fit(X)
+    clf = RandomForestClassifier(n_estimators=10, random_state=0).fit(prep.transform(X), y)
+    joblib.dump(clf, tmp_path / "model.pkl")
+
+    cfg = tmp_path / "config.yaml"
+    cfg.write_text(
+        "api:\n"
+        "  preprocessor_cache: false\n"
+        "models:\n"
+        "  bare:\n"
+        f"    model_path: {tmp_path / 'model.pkl'}\n"
+        f"    train_csv_path: {DATA_PATH}\n"
+        "    target_col: Survived\n"
+        + ("" if encoding == "onehot" else f"    fallback_encoding: {encoding}\n"),  # onehot is the default
+        encoding="utf-8",
+    )
+    lm = ModelRegistry(str(cfg)).get("bare")
+    assert not lm.is_pipeline
+    assert (lm.predict_frame(X.head(50)) == clf.predict(prep.transform(X.head(50)))).all()
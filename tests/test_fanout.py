@@ -0,0 +1,108 @@
+# tests/test_fanout.py
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+
+import app.model_api as api
+from app.utils.admission import AdmissionController
+from app.utils.payload import PayloadAdapter
+from app.utils.registry import ModelRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_DIR = ROOT / "model" / "ash_test_model"
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """a and b are the same pipeline; c has a differently fitted scaler."""
+    model = joblib.load(MODEL_DIR / "ash_test_model.pkl")
+    other = copy.deepcopy(model)
+    other.named_steps["prep"].transformers_[0][1].named_steps["scaler"].mean_ += 0.5
+    joblib.dump(other, tmp_path / "other.pkl")
+
+    def entry(name, path):
+        return (f"  {name}:\n    model_path: {path}\n    feature_names_path: {MODEL_DIR / 'feature_names.json'}\n"
+                f"    train_csv_path: {ROOT / 'data' / 'raw' / 'train.csv'}\n    target_col: Survived\n")
+
+    cfg = tmp_path / "config" / "config.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text("models:\n" + entry("a", MODEL_DIR / "ash_test_model.pkl")
+                   + entry("b", MODEL_DIR / "ash_test_model.pkl") + entry("c", tmp_path / "other.pkl"),
+                   encoding="utf-8")
+    reg = ModelRegistry(config_path=cfg)
+    monkeypatch.setattr(api, "REGISTRY", reg)
+    return reg
+
+
+def test_models_sharing_a_preprocessor_share_one_transform(registry):
+    rows = pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"]).head(40)
+    saved = api._FANOUT.transforms_saved
+    r = api.app.test_client().post("/v1/fanout_predict", json={"rows": rows.to_dict(orient="records")})
+    assert r.status_code == 200
+    body = r.get_json()
+
+    groups = sorted(body["groups"], key=lambda g: len(g["models"]))
+    assert [sorted(g["models"]) for g in groups] == [["c"], ["a", "b"]]
+    assert api._FANOUT.transforms_saved - saved == 1
+    res = body["results"]
+    assert res["a"]["preprocess_group"] == res["b"]["preprocess_group"] != res["c"]["preprocess_group"]
+    assert res["a"]["timings_ms"]["transform"] == res["b"]["timings_ms"]["transform"]
+    for name in "abc":
+        lm = registry.get(name)
+        expected = lm.predict_frame(rows.reindex(columns=lm.feature_names))
+        assert res[name]["predictions"] == [int(p) for p in expected]
+        assert res[name]["timings_ms"]["predict"] > 0
+
+
+def test_single_row_defaults_to_every_model_and_matches_predict(registry):
+    client = api.app.test_client()
+    r = client.post("/v1/fanout_predict", json={"features": [3, 0, 22, 7.25]}).get_json()
+    assert list(r["results"]) == ["a", "b", "c"]
+    single = client.post("/v1/predict/a", json={"features": [3, 0, 22, 7.25]}).get_json()
+    assert r["results"]["a"]["predictions"] == [single["prediction"]]
+
+
+def test_bad_requests(registry):
+    client = api.app.test_client()
+    assert client.post("/v1/fanout_predict", json={"models": ["a", "nope"], "rows": []}).status_code == 404
+    assert client.post("/v1/fanout_predict", json={"models": ["a"]}).status_code == 400
+
+
+def test_unresolved_payload_shape_falls_back_to_the_next_candidate(registry, monkeypatch):
+    lm = registry.get("a")
+    monkeypatch.setattr(lm, "payload_adapter", PayloadAdapter("unknown", lm.feature_names))
+    client = api.app.test_client()
+    r = client.post("/v1/fanout_predict", json={"models": ["a"], "features": [3, 0, 22, 7.25]}).get_json()
+    single = client.post("/v1/predict/a", json={"features": [3, 0, 22, 7.25]}).get_json()
+    assert r["results"]["a"]["predictions"] == [single["prediction"]]  # the minimal row fails, the full one scores
+
+
+def test_fanout_goes_through_admission_and_metrics(registry, monkeypatch):
+    ctrl = AdmissionController("a", max_concurrent=1, max_queue=0)
+    monkeypatch.setitem(api._ADMISSION, "a", ctrl)
+    client = api.app.test_client()
+    with ctrl.slot():  # "a" is busy
+        r = client.post("/v1/fanout_predict", json={"features": [3, 0, 22, 7.25]}).get_json()
+    assert r["results"]["a"]["status"] == 429 and "retry_after_sec" in r["results"]["a"]
+    assert len(r["results"]["b"]["predictions"]) == len(r["results"]["c"]["predictions"]) == 1
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'ml_api_request_seconds_count{endpoint="fanout_predict",model="a",status="429"}' in text
+    assert 'ml_api_request_seconds_count{endpoint="fanout_predict",model="b",status="200"}' in text
+
+
+def test_counters_are_exact_under_concurrent_requests(registry):
+    before = api._FANOUT.stats()
+
+    def post(_):
+        return api.app.test_client().post("/v1/fanout_predict", json={"features": [3, 0, 22, 7.25]}).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        assert set(ex.map(post, range(32))) == {200}
+    after = api._FANOUT.stats()
+    assert after["requests"] - before["requests"] == 32
+    assert after["transforms_saved"] - before["transforms_saved"] == 32  # a and b share every transform
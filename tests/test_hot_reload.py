@@ -0,0 +1,79 @@
+# tests/test_hot_reload.py
+import shutil
+import time
+from pathlib import Path
+
+import joblib
+
+from app.utils.registry import ModelRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_DIR = ROOT / "model" / "ash_test_model"
+
+
+def _registry(tmp_path):
+    shutil.copy(MODEL_DIR / "ash_test_model.pkl", tmp_path / "model.pkl")
+    shutil.copy(MODEL_DIR / "feature_names.json", tmp_path / "feature_names.json")
+    shutil.copy(ROOT / "data" / "raw" / "train.csv", tmp_path / "train.csv")
+    cfg = tmp_path / "config" / "config.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text(
+        "models:\n"
+        "  titanic:\n"
+        "    model_path: model.pkl\n"
+        "    feature_names_path: feature_names.json\n"
+        "    train_csv_path: train.csv\n"
+        "    target_col: Survived\n",
+        encoding="utf-8",
+    )
+    return ModelRegistry(config_path=cfg)
+
+
+def _retrain(tmp_path):
+    """Write a different artifact (same model, extra attribute) to change the hash."""
+    obj = joblib.load(tmp_path / "model.pkl")
+    obj.retrained_at = time.time()
+    joblib.dump(obj, tmp_path / "model.pkl")
+
+
+def test_reload_swaps_version_and_old_instance_keeps_working(tmp_path):
+    reg = _registry(tmp_path)
+    old = reg.get("titanic")
+    assert reg.reload("titanic")["status"] == "unchanged"
+
+    _retrain(tmp_path)
+    result = reg.reload("titanic")
+    new = reg.get("titanic")
+
+    assert result["status"] == "reloaded"
+    assert new is not old and new.version != old.version
+    assert new.warmup_sec is not None
+    # an in-flight request holding the old instance can still finish
+    row = {c: 0 for c in old.feature_names}
+    assert old.compiled.predict_one(row) == new.compiled.predict_one(row)
+
+
+def test_rollback_restores_previous_version_and_watcher_respects_it(tmp_path):
+    reg = _registry(tmp_path)
+    v1 = reg.get("titanic").version
+    _retrain(tmp_path)
+    v2 = reg.reload("titanic")["version"]
+
+    assert reg.rollback("titanic")["version"] == v1
+    assert reg.get("titanic").version == v1
+    assert reg.reload("titanic")["status"] == "unchanged"   # disk still holds v2
+    assert reg.reload("titanic", force=True)["version"] == v2
+
+
+def test_watcher_picks_up_new_artifact(tmp_path):
+    reg = _registry(tmp_path)
+    v1 = reg.get("titanic").version
+    reg.start_watcher(interval_sec=0.05)
+    try:
+        _retrain(tmp_path)
+        deadline = time.time() + 30
+        while reg.get("titanic").version == v1 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        reg.stop_watcher()
+    assert reg.get("titanic").version != v1
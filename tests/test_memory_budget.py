@@ -0,0 +1,62 @@
+# tests/test_memory_budget.py
+import time
+from pathlib import Path
+
+import joblib
+
+from app.utils.registry import ModelRegistry, _estimate_nbytes
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "model" / "ash_test_model" / "ash_test_model.pkl"
+
+
+def _registry(tmp_path, pinned="a"):
+    lines = ["models:"]
+    for name in ("a", "b", "c"):
+        lines += [
+            f"  {name}:",
+            f"    model_path: {MODEL_PATH.as_posix()}",
+            f"    feature_names_path: {(MODEL_PATH.parent / 'feature_names.json').as_posix()}",
+            f"    train_csv_path: {(ROOT / 'data' / 'raw' / 'train.csv').as_posix()}",
+            "    target_col: Survived",
+            f"    pin: {'true' if name == pinned else 'false'}",
+        ]
+    cfg = tmp_path / "config" / "config.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return ModelRegistry(config_path=cfg)
+
+
+def test_estimate_is_close_to_artifact_size():
+    est = _estimate_nbytes(joblib.load(MODEL_PATH))
+    size = MODEL_PATH.stat().st_size
+    assert 0.5 * size < est < 2 * size
+
+
+def test_estimate_counts_the_compiled_forest_copy(tmp_path):
+    lm = _registry(tmp_path).get("a")
+    assert lm.compiled is not None  # compile: true is the default
+    forest = lm.compiled.forest
+    assert forest.nbytes > 0.5 * _estimate_nbytes(lm.obj)  # roughly a second copy of the trees
+    assert lm.estimated_bytes >= _estimate_nbytes(lm.obj) + forest.nbytes
+
+
+def test_lru_unpinned_model_is_evicted_over_budget(tmp_path):
+    reg = _registry(tmp_path)
+    a = reg.get("a")
+    reg._memory_budget = int(a.estimated_bytes * 2.5)   # room for two models
+
+    reg.get("b")
+    time.sleep(0.01)
+    reg.get("a")            # touch a; b is now least recently used (a is pinned anyway)
+    reg.get("c")            # over budget -> evict b
+
+    view = reg.list_models()
+    assert view["a"]["memory"]["resident"] and view["a"]["memory"]["pinned"]
+    assert not view["b"]["memory"]["resident"]
+    assert view["b"]["memory"]["evictions"] == 1
+    assert view["c"]["memory"]["estimated_bytes"] > 0
+    assert reg.stats()["resident_bytes"] <= reg._memory_budget
+
+    reg.get("b")            # evicted models reload lazily
+    assert reg.list_models()["c"]["memory"]["evictions"] == 1
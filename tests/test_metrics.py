@@ -0,0 +1,60 @@
+# tests/test_metrics.py
+import re
+
+import app.model_api as api
+from app.model_api import app
+from app.utils.metrics import NULL_TIMER, stage_timer
+
+
+def _sample(text, name, **labels):
+    want = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    for line in text.splitlines():
+        m = re.match(r"^(\w+)\{(.*)\} (\S+)$", line)
+        if m and m.group(1) == name and ",".join(sorted(m.group(2).split(","))) == want:
+            return float(m.group(3))
+    return 0.0
+
+
+def test_stage_histograms_and_registry_counters(monkeypatch):
+    client = app.test_client()
+    before = client.get("/metrics").get_data(as_text=True)
+
+    assert client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]}).status_code == 200
+    rows = [{"Pclass": 1, "Sex": "female"}, {"Pclass": 3}]
+    assert client.post("/v1/batch_predict/titanic", json={"rows": rows}).status_code == 200
+    assert client.post("/v1/predict/titanic", json={}).status_code == 400
+    with monkeypatch.context() as m:
+        m.setattr(api, "_predict_frame_cached", lambda *a, **k: 1 / 0)
+        assert client.post("/v1/batch_predict/titanic", json={"rows": rows}).status_code == 500  # raised
+    assert client.post("/v1/predict/not-a-model", json={}).status_code == 404
+
+    r = client.get("/metrics")
+    assert r.status_code == 200 and r.mimetype == "text/plain"
+    after = r.get_data(as_text=True)
+
+    def delta(name, **labels):
+        return _sample(after, name, **labels) - _sample(before, name, **labels)
+
+    for endpoint in ("predict", "batch_predict"):
+        for stage in ("transform", "predict", "encode"):
+            assert delta("ml_api_stage_seconds_count", model="titanic", endpoint=endpoint, stage=stage) == 1
+    assert delta("ml_api_stage_seconds_count", model="titanic", endpoint="predict", stage="build") == 1
+    # the 500 got as far as building its frame
+    assert delta("ml_api_stage_seconds_count", model="titanic", endpoint="batch_predict", stage="build") == 2
+    # the 400 still decoded its body
+    assert delta("ml_api_stage_seconds_count", model="titanic", endpoint="predict", stage="decode") == 2
+    assert delta("ml_api_rows_total", model="titanic", endpoint="batch_predict") == 2
+    # every answer is timed, labelled with its HTTP status
+    assert delta("ml_api_request_seconds_count", model="titanic", endpoint="predict", status="200") == 1
+    assert delta("ml_api_request_seconds_count", model="titanic", endpoint="predict", status="400") == 1
+    assert delta("ml_api_request_seconds_count", model="titanic", endpoint="batch_predict", status="500") == 1
+    assert "not-a-model" not in after  # unknown names don't create series
+
+    assert "ml_registry_loads_total" in after
+    assert _sample(after, "ml_registry_model_loaded", model="titanic") == 1.0
+
+
+def test_disabled_timer_is_a_noop():
+    assert stage_timer("m", "predict", enabled=False) is NULL_TIMER
+    NULL_TIMER.mark("decode")
+    NULL_TIMER.done(rows=3)
@@ -1,17 +1,20 @@
 # tests/test_model.py
 from pathlib import Path
 import joblib
-import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score
 
+from preprocessing.schema import load_schema, read_csv
+
 ROOT = Path(__file__).resolve().parents[1]
 MODEL_PATH = ROOT / "model" / "ash_test_model" / "ash_test_model.pkl"
 DATA_PATH = ROOT / "data" / "raw" / "train.csv"
+SCHEMA_PATH = ROOT / "model" / "ash_test_model" / "schema.json"
 
 def test_model_accuracy():
     model = joblib.load(MODEL_PATH)
-    df = pd.read_csv(DATA_PATH)
+    schema = load_schema(SCHEMA_PATH)
+    df = read_csv(DATA_PATH, schema)
 
     X = df.drop("Survived", axis=1)
     y = df["Survived"]
@@ -22,7 +25,7 @@ def test_model_accuracy():
     else:
         # Legacy estimator – preprocess first
         from preprocessing.pipeline import get_preprocessing_pipeline
-        pre = get_preprocessing_pipeline(X)
+        pre = get_preprocessing_pipeline(X, schema, encoding="onehot")
         Xp = pre.fit_transform(X)
         preds = model.predict(Xp)
 
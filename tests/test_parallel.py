@@ -0,0 +1,92 @@
+# tests/test_parallel.py
+import threading
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.model_api as api
+from app.utils.parallel import ExecutionPolicy
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "model" / "ash_test_model" / "ash_test_model.pkl"
+
+
+def _frame():
+    return pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"])
+
+
+def _sleepy(fixed=0.002, per_row=1e-5, lock=None):
+    """Stand-in predict whose cost is fixed + per_row * n; sleep releases the GIL like tree traversal."""
+    def predict(frame):
+        if lock is not None:
+            with lock:
+                time.sleep(fixed + per_row * len(frame))
+        else:
+            time.sleep(fixed + per_row * len(frame))
+        return np.zeros(len(frame), dtype=int)
+    return predict
+
+
+def test_plan_switches_to_chunks_at_threshold():
+    policy = ExecutionPolicy(workers=4, max_chunk_rows=1000, inline_max_rows=500)
+    assert policy.plan(499)["mode"] == "inline"
+    assert policy.plan(500) == {"mode": "parallel", "rows": 500, "chunks": 4, "workers": 4, "inline_max_rows": 500}
+    assert policy.plan(10000)["chunks"] == 10              # max_chunk_rows bounds chunk size
+    assert ExecutionPolicy(workers=1, inline_max_rows=10).plan(10**6)["mode"] == "inline"
+    assert ExecutionPolicy(workers=4).plan(10**6)["mode"] == "inline"   # uncalibrated
+
+
+def test_chunked_predictions_match_inline():
+    model = joblib.load(MODEL_PATH)
+    df = _frame().sample(2000, replace=True, random_state=2).reset_index(drop=True)
+    policy = ExecutionPolicy(workers=3, inline_max_rows=100)
+    preds, plan = policy.run(df, model.predict)
+    assert plan["mode"] == "parallel" and plan["chunks"] == 3
+    assert (preds == model.predict(df)).all()
+    assert policy.stats()["batches_parallel"] == 1 and policy.stats()["rows_parallel"] == 2000
+
+
+def test_calibration_finds_crossover_only_when_parallel_pays():
+    sample = _frame()
+    sizes = (64, 512, 2048)
+    scales = ExecutionPolicy(workers=4)
+    result = scales.calibrate(_sleepy(), sample, sizes=sizes)
+    assert result["reason"] == "crossover" and result["inline_max_rows"] is not None
+    assert scales.plan(2048)["mode"] == "parallel"
+
+    serial = ExecutionPolicy(workers=4)   # chunks queue on one lock: no per-row gain
+    result = serial.calibrate(_sleepy(per_row=5e-5, lock=threading.Lock()), sample, sizes=sizes)
+    assert result["inline_max_rows"] is None and serial.plan(10**6)["mode"] == "inline"
+
+    single = ExecutionPolicy(workers=1)
+    assert single.calibrate(_sleepy(), sample)["reason"] == "single worker"
+
+
+def test_batch_predict_reports_plan(monkeypatch):
+    lm = api.REGISTRY.get("titanic")
+    monkeypatch.setattr(lm, "exec_policy", ExecutionPolicy(workers=2, inline_max_rows=50))
+    rows = _frame().head(120)
+    client = api.app.test_client()
+
+    r = client.post("/v1/batch_predict/titanic", json={"rows": rows.to_dict(orient="records")}).get_json()
+    assert r["plan"] == {"mode": "parallel", "rows": 120, "chunks": 2, "workers": 2, "inline_max_rows": 50}
+    assert r["predictions"] == [int(p) for p in lm.predict_frame(rows.reindex(columns=lm.feature_names))]
+
+    r = client.post("/v1/batch_predict/titanic", json={"rows": rows.head(10).to_dict(orient="records")}).get_json()
+    assert r["plan"]["mode"] == "inline" and r["plan"]["rows"] == 10
+
+
+def test_requests_never_start_a_calibration(monkeypatch):
+    lm = api.REGISTRY.get("titanic")
+    policy = ExecutionPolicy(workers=4)                    # lazily loaded: not calibrated
+    monkeypatch.setattr(lm, "exec_policy", policy)
+    monkeypatch.setattr(policy, "calibrate", lambda *a, **k: pytest.fail("calibrated from a request"))
+    rows = _frame().head(300)
+
+    r = api.app.test_client().post("/v1/batch_predict/titanic", json={"rows": rows.to_dict(orient="records")})
+    assert r.status_code == 200 and r.get_json()["plan"]["mode"] == "inline"
+    assert policy.calibration is None
@@ -0,0 +1,47 @@
+# tests/test_payload.py
+from pathlib import Path
+
+from app.model_api import app
+from app.utils.payload import MINIMAL_FEATURES, FULL_TITANIC_FEATURES, resolve_payload_adapter
+from app.utils.registry import ModelRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_titanic_resolves_to_full_shape_at_load():
+    reg = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
+    lm = reg.get("titanic")
+    assert lm.payload_adapter.shape == "full"
+
+    row = lm.payload_adapter.build([3, 0, 22, 7.25])
+    assert list(row) == lm.feature_names
+    assert row["Sex"] == "male"
+    assert lm.payload_adapter.stats()["failed_predicts_saved"] == 1
+
+
+def test_minimal_only_model_resolves_to_minimal_shape():
+    def predict_fn(df):
+        assert list(df.columns) == MINIMAL_FEATURES
+        return [0]
+
+    adapter = resolve_payload_adapter(predict_fn, MINIMAL_FEATURES + ["Extra"])
+    assert adapter.shape == "minimal"
+    assert adapter.build([1, 1, 30, 8.0]) == dict(zip(MINIMAL_FEATURES, [1, 1, 30, 8.0]))
+
+
+def test_unresolvable_model_keeps_both_candidates():
+    def predict_fn(df):
+        raise ValueError("nope")
+
+    adapter = resolve_payload_adapter(predict_fn, FULL_TITANIC_FEATURES)
+    assert adapter.shape == "unknown"
+    assert len(adapter.build([3, 0, 22, 7.25])["_candidates"]) == 2
+
+
+def test_predict_reports_saved_work():
+    client = app.test_client()
+    r = client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]})
+    assert r.status_code == 200
+    payload = client.get("/v1/models").get_json()["titanic"]["payload"]
+    assert payload["shape"] == "full"
+    assert payload["resolved_requests"] >= 1
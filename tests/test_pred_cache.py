@@ -0,0 +1,58 @@
+# tests/test_pred_cache.py
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import app.model_api as api
+from app.utils.pred_cache import PredictionCache, row_key
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class _Model:
+    pass
+
+
+def test_row_key_is_type_and_nan_stable():
+    assert row_key([3, 22, float("nan"), "male"]) == row_key([np.int64(3), 22.0, np.nan, "male"])
+    assert row_key([None]) != row_key([float("nan")])
+
+
+def test_lru_ttl_and_invalidation():
+    cache = PredictionCache(max_entries=2, ttl_sec=0.05)
+    m1, m2 = _Model(), _Model()
+    cache.bind(m1)
+    cache.put("a", 1)
+    cache.put("b", 0)
+    assert cache.get("a") == 1
+    cache.put("c", 1)               # evicts "b" (least recently used)
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None   # expired
+    assert cache.stats()["expirations"] == 1
+
+    cache.put("a", 1)
+    cache.bind(m2)                  # model changed
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_batch_sends_only_misses_to_model(monkeypatch):
+    df = pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"]).head(30)
+    monkeypatch.setitem(api._CACHES, "titanic", PredictionCache(max_entries=1000))
+    client = api.app.test_client()
+
+    first = client.post("/v1/batch_predict/titanic", json={"rows": df.head(20).to_dict("records")})
+    seen = []
+    real = api._predict_frame
+    monkeypatch.setattr(api, "_predict_frame", lambda lm, frame, *a: seen.append(len(frame)) or real(lm, frame, *a))
+    second = client.post("/v1/batch_predict/titanic", json={"rows": df.to_dict("records")})
+
+    assert second.get_json()["predictions"][:20] == first.get_json()["predictions"]
+    assert seen == [10]
+    stats = client.get("/v1/models").get_json()["titanic"]["cache"]
+    assert stats["hits"] == 20
@@ -0,0 +1,54 @@
+# tests/test_prefork.py
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.prefork import format_report, memory_report
+from app.utils.registry import ModelRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+MODEL_PATH = ROOT / "model" / "ash_test_model" / "ash_test_model.pkl"
+
+
+def _registry(tmp_path):
+    cfg = tmp_path / "config" / "config.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text(
+        "api:\n"
+        "  mmap_models: true\n"
+        "  mmap_cache_dir: .cache/mmap\n"
+        "models:\n"
+        "  titanic:\n"
+        f"    model_path: {MODEL_PATH.as_posix()}\n"
+        f"    feature_names_path: {(MODEL_PATH.parent / 'feature_names.json').as_posix()}\n"
+        f"    train_csv_path: {(ROOT / 'data' / 'raw' / 'train.csv').as_posix()}\n"
+        "    target_col: Survived\n",
+        encoding="utf-8",
+    )
+    return ModelRegistry(config_path=cfg)
+
+
+def test_mmap_models_maps_a_private_copy(tmp_path):
+    reg = _registry(tmp_path)
+    lm = reg.get("titanic")
+
+    copies = list((tmp_path / ".cache" / "mmap").glob("titanic-*.joblib"))
+    assert [p.name for p in copies] == [f"titanic-{lm.version}.joblib"]
+
+    num = lm.obj.named_steps["prep"].named_transformers_["num"]
+    assert isinstance(num.named_steps["scaler"].mean_, np.memmap)
+
+    row = {c: np.nan for c in lm.feature_names}
+    row.update({"Pclass": 3, "Sex": "male", "Age": 22.0, "Fare": 7.25})
+    assert lm.predict_frame(pd.DataFrame([row]))[0] in (0, 1)
+
+
+def test_memory_report_splits_unique_and_shared():
+    rows = memory_report([os.getpid()])
+    assert len(rows) == 1
+    r = rows[0]
+    assert r["rss_mib"] > 0
+    assert abs(r["unique_mib"] + r["shared_mib"] - r["rss_mib"]) < 1e-6
+    assert "total unique" in format_report(os.getpid(), [])
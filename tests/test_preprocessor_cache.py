@@ -0,0 +1,64 @@
+# tests/test_preprocessor_cache.py
+import shutil
+from pathlib import Path
+
+import joblib
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from app.utils.registry import ModelRegistry
+from preprocessing.pipeline import get_preprocessing_pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_PATH = ROOT / "data" / "raw" / "train.csv"
+
+
+def _estimator_only_project(tmp_path):
+    """A project whose artifact is a bare estimator, so the registry needs a fallback preprocessor."""
+    df = pd.read_csv(DATA_PATH)
+    X, y = df.drop(columns=["Survived"]), df["Survived"]
+    prep = get_preprocessing_pipeline(X, encoding="onehot").fit(X)
+    clf = RandomForestClassifier(n_estimators=10, random_state=0).fit(prep.transform(X), y)
+    joblib.dump(clf, tmp_path / "model.pkl")
+    shutil.copy(DATA_PATH, tmp_path / "train.csv")
+
+    cfg = tmp_path / "config" / "config.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text(
+        "api:\n"
+        "  preprocessor_cache_dir: cache\n"
+        "models:\n"
+        "  bare:\n"
+        "    model_path: model.pkl\n"
+        "    train_csv_path: train.csv\n"
+        "    target_col: Survived\n",
+        encoding="utf-8",
+    )
+    return cfg, X.head(25)
+
+
+def test_fallback_preprocessor_is_fitted_once_then_loaded(tmp_path):
+    cfg, X = _estimator_only_project(tmp_path)
+
+    first = ModelRegistry(config_path=cfg)
+    lm1 = first.get("bare")
+    assert (first.preprocessor_cache_misses, first.preprocessor_cache_hits) == (1, 0)
+    assert len(list((tmp_path / "cache").glob("*.joblib"))) == 1
+
+    second = ModelRegistry(config_path=cfg)
+    lm2 = second.get("bare")
+    assert (second.preprocessor_cache_misses, second.preprocessor_cache_hits) == (0, 1)
+    assert (lm1.predict_frame(X) == lm2.predict_frame(X)).all()
+
+
+def test_changed_training_data_misses_the_cache(tmp_path):
+    cfg, _ = _estimator_only_project(tmp_path)
+    ModelRegistry(config_path=cfg).get("bare")
+
+    with open(tmp_path / "train.csv", "a", encoding="utf-8") as f:
+        f.write('892,0,3,"Doe, Mr. John",male,30,0,0,X1,8.05,,S\n')
+
+    reg = ModelRegistry(config_path=cfg)
+    reg.get("bare")
+    assert reg.preprocessor_cache_misses == 1
+    assert len(list((tmp_path / "cache").glob("*.joblib"))) == 2
@@ -0,0 +1,79 @@
+# tests/test_profiling.py
+import pstats
+
+import pytest
+
+import app.model_api as api
+from app.utils.profiling import RequestProfiler, report
+
+BODY = {"features": [3, 0, 22, 7.25]}
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    prof = RequestProfiler(tmp_path, token="s3cret", sample_every=0, keep=2)
+    monkeypatch.setattr(api, "_PROFILER", prof)
+    return prof
+
+
+def test_flagged_request_writes_linked_report(profiler, tmp_path):
+    client = api.app.test_client()
+    headers = {"X-Profile": "1", "X-Profile-Token": "s3cret"}
+    r = client.post("/v1/batch_predict/titanic", json={"rows": [{"Pclass": 1}] * 50}, headers=headers)
+    assert r.status_code == 200 and r.get_json()["count"] == 50
+    url = r.headers["X-Profile-Url"]
+    profile_id = url.rsplit("/", 1)[1]
+    assert (tmp_path / f"{profile_id}.prof").exists()
+
+    text = client.get(url, headers=headers).get_data(as_text=True)
+    assert "Own time by package" in text and "sklearn" in text and "pandas" in text
+    assert "Call tree" in text
+    raw = client.get(url + "?format=pstats", headers=headers)
+    assert raw.status_code == 200 and raw.data
+
+    assert client.get(url).status_code == 403                       # token guards reads too
+    assert client.get("/v1/profiles/nope", headers=headers).status_code == 404
+
+
+def test_bad_token_is_rejected_and_unflagged_requests_run_normally(profiler):
+    client = api.app.test_client()
+    assert client.post("/v1/predict/titanic?profile=1", json=BODY).status_code == 403
+    r = client.post("/v1/predict/titanic", json=BODY)
+    assert r.status_code == 200 and "X-Profile-Url" not in r.headers
+    assert profiler.stats()["explicit"] == 0
+
+
+def test_old_profiles_are_pruned(profiler, tmp_path):
+    client = api.app.test_client()
+    headers = {"X-Profile": "1", "X-Profile-Token": "s3cret"}
+    for _ in range(3):
+        client.post("/v1/predict/titanic", json=BODY, headers=headers)
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+    st = client.get("/v1/profiles", headers=headers).get_json()
+    assert st["explicit"] == 3 and len(st["recent"]) == 2
+
+
+def test_sampling_feeds_a_rolling_aggregate(tmp_path, monkeypatch):
+    prof = RequestProfiler(tmp_path, sample_every=3, window=4)
+    monkeypatch.setattr(api, "_PROFILER", prof)
+    client = api.app.test_client()
+    for _ in range(12):
+        r = client.post("/v1/predict/titanic", json=BODY)
+        assert r.status_code == 200 and "X-Profile-Url" not in r.headers
+    assert prof.stats()["sampled"] == 4
+    assert prof.stats()["aggregates"][0]["samples"] == 4
+    assert list(tmp_path.iterdir()) == []            # samples stay in memory
+
+    text = client.get("/v1/profiles/aggregate/titanic/predict").get_data(as_text=True)
+    assert "4 samples" in text
+    assert client.get("/v1/profiles/aggregate/titanic/batch_predict").status_code == 404
+
+
+def test_report_groups_own_time_by_package():
+    import cProfile
+    import pandas as pd
+
+    p = cProfile.Profile()
+    p.runcall(lambda: pd.DataFrame({"a": range(1000)}).describe())
+    text = report(pstats.Stats(p), "t", top_n=5)
+    assert text.startswith("t\n") and "  pandas" in text
@@ -0,0 +1,78 @@
+# tests/test_schema.py
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from app.utils.registry import ModelRegistry
+from preprocessing.pipeline import get_preprocessing_pipeline, split_features_by_type
+from preprocessing.schema import infer_schema, load_schema, read_csv, save_schema
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_PATH = ROOT / "data" / "raw" / "train.csv"
+SCHEMA_PATH = ROOT / "model" / "ash_test_model" / "schema.json"
+
+
+def test_manifest_matches_training_data():
+    schema = load_schema(SCHEMA_PATH)
+    assert schema == infer_schema(pd.read_csv(DATA_PATH), target_col="Survived")
+    cols = {c["name"]: c for c in schema["columns"]}
+    assert cols["Age"] == {"name": "Age", "dtype": "float64", "nullable": True}
+    assert cols["Embarked"]["categories"] == ["C", "Q", "S"]
+    assert "categories" not in cols["Name"] and cols["Name"]["cardinality"] == 891
+
+
+def test_read_csv_same_values_as_pandas_in_less_memory():
+    schema = load_schema(SCHEMA_PATH)
+    inferred = pd.read_csv(DATA_PATH)
+    typed = read_csv(DATA_PATH, schema)
+
+    assert list(typed.columns) == list(inferred.columns)
+    assert typed["Cabin"].dtype == "category" and typed["Pclass"].dtype == "int64"
+    as_object = typed.astype({c: object for c in typed.columns if typed[c].dtype == "category"})
+    pd.testing.assert_frame_equal(as_object.where(as_object.notna(), np.nan), inferred)
+    assert typed.memory_usage(deep=True).sum() < inferred.memory_usage(deep=True).sum()
+    assert split_features_by_type(typed.drop(columns=["Survived"]), schema) == split_features_by_type(
+        inferred.drop(columns=["Survived"]))
+
+
+def test_read_csv_keeps_unseen_levels_and_missing_values(tmp_path):
+    schema = infer_schema(pd.DataFrame({"n": [1, 2], "s": ["b", "a"]}))
+    path = tmp_path / "new.csv"
+    path.write_text("n,s\n3,c\n,a\n4,\n", encoding="utf-8")
+
+    df = read_csv(path, schema, columns=["s", "n"])
+    assert list(df.columns) == ["s", "n"]
+    assert list(df["s"].cat.categories) == ["a", "b", "c"]  # recorded levels first, then new ones
+    assert df["s"].isna().tolist() == [False, False, True]
+    assert df["n"].dtype == "float64" and np.isnan(df["n"][1])
+
+
+def test_registry_fits_fallback_from_manifest(tmp_path):
+    df = pd.read_csv(DATA_PATH)
+    X, y = df.drop(columns=["Survived"]), df["Survived"]
+    prep = get_preprocessing_pipeline(X, encoding="onehot").fit(X)
+    clf = RandomForestClassifier(n_estimators=10, random_state=0).fit(prep.transform(X), y)
+    joblib.dump(clf, tmp_path / "model.pkl")
+    shutil.copy(DATA_PATH, tmp_path / "train.csv")
+    save_schema(load_schema(SCHEMA_PATH), tmp_path / "schema.json")
+
+    cfg = tmp_path / "config" / "config.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text(
+        "api:\n"
+        "  preprocessor_cache: false\n"
+        "models:\n"
+        "  bare:\n"
+        "    model_path: model.pkl\n"
+        "    train_csv_path: train.csv\n"
+        "    schema_path: schema.json\n"
+        "    target_col: Survived\n",
+        encoding="utf-8",
+    )
+    lm = ModelRegistry(str(cfg)).get("bare")
+    assert lm.schema is not None and lm.feature_names == list(X.columns)
+    assert (lm.predict_frame(X) == clf.predict(prep.transform(X))).all()
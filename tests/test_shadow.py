@@ -0,0 +1,77 @@
+# tests/test_shadow.py
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import app.model_api as api
+from app.utils.shadow import ShadowEvaluator
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _frame(n=30):
+    return pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"]).head(n)
+
+
+def test_shadow_scores_mirrored_rows_and_frames():
+    lm = api.REGISTRY.get("titanic")
+    df = _frame()
+    preds = lm.predict_frame(df)
+    wrong = 1 - preds   # pretend the primary said the opposite for the frame
+
+    ev = ShadowEvaluator("titanic", "titanic", api.REGISTRY.get, max_batch_size=8, max_wait_ms=5)
+    try:
+        for row, y in zip(df.head(5).to_dict("records"), preds[:5]):
+            assert ev.submit(row, int(y), 0.001)
+        assert ev.submit(df, wrong, 0.01)
+        assert ev.drain()
+        st = ev.stats()
+    finally:
+        ev.close()
+
+    assert st["rows_scored"] == 35
+    assert (st["agree"], st["disagree"]) == (5, 30)
+    assert st["errors"] == 0 and st["primary_ms_per_row"] > 0 and st["shadow_ms_per_row"] > 0
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+
+    def slow_get_model(name):
+        release.wait(5)
+        return api.REGISTRY.get(name)
+
+    ev = ShadowEvaluator("titanic", "titanic", slow_get_model, queue_size=2, max_batch_size=1, max_wait_ms=0)
+    try:
+        row = _frame(1).to_dict("records")[0]
+        t0 = time.perf_counter()
+        results = [ev.submit(row, 0, 0.001) for _ in range(20)]
+        assert time.perf_counter() - t0 < 0.5
+        assert results.count(False) >= 17   # one in the worker, two queued, the rest dropped
+        release.set()
+        assert ev.drain()
+        st = ev.stats()
+        assert st["dropped"] == results.count(False)
+        assert st["rows_scored"] == results.count(True)
+    finally:
+        release.set()
+        ev.close()
+
+
+def test_endpoints_mirror_to_the_configured_shadow(monkeypatch):
+    ev = ShadowEvaluator("titanic", "titanic", api.REGISTRY.get, max_wait_ms=5)
+    monkeypatch.setitem(api._SHADOWS, "titanic", ev)
+    client = api.app.test_client()
+    try:
+        assert client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]}).status_code == 200
+        rows = _frame(10).to_dict("records")
+        assert client.post("/v1/batch_predict/titanic", json={"rows": rows}).status_code == 200
+        assert ev.drain()
+        st = client.get("/v1/models").get_json()["titanic"]["shadow"]
+    finally:
+        ev.close()
+
+    assert st["shadow_model"] == "titanic"
+    assert st["rows_scored"] == 11 and st["agreement_rate"] == 1.0
@@ -0,0 +1,59 @@
+# tests/test_single_flight.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from app.utils.registry import ModelLoadError, ModelRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_concurrent_cold_gets_load_once():
+    reg = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
+    real = reg._load_model
+    calls = []
+
+    def slow_load(name, cfg):
+        calls.append(name)
+        time.sleep(0.2)
+        return real(name, cfg)
+
+    reg._load_model = slow_load
+    barrier = threading.Barrier(8)
+
+    def worker(_):
+        barrier.wait()
+        return reg.get("titanic")
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        models = list(ex.map(worker, range(8)))
+
+    assert calls == ["titanic"]
+    assert all(m is models[0] for m in models)
+    assert reg.stats()["single_flight_waits"] >= 1
+
+
+def test_failed_load_is_cached_for_backoff():
+    reg = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
+    reg._load_failure_backoff = 0.2
+    calls = []
+
+    def broken_load(name, cfg):
+        calls.append(name)
+        raise OSError("corrupt artifact")
+
+    reg._load_model = broken_load
+    with pytest.raises(OSError):
+        reg.get("titanic")
+    with pytest.raises(ModelLoadError):
+        reg.get("titanic")
+    assert len(calls) == 1
+    assert reg.stats()["in_backoff"] == ["titanic"]
+
+    time.sleep(0.25)
+    with pytest.raises(OSError):
+        reg.get("titanic")
+    assert len(calls) == 2
@@ -0,0 +1,56 @@
+# tests/test_stream_predict.py
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from app.model_api import app
+from app.utils.ndjson_stream import NDJSONChunker, iter_chunks
+
+ROOT = Path(__file__).resolve().parents[1]
+FEATURES = ["PassengerId", "Pclass", "Name", "Sex", "Age", "SibSp", "Parch", "Ticket", "Fare", "Cabin", "Embarked"]
+
+
+def _frame(n=120):
+    return pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"]).head(n)
+
+
+def _ndjson(df):
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    return "".join(json.dumps(r) + "\n" for r in records).encode()
+
+
+def test_chunker_bounds_chunks_and_handles_split_lines():
+    body = _ndjson(_frame(25)) + b'[1, 2]\n{"Pclass": 3}'   # bad list, then no trailing newline
+    chunker = NDJSONChunker(FEATURES, chunk_rows=10)
+    reads = (body[i:i + 7] for i in range(0, len(body), 7))   # lines split across reads
+
+    chunks = list(iter_chunks(reads, chunker))
+    assert [len(c) for c in chunks] == [10, 10, 7]
+    last = chunks[-1]
+    assert [i for i, _ in last.errors] == [25]
+    assert last.indices[-1] == 26 and last.rows[-1] == {"Pclass": 3}
+
+
+def test_stream_matches_batch_predict():
+    df = _frame()
+    client = app.test_client()
+    expected = client.post("/v1/batch_predict/titanic", json={"rows": json.loads(
+        "[" + ",".join(_ndjson(df).decode().splitlines()) + "]")}).get_json()["predictions"]
+
+    r = client.post("/v1/stream_predict/titanic", data=_ndjson(df), content_type="application/x-ndjson")
+    assert r.status_code == 200
+    assert r.mimetype == "application/x-ndjson"
+    lines = [json.loads(x) for x in r.get_data(as_text=True).splitlines()]
+    assert [x["row"] for x in lines] == list(range(len(df)))
+    assert [x["prediction"] for x in lines] == expected
+
+
+def test_bad_lines_fail_alone():
+    body = b'{"Pclass": 1, "Sex": "female"}\n{oops\n\n["too", "short"]\n{"features": {"Pclass": 3}}\n'
+    r = app.test_client().post("/v1/stream_predict/titanic", data=body)
+    lines = [json.loads(x) for x in r.get_data(as_text=True).splitlines()]
+
+    assert [x["row"] for x in lines] == [0, 1, 2, 3]
+    assert "prediction" in lines[0] and "prediction" in lines[3]
+    assert "error" in lines[1] and "error" in lines[2]
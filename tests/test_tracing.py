@@ -0,0 +1,103 @@
+# tests/test_tracing.py
+import json
+from pathlib import Path
+
+import pytest
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+import app.model_api as api
+from app.utils import tracing
+from app.utils.registry import ModelRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def spans():
+    mem = InMemorySpanExporter()
+    tracing.configure({"enabled": True}, ROOT, exporter=mem)
+
+    def finished():
+        tracing.force_flush()
+        return mem.get_finished_spans()
+
+    yield finished
+    tracing.shutdown()
+
+
+def test_predict_trace_has_registry_stage_and_candidate_spans(spans):
+    api.REGISTRY.get("titanic")
+    client = api.app.test_client()
+    assert client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]}).status_code == 200
+
+    by_name = {s.name: s for s in spans()}
+    root = by_name["POST /v1/predict"]
+    assert root.parent is None
+    assert root.attributes["ml.model"] == "titanic" and root.attributes["ml.batch_size"] == 1
+    assert root.attributes["ml.model_version"] and root.attributes["http.status_code"] == 200
+    assert by_name["registry.get"].attributes["ml.cache_hit"] is True
+    for name in ("registry.get", "decode", "build", "predict.candidate", "encode"):
+        assert by_name[name].parent.span_id == root.context.span_id, name
+    # the row is scored inside the candidate attempt
+    candidate = by_name["predict.candidate"]
+    assert any(s.parent.span_id == candidate.context.span_id for s in spans() if s.name in ("transform", "cache"))
+
+
+def test_batch_trace_carries_batch_size_and_estimator_predict(spans):
+    client = api.app.test_client()
+    rows = [{"Pclass": 1, "Sex": "female", "Age": a} for a in range(25)]
+    assert client.post("/v1/batch_predict/titanic", json={"rows": rows}).status_code == 200
+
+    got = spans()
+    root = next(s for s in got if s.name == "POST /v1/batch_predict")
+    assert root.attributes["ml.batch_size"] == 25
+    children = {s.name for s in got if s.parent is not None and s.parent.span_id == root.context.span_id}
+    assert {"registry.get", "decode", "build", "transform", "predict", "encode"} <= children
+
+
+def test_error_responses_mark_the_request_span(spans):
+    client = api.app.test_client()
+    assert client.post("/v1/predict/titanic", json={"features": [1, 2]}).status_code == 400
+    assert client.post("/v1/batch_predict/nope", json={"rows": []}).status_code == 404
+    assert client.post("/v1/predict/titanic", json={"features": [3, 0, 22, 7.25]}).status_code == 200
+
+    roots = [s for s in spans() if s.parent is None]
+    assert [s.attributes["http.status_code"] for s in roots] == [400, 404, 200]
+    assert [s.status.status_code for s in roots] == [StatusCode.ERROR, StatusCode.ERROR, StatusCode.UNSET]
+    assert roots[0].status.description.startswith("Invalid payload")
+    assert "not found in config" in roots[1].status.description
+
+
+def test_cold_load_gets_its_own_span(spans):
+    reg = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
+    reg.get("titanic")
+    reg.get("titanic")
+    got = spans()
+    gets = [s for s in got if s.name == "registry.get"]
+    assert [s.attributes["ml.cache_hit"] for s in gets] == [False, True]
+    load = next(s for s in got if s.name == "registry.load_model")
+    assert load.parent.span_id == gets[0].context.span_id
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    tracing.configure({"enabled": True, "exporter": "file", "path": str(tmp_path / "spans.jsonl")}, ROOT)
+    try:
+        with tracing.request_span("predict", model="m"):
+            with tracing.span("decode", batch_size=3):
+                pass
+        tracing.force_flush()
+    finally:
+        tracing.shutdown()
+    lines = [json.loads(l) for l in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert [l["name"] for l in lines] == ["decode", "predict"]
+    assert lines[0]["parent_id"] == lines[1]["span_id"] and lines[0]["attributes"] == {"ml.batch_size": 3}
+    assert lines[1]["duration_ms"] >= 0
+
+
+def test_disabled_tracing_leaves_timer_unwrapped():
+    assert not tracing.enabled()
+    timer = object()
+    assert tracing.wrap_timer(timer) is timer
+    with tracing.span("x", a=1) as sp:
+        assert sp is None
@@ -0,0 +1,102 @@
+# tests/test_typed_io.py
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import app.model_api as api
+
+ROOT = Path(__file__).resolve().parents[1]
+URL = "/v1/predict/titanic"
+
+
+def _records(n=40):
+    return pd.read_csv(ROOT / "data" / "raw" / "train.csv").drop(columns=["Survived"]).head(n).to_dict("records")
+
+
+@pytest.fixture
+def use_generic_json(monkeypatch):
+    """Call the returned function to switch the typed codec off (plain get_json path)."""
+    lm = api.REGISTRY.get("titanic")
+    return lambda: monkeypatch.setattr(lm, "codec", None)
+
+
+def test_column_kinds_follow_the_preprocessor():
+    kinds = api.REGISTRY.get("titanic").codec.kinds
+    assert kinds["Age"] == kinds["Fare"] == kinds["Pclass"] == "number"
+    assert kinds["Sex"] == kinds["Cabin"] == "any"
+
+
+def test_typed_and_generic_paths_agree(use_generic_json):
+    client = api.app.test_client()
+    recs = _records()
+    payloads = recs + [list(r.values()) for r in recs] + [[r["Pclass"], r["Sex"], r["Age"], r["Fare"]] for r in recs]
+    payloads.append({"Pclass": 1, "Sex": 1, "Age": "38", "Fare": 71.3})   # minimal dict, numeric string
+
+    typed = [client.post(URL, json={"features": p}).get_json()["prediction"] for p in payloads]
+    use_generic_json()
+    plain = [client.post(URL, json={"features": p}).get_json()["prediction"] for p in payloads]
+    assert typed == plain
+
+    body = {"rows": recs}
+    assert client.post("/v1/batch_predict/titanic", json=body).get_json()["predictions"] == typed[:len(recs)]
+
+
+def test_extra_keys_and_loose_pclass_predict_like_the_generic_path(use_generic_json):
+    client = api.app.test_client()
+    payloads = []
+    for i in range(54):
+        mini = {"Pclass": 1 + i % 3, "Sex": ["male", "female"][i % 2], "Age": 2.0 + 3 * i % 70, "Fare": 5.0 + 9 * i % 200}
+        payloads.append({**mini, "extra": 1})                    # not a feature: must not count as minimal
+        payloads.append({**mini, "SibSp": i % 4})                 # a real feature besides the minimal keys
+    payloads += [
+        [2.5, "male", 30, 10.0],                                  # minimal list, fractional Pclass
+        [True, "female", 30, 10.0],                               # minimal list, boolean Pclass
+        {"Pclass": 2.5, "Sex": "male", "Age": 30, "Fare": 10.0},
+        {"Pclass": True, "Sex": "female", "Age": 30, "Fare": 10.0},
+    ]
+
+    typed = [client.post(URL, json={"features": p}) for p in payloads]
+    assert all(r.status_code == 200 for r in typed), [r.get_json() for r in typed if r.status_code != 200]
+    use_generic_json()
+    plain = [client.post(URL, json={"features": p}).get_json()["prediction"] for p in payloads]
+    assert [r.get_json()["prediction"] for r in typed] == plain
+
+
+@pytest.mark.parametrize("features", [
+    {"Age": "old"},                  # non-numeric string in a numeric column
+    {"Fare": {"amount": 7.25}},      # nested object
+    [[3], "male", 22, 7.25],         # nested list
+    [1, 2],                          # wrong length
+])
+def test_malformed_payloads_are_rejected_before_pandas(features, monkeypatch):
+    monkeypatch.setattr(api.pd, "DataFrame", lambda *a, **k: pytest.fail("reached pandas"))
+    r = api.app.test_client().post(URL, json={"features": features})
+    assert r.status_code == 400
+    assert r.get_json()["error"].startswith("Invalid payload")
+
+
+@pytest.mark.parametrize("features", [[1, 2], "3,male,22,7.25"])
+def test_generic_path_rejects_bad_shapes_with_400(features, use_generic_json):
+    use_generic_json()
+    r = api.app.test_client().post(URL, json={"features": features})
+    assert r.status_code == 400
+    assert r.get_json()["error"].startswith("Invalid payload")
+
+
+def test_missing_features_and_bad_batch_bodies():
+    client = api.app.test_client()
+    assert client.post(URL, json={}).get_json()["error"] == "Missing 'features'"
+    assert client.post(URL, data=b"just text").status_code == 400
+
+    r = client.post("/v1/batch_predict/titanic", json={"matrix": [[1, 2, 3]]})
+    assert r.status_code == 400
+    assert client.post("/v1/batch_predict/titanic", json={"nothing": 1}).status_code == 400
+
+
+def test_non_standard_json_nan_is_still_accepted():
+    body = json.dumps({"features": {"Pclass": 3, "Sex": "male", "Age": float("nan"), "Fare": 7.25}})
+    assert "NaN" in body
+    r = api.app.test_client().post(URL, data=body, content_type="application/json")
+    assert r.status_code == 200 and r.get_json()["prediction"] in (0, 1)
@@ -0,0 +1,63 @@
+# tests/test_warmup.py
+import threading
+from pathlib import Path
+
+from app.utils.registry import ModelRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_lazy_registry_is_ready_without_warmup():
+    reg = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
+    assert reg.ready
+    assert reg.list_models()["titanic"]["loaded"] is False
+
+
+def test_warm_up_all_loads_and_times_every_model():
+    reg = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
+    t = reg.start_warmup(max_workers=2)
+    t.join(timeout=60)
+
+    assert reg.ready
+    info = reg.list_models()["titanic"]
+    assert info["warmup"] == {"status": "warm"}
+    timings = info["timings"]
+    assert timings["load_total_sec"] >= timings["loaded_sec"] > 0
+    assert timings["warmup_sec"] > 0
+    assert timings["first_prediction_sec"] >= timings["load_total_sec"]
+
+
+def test_warm_up_all_waits_for_a_running_background_warmup(monkeypatch):
+    reg = ModelRegistry(config_path=ROOT / "config" / "config.yaml")
+    release, calls = threading.Event(), []
+    warm_one = reg._warm_one
+
+    def slow_warm_one(name):
+        calls.append(name)
+        release.wait(10)
+        warm_one(name)
+
+    monkeypatch.setattr(reg, "_warm_one", slow_warm_one)
+    t = reg.start_warmup()
+    threading.Timer(0.2, release.set).start()
+    state = reg.warm_up_all()  # what app.prefork does after importing app.model_api
+
+    assert not t.is_alive() and reg.ready
+    assert state == {"titanic": {"status": "warm"}}
+    assert calls == ["titanic"]  # warmed (and calibrated) once, not twice
+
+
+def test_broken_model_keeps_registry_not_ready(tmp_path):
+    cfg = tmp_path / "config" / "config.yaml"
+    cfg.parent.mkdir()
+    cfg.write_text(
+        "models:\n"
+        "  broken:\n"
+        "    model_path: missing.pkl\n"
+        "    train_csv_path: missing.csv\n",
+        encoding="utf-8",
+    )
+    reg = ModelRegistry(config_path=cfg)
+    state = reg.warm_up_all()
+    assert state["broken"]["status"] == "error"
+    assert not reg.ready
@@ -12,7 +12,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import tempfile
 
-from preprocessing.pipeline import get_preprocessing_pipeline
+from preprocessing.pipeline import describe_preprocessor, get_preprocessing_pipeline
+from preprocessing.schema import infer_schema, read_csv, save_schema
 
 # Log runs locally (no server needed)
 mlflow.set_tracking_uri("file:./mlruns")
@@ -20,13 +21,14 @@ mlflow.set_experiment("titanic_model_experiment")
 
 os.makedirs("../model", exist_ok=True)
 
-# 1) Load raw data
-df = pd.read_csv("data/raw/train.csv")
+# 1) Load raw data; the schema manifest records dtypes/levels so later reads skip inference
+schema = infer_schema(pd.read_csv("data/raw/train.csv"), target_col="Survived")
+df = read_csv("data/raw/train.csv", schema)
 X = df.drop(columns=["Survived"])
 y = df["Survived"]
 
-# 2) Build preprocessing
-preprocessor = get_preprocessing_pipeline(X)
+# 2) Build preprocessing (categorical encoding picked per column by cardinality)
+preprocessor = get_preprocessing_pipeline(X, schema)
 
 # 3) Build a full pipeline: raw -> preprocess -> model
 clf = RandomForestClassifier(n_estimators=100, random_state=42)
@@ -48,11 +50,15 @@ with mlflow.start_run():
 
     mlflow.log_param("n_estimators", 100)
     mlflow.log_metric("accuracy", acc)
+    encoding = describe_preprocessor(pipe.named_steps["prep"])
+    mlflow.log_params({f"encoding.{c}": e for c, e in encoding["encodings"].items()})
+    mlflow.log_metric("n_features_out", encoding["n_features_out"])
 
     # Save pipeline (includes preprocessing + model)
     model_path = "model/ash_test_model/ash_test_model.pkl"  # <-- your new name
     joblib.dump(pipe, model_path)
     mlflow.log_artifact(model_path)
+    mlflow.log_metric("artifact_bytes", os.path.getsize(model_path))
 
     # Save feature names (raw column order) for API to build DataFrame
     feature_names = list(X.columns)
@@ -60,8 +66,14 @@ with mlflow.start_run():
         json.dump(feature_names, f)
     mlflow.log_artifact("model/ash_test_model/feature_names.json")
 
+    # Save the schema manifest (dtypes + categorical levels) next to it
+    save_schema(schema, "model/ash_test_model/schema.json")
+    mlflow.log_artifact("model/ash_test_model/schema.json")
+
     # Report
     print(f"✅ Trained pipeline accuracy: {acc:.2f}")
+    print(f"🔢 Encodings: {encoding['encodings']}")
+    print(f"📐 Feature width {encoding['n_features_out']}, artifact {os.path.getsize(model_path) / 1024:.0f} KB")
     print("\n📊 Classification Report:\n", classification_report(y_test, preds))
 
     # Confusion matrix